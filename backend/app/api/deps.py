@@ -1,10 +1,15 @@
 """API dependencies - DB session and auth."""
-from typing import Annotated, Generator, Union
+from typing import Annotated, AsyncGenerator, Generator, Union
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.device_tokens import verify_device_token
+from app.core.principal_cache import get_principal_cache
 from app.core.security import decode_access_token
 from app.models import AdminUser, Driver
 
@@ -22,36 +27,43 @@ def get_db_session() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """Async database session dependency (hot endpoints)."""
+    from app.db.session import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 DbSession = Annotated[Session, Depends(get_db_session)]
+AsyncDbSession = Annotated[AsyncSession, Depends(get_async_db_session)]
+Credentials = Annotated[HTTPAuthorizationCredentials | None, Depends(security)]
+DeviceToken = Annotated[str | None, Header(alias="X-Device-Token")]
+
+
+def _credentials_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
 
 
-def get_current_driver(
-    db: DbSession,
-    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)],
-) -> Driver:
-    """Extract and validate JWT, return current driver."""
+def _token_subject(credentials: HTTPAuthorizationCredentials | None, token_type: str) -> str:
+    """Decode the bearer token and return its subject if it is of the expected type."""
     token = credentials.credentials if credentials else None
     if not token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_error()
     payload = decode_access_token(token)
-    if not payload or payload.get("type") != "driver":
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    driver_id = payload.get("sub")
-    if not driver_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    driver = db.query(Driver).filter(Driver.id == int(driver_id)).first()
+    if not payload or payload.get("type") != token_type:
+        raise _credentials_error()
+    sub = payload.get("sub")
+    if not sub:
+        raise _credentials_error()
+    return sub
+
+
+def _check_driver(driver: Driver | None) -> Driver:
     if not driver or not driver.active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -61,33 +73,7 @@ def get_current_driver(
     return driver
 
 
-def get_current_admin(
-    db: DbSession,
-    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)],
-) -> AdminUser:
-    """Extract and validate JWT, return current admin."""
-    token = credentials.credentials if credentials else None
-    if not token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    payload = decode_access_token(token)
-    if not payload or payload.get("type") != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    username = payload.get("sub")
-    if not username:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    admin = db.query(AdminUser).filter(AdminUser.username == username).first()
+def _check_admin(admin: AdminUser | None) -> AdminUser:
     if not admin or not admin.active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -97,45 +83,90 @@ def get_current_admin(
     return admin
 
 
-def get_current_admin_or_driver(
-    db: DbSession,
-    credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)],
-) -> Union[AdminUser, Driver]:
+def _cached(kind: str, subject: str, model):
+    return get_principal_cache().get(kind, subject, model)
+
+
+def _remember(kind: str, subject: str, principal):
+    """Cache active principals only; unknown or inactive ones are re-checked against the DB."""
+    if principal is not None and principal.active:
+        get_principal_cache().put(kind, subject, principal)
+    return principal
+
+
+def _load_driver(db: Session, driver_id: str) -> Driver | None:
+    return _cached("driver", driver_id, Driver) or _remember(
+        "driver", driver_id, db.query(Driver).filter(Driver.id == int(driver_id)).first()
+    )
+
+
+def _load_admin(db: Session, username: str) -> AdminUser | None:
+    return _cached("admin", username, AdminUser) or _remember(
+        "admin", username, db.query(AdminUser).filter(AdminUser.username == username).first()
+    )
+
+
+def get_current_driver(db: DbSession, credentials: Credentials) -> Driver:
+    """Extract and validate JWT, return current driver (a cached, detached copy on cache hits)."""
+    return _check_driver(_load_driver(db, _token_subject(credentials, "driver")))
+
+
+def get_current_admin(db: DbSession, credentials: Credentials) -> AdminUser:
+    """Extract and validate JWT, return current admin (a cached, detached copy on cache hits)."""
+    return _check_admin(_load_admin(db, _token_subject(credentials, "admin")))
+
+
+async def get_current_driver_async(db: AsyncDbSession, credentials: Credentials) -> Driver:
+    """Async variant of get_current_driver for async endpoints."""
+    driver_id = _token_subject(credentials, "driver")
+    driver = _cached("driver", driver_id, Driver) or _remember(
+        "driver", driver_id, await db.scalar(select(Driver).where(Driver.id == int(driver_id)))
+    )
+    return _check_driver(driver)
+
+
+async def get_current_admin_async(db: AsyncDbSession, credentials: Credentials) -> AdminUser:
+    """Async variant of get_current_admin for async endpoints."""
+    username = _token_subject(credentials, "admin")
+    admin = _cached("admin", username, AdminUser) or _remember(
+        "admin", username, await db.scalar(select(AdminUser).where(AdminUser.username == username))
+    )
+    return _check_admin(admin)
+
+
+def get_current_admin_or_driver(db: DbSession, credentials: Credentials) -> Union[AdminUser, Driver]:
     """Accept either admin or driver JWT. Used by endpoints both roles need (e.g. get trip)."""
     token = credentials.credentials if credentials else None
     if not token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_error()
     payload = decode_access_token(token)
     if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_error()
     token_type = payload.get("type")
     sub = payload.get("sub")
     if not sub:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_error()
     if token_type == "admin":
-        admin = db.query(AdminUser).filter(AdminUser.username == sub).first()
+        admin = _load_admin(db, sub)
         if not admin or not admin.active:
             raise HTTPException(status_code=401, detail="Admin not found or inactive")
         return admin
     if token_type == "driver":
-        driver = db.query(Driver).filter(Driver.id == int(sub)).first()
+        driver = _load_driver(db, sub)
         if not driver or not driver.active:
             raise HTTPException(status_code=401, detail="Driver not found or inactive")
         return driver
-    raise HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    raise _credentials_error()
+
+
+def check_device_token(token: str | None, vehicle_id: int, trip_id: int | None) -> None:
+    """Validate the X-Device-Token of a GPS update (stateless; no DB lookup).
+
+    A missing token is accepted unless DEVICE_TOKEN_REQUIRED is set; a present token must be valid.
+    """
+    if token is None:
+        if settings.device_token_required:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Device token required")
+        return
+    if not verify_device_token(token, vehicle_id, trip_id):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or revoked device token")
@@ -0,0 +1,36 @@
+"""Admin metrics routes - per-worker connection pool, latency and cache stats."""
+import os
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_current_admin
+from app.core.principal_cache import get_principal_cache
+from app.core.redis_client import redis_metrics
+from app.core.versioned_cache import versioned_cache_metrics
+from app.db.session import pool_metrics
+
+router = APIRouter(prefix="/admin/metrics", tags=["admin-metrics"], dependencies=[Depends(get_current_admin)])
+
+
+@router.get("/redis")
+def get_redis_metrics() -> dict:
+    """Redis pool occupancy and command latency for the worker serving this request."""
+    return redis_metrics()
+
+
+@router.get("/db-pool")
+def get_db_pool_metrics() -> dict:
+    """DB pool checkouts, wait time, overflow and timeouts for the worker serving this request."""
+    return {"pid": os.getpid(), **pool_metrics()}
+
+
+@router.get("/principal-cache")
+def get_principal_cache_metrics() -> dict:
+    """Auth principal cache hit ratio and size for the worker serving this request."""
+    return {"pid": os.getpid(), **get_principal_cache().snapshot()}
+
+
+@router.get("/reference-caches")
+def get_reference_cache_metrics() -> dict:
+    """Hit ratio and size of each in-memory reference data cache for the worker serving this request."""
+    return {"pid": os.getpid(), **versioned_cache_metrics()}
@@ -0,0 +1,61 @@
+"""Analytics routes - precomputed fleet analytics (admin only)."""
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Response
+
+from app.api.deps import DbSession, get_current_admin
+from app.core.serialization import json_bytes_response
+from app.schemas.analytics import (
+    FuelEfficiencyResponse,
+    RefuelIntervalResponse,
+    UtilizationJobStatus,
+    VehicleDayUtilizationResponse,
+)
+from app.services.fuel_service import fuel_efficiency_json, refuel_intervals
+from app.services.utilization_service import utilization_rows, utilization_status
+
+router = APIRouter(prefix="/analytics", tags=["analytics"], dependencies=[Depends(get_current_admin)])
+
+
+@router.get("/utilization", response_model=list[VehicleDayUtilizationResponse])
+def vehicle_utilization(
+    db: DbSession,
+    organization_id: Optional[int] = Query(None),
+    vehicle_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+) -> list[dict]:
+    """Per vehicle-day km, on-trip, idle and at-hospital time from GPS history (newest day first).
+    Updated by scripts/process_utilization.py, not computed per request."""
+    return utilization_rows(db, organization_id, vehicle_id, date_from, date_to)
+
+
+@router.get("/utilization/status", response_model=UtilizationJobStatus)
+def vehicle_utilization_status(db: DbSession) -> dict:
+    """Watermark, backlog and last-run throughput (points/sec) of the utilization job."""
+    return utilization_status(db)
+
+
+@router.get("/fuel", response_model=list[FuelEfficiencyResponse])
+def fuel_efficiency_report(
+    db: DbSession,
+    organization_id: Optional[int] = Query(None),
+    vehicle_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+) -> Response:
+    """Km per litre and cost per km per vehicle between consecutive refuels, least efficient first,
+    with trip and GPS km for comparison and anomaly flags. Cached per period."""
+    return json_bytes_response(fuel_efficiency_json(db, organization_id, vehicle_id, date_from, date_to))
+
+
+@router.get("/fuel/vehicles/{vehicle_id}/refuels", response_model=list[RefuelIntervalResponse])
+def fuel_refuel_intervals(
+    vehicle_id: int,
+    db: DbSession,
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+) -> list[dict]:
+    """Each refuel interval of one vehicle: odometer km, litres, km/l, cost/km and trip km."""
+    return refuel_intervals(db, vehicle_id, date_from, date_to)
@@ -0,0 +1,83 @@
+"""Async versions of the hot endpoints, served under /async alongside the sync routes.
+
+These run on the event loop with the asyncpg/aiosqlite engine instead of occupying a
+threadpool thread per request while waiting on Postgres. Responses match the sync routes.
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Response
+
+from app.api.deps import (
+    AsyncDbSession,
+    DeviceToken,
+    check_device_token,
+    get_current_admin_async,
+    get_current_driver_async,
+)
+from app.core.metrics import GPS_POINTS, GPS_POINTS_LOGGED
+from app.core.serialization import dumps, json_bytes_response
+from app.models import Driver, GPSLog
+from app.schemas.gps import GPSUpdateRequest, VehicleLocationResponse
+from app.schemas.preset_location import PresetLocationResponse
+from app.schemas.trip import TripResponse
+from app.services.gps_service import get_live_vehicles_async, update_vehicle_location_async
+from app.services.preset_location_service import active_presets_stmt, match_preset_location
+from app.services.trip_service import driver_trips_today_rows_stmt, encode_trip_rows
+
+router = APIRouter(prefix="/async", tags=["async"])
+
+
+@router.post("/gps/update")
+async def update_gps_async(data: GPSUpdateRequest, db: AsyncDbSession, x_device_token: DeviceToken = None) -> dict:
+    """Async /gps/update: live location to Redis, GPS log to DB if trip_id provided."""
+    check_device_token(x_device_token, data.vehicle_id, data.trip_id)
+    GPS_POINTS.inc()
+    await update_vehicle_location_async(
+        vehicle_id=data.vehicle_id,
+        latitude=data.latitude,
+        longitude=data.longitude,
+        trip_id=data.trip_id,
+    )
+    if data.trip_id:
+        db.add(GPSLog(
+            vehicle_id=data.vehicle_id,
+            trip_id=data.trip_id,
+            latitude=data.latitude,
+            longitude=data.longitude,
+        ))
+        await db.commit()
+        GPS_POINTS_LOGGED.inc()
+    return {"status": "ok"}
+
+
+@router.get("/gps/vehicles/live", response_model=list[VehicleLocationResponse])
+async def get_live_vehicles_endpoint_async(
+    db: AsyncDbSession,
+    _admin=Depends(get_current_admin_async),
+) -> Response:
+    """Async /gps/vehicles/live."""
+    return json_bytes_response(dumps(await get_live_vehicles_async(db)))
+
+
+@router.get("/trips/driver/today", response_model=list[TripResponse])
+async def list_driver_trips_today_async(
+    db: AsyncDbSession,
+    driver: Driver = Depends(get_current_driver_async),
+) -> Response:
+    """Async /trips/driver/today."""
+    return json_bytes_response(encode_trip_rows(await db.execute(driver_trips_today_rows_stmt(driver.id))))
+
+
+@router.get("/preset-locations/nearby")
+async def get_nearby_preset_location_async(
+    db: AsyncDbSession,
+    lat: float = Query(..., description="Latitude"),
+    lng: float = Query(..., description="Longitude"),
+    organization_id: int = Query(..., description="Organization ID"),
+) -> Optional[PresetLocationResponse]:
+    """Async /preset-locations/nearby."""
+    presets = await db.scalars(active_presets_stmt(organization_id))
+    preset = match_preset_location(presets, lat, lng)
+    if preset:
+        return PresetLocationResponse.model_validate(preset)
+    return None
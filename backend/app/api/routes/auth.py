@@ -1,25 +1,38 @@
 """Authentication routes - driver and admin login."""
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 
-from app.api.deps import DbSession, get_current_driver
-from app.core.security import create_access_token, verify_password
+from app.api.deps import AsyncDbSession, get_current_driver
+from app.core.password_hasher import PasswordHasherBusy, verify_password_async
+from app.core.security import create_access_token
 from app.models import AdminUser, Driver
 from app.schemas.auth import AdminLoginRequest, DriverLoginResponse, LoginRequest, TokenResponse
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+async def _password_matches(plain_password: str, hashed_password: str) -> bool:
+    """bcrypt on the bounded password executor; a full queue answers 503 rather than waiting."""
+    try:
+        return await verify_password_async(plain_password, hashed_password)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many logins in progress, please retry",
+            headers={"Retry-After": "2"},
+        )
+
+
 @router.post("/login", response_model=DriverLoginResponse)
-def driver_login(data: LoginRequest, db: DbSession) -> DriverLoginResponse:
+async def driver_login(data: LoginRequest, db: AsyncDbSession) -> DriverLoginResponse:
     """Driver login using user_id and password. Returns JWT."""
-    driver = db.query(Driver).filter(Driver.user_id == data.user_id).first()
+    driver = await db.scalar(select(Driver).where(Driver.user_id == data.user_id).limit(1))
     if not driver or not driver.active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid user ID or password",
         )
-    if not verify_password(data.password, driver.password_hash):
+    if not await _password_matches(data.password, driver.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid user ID or password",
@@ -39,15 +52,15 @@ def driver_me(driver: Driver = Depends(get_current_driver)) -> dict:
 
 
 @router.post("/admin-login")
-def admin_login(data: AdminLoginRequest, db: DbSession) -> dict:
+async def admin_login(data: AdminLoginRequest, db: AsyncDbSession) -> dict:
     """Admin login using username and password. Returns JWT."""
-    admin = db.query(AdminUser).filter(AdminUser.username == data.username).first()
+    admin = await db.scalar(select(AdminUser).where(AdminUser.username == data.username))
     if not admin or not admin.active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
         )
-    if not verify_password(data.password, admin.password_hash):
+    if not await _password_matches(data.password, admin.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
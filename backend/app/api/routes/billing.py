@@ -1,13 +1,30 @@
 """Billing routes - invoices for trips."""
+from datetime import date
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
 
 from app.api.deps import DbSession, get_current_admin
-from app.models import Invoice, Trip
-from app.schemas.billing import InvoiceResponse, InvoiceWithTripResponse
-from app.services.billing_service import calculate_trip_cost, create_invoice
+from app.core.config import settings
+from app.models import BillingRun, Invoice, Trip
+from app.schemas.billing import BillingRunCreate, BillingRunResponse, InvoiceResponse, InvoiceWithTripResponse
+from app.services.billing_run_service import (
+    create_billing_run,
+    execute_billing_run,
+    expire_stale_runs,
+    find_overlapping_run,
+)
+from app.services.billing_service import (
+    calculate_trip_cost,
+    create_invoice,
+    invoice_details,
+    invoice_details_list,
+    invoice_details_query,
+)
+from app.services.invoice_pdf import invoice_pdf, iter_invoice_pdfs, pdf_filename, zip_stream
+from app.services.rollup_service import record_revenue_change
 
 router = APIRouter(prefix="/billing", tags=["billing"], dependencies=[Depends(get_current_admin)])
 
@@ -24,6 +41,31 @@ def list_invoices(
     return q.order_by(Invoice.created_at.desc()).all()
 
 
+@router.get("/invoices/pdf.zip")
+def download_invoice_pdfs(
+    db: DbSession,
+    organization_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    invoice_status: Optional[str] = Query(None, alias="status"),
+) -> StreamingResponse:
+    """ZIP of the PDFs of all invoices created in the period (up to INVOICE_ZIP_MAX_INVOICES).
+    Uncached PDFs are rendered in a process pool while the ZIP streams."""
+    items = invoice_details_list(db, organization_id, date_from, date_to, invoice_status, settings.invoice_zip_max_invoices + 1)
+    if len(items) > settings.invoice_zip_max_invoices:
+        raise HTTPException(
+            status_code=400,
+            detail=f"More than {settings.invoice_zip_max_invoices} invoices match; narrow the date range",
+        )
+    files = ((pdf_filename(data), pdf, data["created_at"]) for data, pdf in iter_invoice_pdfs(items))
+    name = "invoices" + "".join(f"-{v}" for v in (date_from, date_to) if v)
+    return StreamingResponse(
+        zip_stream(files),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{name}.zip"'},
+    )
+
+
 @router.get("/invoices/{invoice_id}", response_model=InvoiceResponse)
 def get_invoice(invoice_id: int, db: DbSession) -> Invoice:
     """Get invoice by ID."""
@@ -34,48 +76,25 @@ def get_invoice(invoice_id: int, db: DbSession) -> Invoice:
 
 
 @router.get("/invoices/{invoice_id}/details", response_model=InvoiceWithTripResponse)
-def get_invoice_with_trip(invoice_id: int, db: DbSession) -> InvoiceWithTripResponse:
+def get_invoice_with_trip(invoice_id: int, db: DbSession) -> dict:
     """Get invoice with full trip details for PDF generation."""
-    inv = (
-        db.query(Invoice)
-        .options(joinedload(Invoice.trip).joinedload(Trip.driver))
-        .options(joinedload(Invoice.trip).joinedload(Trip.vehicle))
-        .options(joinedload(Invoice.trip).joinedload(Trip.source_preset))
-        .options(joinedload(Invoice.trip).joinedload(Trip.destination_preset))
-        .options(joinedload(Invoice.trip).joinedload(Trip.organization))
-        .filter(Invoice.id == invoice_id)
-        .first()
-    )
+    inv = invoice_details_query(db).filter(Invoice.id == invoice_id).first()
+    if not inv or not inv.trip:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+    return invoice_details(inv)
+
+
+@router.get("/invoices/{invoice_id}/pdf")
+def get_invoice_pdf(invoice_id: int, db: DbSession) -> Response:
+    """Invoice PDF (same layout as the admin app's), cached per invoice and status."""
+    inv = invoice_details_query(db).filter(Invoice.id == invoice_id).first()
     if not inv or not inv.trip:
         raise HTTPException(status_code=404, detail="Invoice not found")
-    t = inv.trip
-    pickup = t.source_preset.name if t.source_preset else None
-    if not pickup and t.pickup_lat is not None and t.pickup_lng is not None:
-        pickup = f"GPS: {t.pickup_lat:.4f}, {t.pickup_lng:.4f}"
-    drop = t.destination_preset.name if t.destination_preset else None
-    if not drop and t.drop_lat is not None and t.drop_lng is not None:
-        drop = f"GPS: {t.drop_lat:.4f}, {t.drop_lng:.4f}"
-    org = t.organization if hasattr(t, "organization") else None
-    return InvoiceWithTripResponse(
-        id=inv.id,
-        trip_id=inv.trip_id,
-        amount=inv.amount,
-        invoice_number=inv.invoice_number,
-        status=inv.status,
-        created_at=inv.created_at,
-        driver_name=t.driver.name if t.driver else None,
-        driver_mobile=t.driver.mobile if t.driver else None,
-        vehicle_registration=t.vehicle.registration_number if t.vehicle else None,
-        start_time=t.start_time,
-        end_time=t.end_time,
-        distance_km=t.distance_km,
-        total_amount=t.total_amount,
-        pickup_location=pickup,
-        drop_location=drop,
-        organization_name=org.name if org else None,
-        organization_address=org.address if org else None,
-        organization_phone=org.phone if org else None,
-        organization_email=org.email if org else None,
+    data = invoice_details(inv)
+    return Response(
+        content=invoice_pdf(data),
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="{pdf_filename(data)}"'},
     )
 
 
@@ -87,7 +106,42 @@ def generate_invoice(trip_id: int, db: DbSession) -> Invoice:
         raise HTTPException(status_code=404, detail="Trip not found")
     amount = calculate_trip_cost(db, trip)
     invoice = create_invoice(db, trip, amount)
+    previous_amount = trip.total_amount
     trip.total_amount = amount
+    record_revenue_change(db, trip, previous_amount)
     db.commit()
     db.refresh(invoice)
     return invoice
+
+
+@router.post("/runs", response_model=BillingRunResponse, status_code=status.HTTP_202_ACCEPTED)
+def start_billing_run(data: BillingRunCreate, background_tasks: BackgroundTasks, db: DbSession) -> BillingRun:
+    """Invoice every completed, not yet invoiced trip of the period in the background.
+    Poll GET /billing/runs/{id} for progress."""
+    running = find_overlapping_run(db, data.organization_id, data.date_from, data.date_to)
+    if running:
+        raise HTTPException(status_code=409, detail=f"Billing run {running.id} for an overlapping period is {running.status}")
+    run = create_billing_run(db, data.organization_id, data.date_from, data.date_to)
+    db.commit()
+    db.refresh(run)
+    background_tasks.add_task(execute_billing_run, run.id)
+    return run
+
+
+@router.get("/runs", response_model=list[BillingRunResponse])
+def list_billing_runs(db: DbSession, limit: int = Query(20, ge=1, le=200)) -> list[BillingRun]:
+    """Most recent billing runs first; runs that stopped making progress show as failed."""
+    if expire_stale_runs(db):
+        db.commit()
+    return db.query(BillingRun).order_by(BillingRun.id.desc()).limit(limit).all()
+
+
+@router.get("/runs/{run_id}", response_model=BillingRunResponse)
+def get_billing_run(run_id: int, db: DbSession) -> BillingRun:
+    """Billing run with its progress (processed_trips of total_trips)."""
+    if expire_stale_runs(db):
+        db.commit()
+    run = db.query(BillingRun).filter(BillingRun.id == run_id).first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Billing run not found")
+    return run
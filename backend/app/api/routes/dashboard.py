@@ -0,0 +1,58 @@
+"""Dashboard routes - period totals from the daily rollup tables (admin only)."""
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+
+from app.api.deps import DbSession, get_current_admin
+from app.schemas.dashboard import DashboardSummary, DriverFleetTotals, FleetDay, VehicleFleetTotals
+from app.services.rollup_service import expense_totals, fleet_by_driver, fleet_by_vehicle, fleet_daily, fleet_totals
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"], dependencies=[Depends(get_current_admin)])
+
+
+@router.get("/summary", response_model=DashboardSummary)
+def dashboard_summary(
+    db: DbSession,
+    organization_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+) -> dict:
+    """Trips, distance, revenue, invoices and expenses for the period."""
+    return {
+        "fleet": fleet_totals(db, organization_id, date_from, date_to),
+        "expenses": expense_totals(db, organization_id, None, date_from, date_to),
+    }
+
+
+@router.get("/daily", response_model=list[FleetDay])
+def dashboard_daily(
+    db: DbSession,
+    organization_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+) -> list[dict]:
+    """Fleet totals per day (days without activity are omitted)."""
+    return fleet_daily(db, organization_id, date_from, date_to)
+
+
+@router.get("/vehicles", response_model=list[VehicleFleetTotals])
+def dashboard_vehicles(
+    db: DbSession,
+    organization_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+) -> list[dict]:
+    """Fleet totals per vehicle, highest revenue first."""
+    return fleet_by_vehicle(db, organization_id, date_from, date_to)
+
+
+@router.get("/drivers", response_model=list[DriverFleetTotals])
+def dashboard_drivers(
+    db: DbSession,
+    organization_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+) -> list[dict]:
+    """Fleet totals per driver, most trips first."""
+    return fleet_by_driver(db, organization_id, date_from, date_to)
@@ -0,0 +1,43 @@
+"""Driver app bootstrap - profile, vehicles, presets, destinations and today's trips in one call."""
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import select
+
+from app.api.deps import DbSession, get_current_driver
+from app.core.http_cache import conditional_json
+from app.models import Driver, PresetLocation, Vehicle
+from app.schemas.driver import DriverBootstrapResponse
+from app.schemas.preset_destination import PresetDestinationResponse
+from app.schemas.preset_location import PresetLocationResponse
+from app.schemas.vehicle import VehicleResponse
+from app.services.tariff_service import destination_adjacency
+from app.services.trip_service import driver_trips_today_stmt, trip_to_driver_response
+
+router = APIRouter(prefix="/driver", tags=["driver"])
+
+
+@router.get("/bootstrap", response_model=DriverBootstrapResponse)
+def driver_bootstrap(request: Request, db: DbSession, driver: Driver = Depends(get_current_driver)) -> Response:
+    """Replaces /auth/me, /vehicles/for-driver, /preset-locations/for-driver, per-source destinations
+    and /trips/driver/today on app start. Three queries (destinations come from the cached adjacency);
+    ETag is a hash of the body, so an unchanged warm start gets 304 with no payload."""
+    org_id = driver.organization_id
+    vehicles = db.scalars(select(Vehicle).where(Vehicle.organization_id == org_id).order_by(Vehicle.id)).all()
+    presets = db.scalars(
+        select(PresetLocation)
+        .where(PresetLocation.organization_id == org_id, PresetLocation.active == True)
+        .order_by(PresetLocation.id)
+    ).all()
+    trips = db.scalars(driver_trips_today_stmt(driver.id)).unique().all()
+
+    destinations_by_source = {
+        source_id: [PresetDestinationResponse.model_validate(d) for d in dests]
+        for source_id, dests in destination_adjacency(db, org_id).items()
+    }
+    payload = DriverBootstrapResponse(
+        me={"id": driver.id, "organization_id": org_id, "name": driver.name},
+        vehicles=[VehicleResponse.model_validate(v) for v in vehicles],
+        preset_locations=[PresetLocationResponse.model_validate(p) for p in presets],
+        destinations_by_source=destinations_by_source,
+        trips_today=[trip_to_driver_response(t) for t in trips],
+    )
+    return conditional_json(request, payload.model_dump_json().encode())
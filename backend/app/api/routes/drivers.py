@@ -2,11 +2,14 @@
 import logging
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
 from app.api.deps import DbSession, get_current_admin
+from app.core.http_cache import check_not_modified
+from app.core.principal_cache import invalidate_principal
 from app.core.security import hash_password
+from app.db.locks import xact_lock
 from app.models import Driver, Organization
 from app.schemas.driver import DriverCreate, DriverUpdate, DriverResponse
 
@@ -15,11 +18,16 @@ router = APIRouter(prefix="/drivers", tags=["drivers"], dependencies=[Depends(ge
 
 @router.get("", response_model=list[DriverResponse])
 def list_drivers(
+    request: Request,
+    response: Response,
     db: DbSession,
     organization_id: Optional[int] = Query(None),
     active_only: bool = Query(True),
 ) -> list[Driver]:
     """List drivers, optionally filtered by organization."""
+    cached = check_not_modified(request, response, ("drivers", organization_id or None))
+    if cached:
+        return cached
     q = db.query(Driver)
     if organization_id:
         q = q.filter(Driver.organization_id == organization_id)
@@ -38,15 +46,19 @@ def create_driver(data: DriverCreate, db: DbSession) -> Driver:
         org = db.query(Organization).filter(Organization.id == data.organization_id).first()
         if not org:
             raise HTTPException(status_code=400, detail=f"Organization {data.organization_id} not found. Run seed_data.py first.")
-        existing = db.query(Driver).filter(Driver.user_id == data.user_id).first()
-        if existing:
+        if db.query(Driver).filter(Driver.user_id == data.user_id).first():
+            raise HTTPException(status_code=400, detail="User ID already registered")
+        password_hash = hash_password(data.password)
+        # Check again under the lock imports take too: another request may have registered it while bcrypt ran.
+        xact_lock(db, "driver_logins")
+        if db.query(Driver).filter(Driver.user_id == data.user_id).first():
             raise HTTPException(status_code=400, detail="User ID already registered")
         d = Driver(
             organization_id=data.organization_id,
             name=data.name,
             user_id=data.user_id,
             mobile=(data.mobile or "").strip() or None,
-            password_hash=hash_password(data.password),
+            password_hash=password_hash,
             license_number=data.license_number,
             active=data.active,
         )
@@ -77,22 +89,25 @@ def update_driver(driver_id: int, data: DriverUpdate, db: DbSession) -> Driver:
     d = db.query(Driver).filter(Driver.id == driver_id).first()
     if not d:
         raise HTTPException(status_code=404, detail="Driver not found")
+    if data.password is not None:
+        d.password_hash = hash_password(data.password)  # before taking the lock below
     if data.name is not None:
         d.name = data.name
-    if data.user_id is not None:
+    if data.user_id is not None and data.user_id != d.user_id:
+        xact_lock(db, "driver_logins")  # held until commit, like imports and create_driver
         other = db.query(Driver).filter(Driver.user_id == data.user_id, Driver.id != driver_id).first()
         if other:
             raise HTTPException(status_code=400, detail="User ID already in use")
         d.user_id = data.user_id
     if data.mobile is not None:
         d.mobile = data.mobile.strip() or None
-    if data.password is not None:
-        d.password_hash = hash_password(data.password)
     if data.license_number is not None:
         d.license_number = data.license_number
     if data.active is not None:
         d.active = data.active
     db.commit()
+    # Cached copies hold the old name/active/password hash; drop them in every worker.
+    invalidate_principal("driver", str(driver_id))
     db.refresh(d)
     return d
 
@@ -105,4 +120,5 @@ def delete_driver(driver_id: int, db: DbSession) -> dict:
         raise HTTPException(status_code=404, detail="Driver not found")
     db.delete(d)
     db.commit()
+    invalidate_principal("driver", str(driver_id))
     return {"status": "deleted"}
@@ -0,0 +1,74 @@
+"""Export routes - stream trips, invoices and expenses as NDJSON or CSV (admin only)."""
+from datetime import date
+from typing import Iterator, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_current_admin
+from app.core.compression import accepts_encoding
+from app.services.export_service import EXPORT_FORMATS, stream_expenses, stream_invoices, stream_trips
+from app.services.trip_service import trip_filters
+
+router = APIRouter(prefix="/exports", tags=["exports"], dependencies=[Depends(get_current_admin)])
+
+ExportFormat = Literal["ndjson", "csv"]
+
+
+def _accepts_gzip(request: Request) -> bool:
+    return accepts_encoding(request.headers.get("accept-encoding", ""), "gzip")
+
+
+def _export_response(body: Iterator[bytes], name: str, fmt: str, gzip: bool) -> StreamingResponse:
+    headers = {
+        "Content-Disposition": f'attachment; filename="{name}-{date.today().isoformat()}.{fmt}"',
+        "Vary": "Accept-Encoding",
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=EXPORT_FORMATS[fmt], headers=headers)
+
+
+@router.get("/trips")
+def export_trips(
+    request: Request,
+    format: ExportFormat = Query("ndjson"),
+    organization_id: Optional[int] = Query(None),
+    driver_id: Optional[int] = Query(None),
+    vehicle_id: Optional[int] = Query(None),
+    status: Optional[str] = Query(None),
+    date_from: Optional[date] = Query(None, description="Filter trips from this date (inclusive)"),
+    date_to: Optional[date] = Query(None, description="Filter trips until this date (inclusive)"),
+) -> StreamingResponse:
+    """Stream trips with the same filters and columns as GET /trips."""
+    gzip = _accepts_gzip(request)
+    filters = trip_filters(organization_id, driver_id, vehicle_id, status, date_from, date_to)
+    return _export_response(stream_trips(filters, format, gzip), "trips", format, gzip)
+
+
+@router.get("/invoices")
+def export_invoices(
+    request: Request,
+    format: ExportFormat = Query("ndjson"),
+    trip_id: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+) -> StreamingResponse:
+    """Stream invoices (GET /billing/invoices filters plus a created-date range)."""
+    gzip = _accepts_gzip(request)
+    return _export_response(stream_invoices(trip_id, date_from, date_to, format, gzip), "invoices", format, gzip)
+
+
+@router.get("/expenses")
+def export_expenses(
+    request: Request,
+    format: ExportFormat = Query("ndjson"),
+    vehicle_id: Optional[int] = Query(None),
+    expense_type: Optional[str] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+) -> StreamingResponse:
+    """Stream vehicle expenses with the same filters as GET /vehicle-expenses."""
+    gzip = _accepts_gzip(request)
+    body = stream_expenses(vehicle_id, expense_type, date_from, date_to, format, gzip)
+    return _export_response(body, "expenses", format, gzip)
@@ -1,9 +1,9 @@
 """GPS routes - update location and get live positions."""
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, Response
 
-from app.api.deps import DbSession, get_current_admin
-from app.models import Vehicle, Trip
+from app.api.deps import DbSession, DeviceToken, check_device_token, get_current_admin
+from app.core.metrics import GPS_POINTS, GPS_POINTS_LOGGED
+from app.core.serialization import dumps, json_bytes_response
 from app.schemas.gps import GPSUpdateRequest, VehicleLocationResponse
 from app.services.gps_service import GPSService
 
@@ -11,8 +11,13 @@ router = APIRouter(prefix="/gps", tags=["gps"])
 
 
 @router.post("/update")
-def update_gps(data: GPSUpdateRequest, db: DbSession) -> dict:
-    """Update vehicle GPS location. Stores in Redis for live tracking and in DB if trip_id provided."""
+def update_gps(data: GPSUpdateRequest, db: DbSession, x_device_token: DeviceToken = None) -> dict:
+    """Update vehicle GPS location. Stores in Redis for live tracking and in DB if trip_id provided.
+
+    Authenticated by the X-Device-Token issued at trip start (see check_device_token).
+    """
+    check_device_token(x_device_token, data.vehicle_id, data.trip_id)
+    GPS_POINTS.inc()
     svc = GPSService(db)
     svc.update_vehicle_location(
         vehicle_id=data.vehicle_id,
@@ -27,68 +32,11 @@ def update_gps(data: GPSUpdateRequest, db: DbSession) -> dict:
             longitude=data.longitude,
             trip_id=data.trip_id,
         )
+        GPS_POINTS_LOGGED.inc()
     return {"status": "ok"}
 
 
-@router.get("/vehicles/live")
-def get_live_vehicles(db: DbSession, _admin=Depends(get_current_admin)) -> list[VehicleLocationResponse]:
+@router.get("/vehicles/live", response_model=list[VehicleLocationResponse])
+def get_live_vehicles(db: DbSession, _admin=Depends(get_current_admin)) -> Response:
     """Get live vehicle locations from Redis, enriched with vehicle number and trip preset names."""
-    svc = GPSService(db)
-    locations = svc.get_live_vehicle_locations()
-    result = []
-    for loc in locations:
-        vehicle_id = loc["vehicle_id"]
-        vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
-        reg_no = vehicle.registration_number if vehicle else str(vehicle_id)
-
-        pickup_lat = None
-        pickup_lng = None
-        dest_lat = None
-        dest_lng = None
-        driver_name = None
-        trip_id = loc.get("trip_id")
-        if trip_id:
-            trip = (
-                db.query(Trip)
-                .options(
-                    joinedload(Trip.source_preset),
-                    joinedload(Trip.destination_preset),
-                    joinedload(Trip.driver),
-                )
-                .filter(Trip.id == trip_id)
-                .first()
-            )
-            if trip:
-                driver_name = trip.driver.name if trip.driver else None
-                if trip.source_preset:
-                    pickup_lat = trip.source_preset.latitude
-                    pickup_lng = trip.source_preset.longitude
-                elif trip.pickup_lat is not None and trip.pickup_lng is not None:
-                    pickup_lat = trip.pickup_lat
-                    pickup_lng = trip.pickup_lng
-                if trip.destination_preset:
-                    dest_lat = trip.destination_preset.latitude
-                    dest_lng = trip.destination_preset.longitude
-                elif trip.drop_lat is not None and trip.drop_lng is not None:
-                    dest_lat = trip.drop_lat
-                    dest_lng = trip.drop_lng
-
-        result.append(
-            VehicleLocationResponse(
-                vehicle_id=vehicle_id,
-                registration_number=reg_no,
-                driver_name=driver_name,
-                latitude=loc["latitude"],
-                longitude=loc["longitude"],
-                last_updated=loc["last_updated"],
-                trip_id=trip_id,
-                pickup_location_name=None,
-                pickup_lat=pickup_lat,
-                pickup_lng=pickup_lng,
-                destination_name=None,
-                destination_lat=dest_lat,
-                destination_lng=dest_lng,
-                current_location_name=None,
-            )
-        )
-    return result
+    return json_bytes_response(dumps(GPSService(db).get_live_vehicles()))
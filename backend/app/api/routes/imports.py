@@ -0,0 +1,69 @@
+"""Import routes - bulk CSV onboarding of an organization's vehicles, drivers, presets, tariffs and expenses."""
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from starlette.concurrency import run_in_threadpool
+
+from app.api.deps import AsyncDbSession, get_current_admin_async
+from app.core.password_hasher import PasswordHasherBusy
+from app.models import Organization
+from app.schemas.imports import ImportErrorReport, ImportResult
+from app.services.import_service import (
+    ImportConflict,
+    bump_import_versions,
+    hash_passwords,
+    read_csv,
+    validate_import,
+    write_import,
+)
+
+router = APIRouter(prefix="/imports", tags=["imports"], dependencies=[Depends(get_current_admin_async)])
+
+ImportKind = Literal["vehicles", "drivers", "preset_locations", "fixed_tariffs", "vehicle_expenses"]
+
+
+@router.post("/{kind}", response_model=ImportResult, responses={422: {"model": ImportErrorReport}})
+async def import_csv(
+    kind: ImportKind,
+    request: Request,
+    db: AsyncDbSession,
+    organization_id: int = Query(...),
+    dry_run: bool = Query(False),
+) -> dict:
+    """Import a CSV request body (text/csv, header row with the create endpoint's field names) into one organization.
+
+    Fixed tariffs may name their source / destination instead of giving ids; expenses may give the
+    vehicle's registration_number instead of vehicle_id. All rows are written in one transaction, or
+    none: any invalid row rejects the file with 422 and a per-row error report. A driver user ID
+    registered by a concurrent request after validation rejects the file with 409.
+    """
+    try:
+        rows = read_csv(await request.body())
+    except ValueError as e:  # includes UnicodeDecodeError
+        raise HTTPException(status_code=400, detail=f"Invalid CSV: {e}")
+    if not await db.get(Organization, organization_id):
+        raise HTTPException(status_code=400, detail=f"Organization {organization_id} not found")
+    records, errors = await db.run_sync(validate_import, kind, organization_id, rows)
+    if errors:
+        raise HTTPException(status_code=422, detail={"rows": len(rows), "errors": errors})
+    result = {"kind": kind, "rows": len(rows), "created": 0, "dry_run": dry_run}
+    if dry_run:
+        return result
+    if kind == "drivers":
+        await db.rollback()  # do not hold the read transaction open while bcrypt runs
+        try:
+            await hash_passwords(records)
+        except PasswordHasherBusy:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Password hashing is busy, please retry",
+                headers={"Retry-After": "5"},
+            )
+    try:
+        result["created"] = await db.run_sync(write_import, kind, organization_id, records)
+    except ImportConflict as e:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=f"{e}; registered by another request meanwhile, nothing was imported")
+    await db.commit()
+    await run_in_threadpool(bump_import_versions, kind, organization_id)  # sync Redis client
+    return result
@@ -1,10 +1,11 @@
 """Organization routes - CRUD for admin."""
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
 from app.api.deps import DbSession, get_current_admin
+from app.core.http_cache import check_not_modified
 from app.models import Organization
 from app.schemas.organization import OrganizationCreate, OrganizationUpdate, OrganizationResponse
 
@@ -13,10 +14,15 @@ router = APIRouter(prefix="/organizations", tags=["organizations"], dependencies
 
 @router.get("", response_model=list[OrganizationResponse])
 def list_organizations(
+    request: Request,
+    response: Response,
     db: DbSession,
     active_only: bool = Query(True),
 ) -> list[Organization]:
     """List organizations."""
+    cached = check_not_modified(request, response, ("organizations", None))
+    if cached:
+        return cached
     q = db.query(Organization)
     if active_only:
         q = q.filter(Organization.active == True)
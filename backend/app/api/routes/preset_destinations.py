@@ -1,40 +1,52 @@
 """Preset destination routes - CRUD and dropdown by source."""
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
-from app.api.deps import DbSession, get_current_admin
-from app.models import FixedTariff, PresetDestination
+from app.api.deps import DbSession, get_current_admin, get_current_admin_or_driver
+from app.core.http_cache import check_not_modified
+from app.models import Driver, PresetDestination
 from app.schemas.preset_destination import (
     PresetDestinationCreate,
     PresetDestinationUpdate,
     PresetDestinationResponse,
 )
+from app.services.tariff_service import destination_adjacency
 
 router = APIRouter(prefix="/preset-destinations", tags=["preset-destinations"])
 
 
 @router.get("", response_model=list[PresetDestinationResponse])
-def list_preset_destinations(db: DbSession, _admin=Depends(get_current_admin)) -> list[PresetDestination]:
+def list_preset_destinations(
+    request: Request, response: Response, db: DbSession, _admin=Depends(get_current_admin)
+) -> list[PresetDestination]:
     """List all preset destinations."""
+    cached = check_not_modified(request, response, ("preset_destinations", None))
+    if cached:
+        return cached
     return db.query(PresetDestination).all()
 
 
 @router.get("/by-source/{source_id}", response_model=list[PresetDestinationResponse])
 def get_destinations_for_source(
     source_id: int,
+    request: Request,
+    response: Response,
     db: DbSession,
+    user=Depends(get_current_admin_or_driver),
     organization_id: int | None = Query(None),
-) -> list[PresetDestination]:
-    """Get preset destinations that have a fixed tariff from the given source (preset location)."""
-    q = (
-        db.query(PresetDestination)
-        .join(FixedTariff, FixedTariff.destination_id == PresetDestination.id)
-        .filter(FixedTariff.source_id == source_id)
+) -> list[dict]:
+    """Preset destinations with a fixed tariff from the given source (preset location), sorted by name,
+    with the tariff amount. Drivers get their own organization's; admins pass organization_id."""
+    if isinstance(user, Driver):
+        organization_id = user.organization_id
+    elif not organization_id:
+        raise HTTPException(status_code=400, detail="organization_id is required")
+    cached = check_not_modified(
+        request, response, ("preset_destinations", None), ("fixed_tariffs", organization_id)
     )
-    if organization_id is not None:
-        q = q.filter(FixedTariff.organization_id == organization_id)
-    dests = q.distinct().all()
-    return [PresetDestinationResponse.model_validate(d) for d in dests]
+    if cached:
+        return cached
+    return destination_adjacency(db, organization_id).get(source_id, [])
 
 
 @router.post("", response_model=PresetDestinationResponse)
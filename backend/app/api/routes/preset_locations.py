@@ -1,10 +1,11 @@
 """Preset location routes - CRUD and nearby auto-detection."""
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
 from app.api.deps import DbSession, get_current_admin, get_current_driver
+from app.core.http_cache import check_not_modified
 from app.models import Organization, PresetLocation
 from app.schemas.preset_location import (
     PresetLocationCreate,
@@ -17,8 +18,13 @@ router = APIRouter(prefix="/preset-locations", tags=["preset-locations"])
 
 
 @router.get("/for-driver", response_model=list[PresetLocationResponse])
-def list_preset_locations_for_driver(db: DbSession, driver=Depends(get_current_driver)) -> list[PresetLocation]:
+def list_preset_locations_for_driver(
+    request: Request, response: Response, db: DbSession, driver=Depends(get_current_driver)
+) -> list[PresetLocation]:
     """List preset locations for the driver's organization. Driver-only endpoint."""
+    cached = check_not_modified(request, response, ("preset_locations", driver.organization_id))
+    if cached:
+        return cached
     return db.query(PresetLocation).filter(
         PresetLocation.organization_id == driver.organization_id,
         PresetLocation.active == True,
@@ -27,11 +33,16 @@ def list_preset_locations_for_driver(db: DbSession, driver=Depends(get_current_d
 
 @router.get("", response_model=list[PresetLocationResponse])
 def list_preset_locations(
+    request: Request,
+    response: Response,
     db: DbSession,
     _admin=Depends(get_current_admin),
     organization_id: Optional[int] = Query(None),
 ) -> list[PresetLocation]:
     """List preset locations, optionally filtered by organization."""
+    cached = check_not_modified(request, response, ("preset_locations", organization_id or None))
+    if cached:
+        return cached
     q = db.query(PresetLocation)
     if organization_id:
         q = q.filter(PresetLocation.organization_id == organization_id)
@@ -1,9 +1,10 @@
 """Tariff routes - fixed tariffs CRUD and queries."""
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
 from app.api.deps import DbSession, get_current_admin, get_current_admin_or_driver
-from app.models import FixedTariff
+from app.core.http_cache import check_not_modified
+from app.models import Driver, FixedTariff
 from app.models import DistanceTariffConfig
 from app.schemas.tariff import (
     FixedTariffCreate,
@@ -11,11 +12,14 @@ from app.schemas.tariff import (
     FixedTariffResponse,
     FallbackTariffResponse,
     FallbackTariffUpdate,
+    TariffQuoteRequest,
+    TariffQuoteResponse,
 )
 from app.services.tariff_service import (
     get_fixed_tariff,
     calculate_distance_tariff,
     get_fallback_rate_per_km,
+    quote_tariffs,
 )
 
 router = APIRouter(prefix="/tariffs", tags=["tariffs"])
@@ -47,6 +51,21 @@ def get_distance_tariff(
     return {"distance_km": distance_km, "amount": amount}
 
 
+@router.post("/quote", response_model=list[TariffQuoteResponse])
+def quote_tariffs_endpoint(
+    data: TariffQuoteRequest,
+    db: DbSession,
+    user=Depends(get_current_admin_or_driver),
+) -> list[dict]:
+    """Quote every candidate destination of a pickup preset in one call (fixed tariff if one exists,
+    else distance pricing), from the in-memory tariff table. Replaces per-destination /fixed and
+    /distance calls."""
+    organization_id = user.organization_id if isinstance(user, Driver) else data.organization_id
+    if not organization_id:
+        raise HTTPException(status_code=400, detail="organization_id is required")
+    return quote_tariffs(db, organization_id, data.source_id, data.items)
+
+
 @router.get("/fallback", response_model=FallbackTariffResponse)
 def get_fallback_tariff(db: DbSession, _admin=Depends(get_current_admin)) -> dict:
     """Get fallback (distance) tariff rate per km."""
@@ -70,11 +89,16 @@ def update_fallback_tariff(data: FallbackTariffUpdate, db: DbSession, _admin=Dep
 
 @router.get("", response_model=list[FixedTariffResponse])
 def list_fixed_tariffs(
+    request: Request,
+    response: Response,
     db: DbSession,
     _admin=Depends(get_current_admin),
     organization_id: int | None = Query(None),
 ) -> list[FixedTariff]:
     """List fixed tariffs, optionally filtered by organization."""
+    cached = check_not_modified(request, response, ("fixed_tariffs", organization_id or None))
+    if cached:
+        return cached
     q = db.query(FixedTariff)
     if organization_id:
         q = q.filter(FixedTariff.organization_id == organization_id)
@@ -2,14 +2,24 @@
 from datetime import date
 from typing import Optional
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, func
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session
 
 from app.api.deps import DbSession, get_current_admin, get_current_admin_or_driver, get_current_driver
+from app.core.device_tokens import issue_device_token, revoke_trip_tokens
+from app.core.serialization import dumps, json_bytes_response
 from app.models import Driver, Trip
 from app.schemas.trip import TripCreate, TripEndRequest, TripResponse
-from app.services.trip_service import create_trip, start_trip, end_trip
+from app.services.trip_service import (
+    create_trip,
+    driver_trips_today_rows_stmt,
+    encode_trip_rows,
+    end_trip,
+    start_trip,
+    trip_filters,
+    trip_row_to_dict,
+    trip_rows_stmt,
+)
 
 router = APIRouter(prefix="/trips", tags=["trips"])
 
@@ -18,45 +28,9 @@ router = APIRouter(prefix="/trips", tags=["trips"])
 def list_driver_trips_today(
     db: DbSession,
     driver: Driver = Depends(get_current_driver),
-) -> list[Trip]:
+) -> Response:
     """List current driver's trips for today (completed or in progress)."""
-    today = date.today()
-    q = (
-        db.query(Trip)
-        .options(
-            joinedload(Trip.source_preset),
-            joinedload(Trip.destination_preset),
-        )
-        .filter(Trip.driver_id == driver.id)
-        .filter(
-            or_(
-                func.date(Trip.start_time) == today,
-                func.date(Trip.end_time) == today,
-                func.date(Trip.created_at) == today,
-            )
-        )
-    )
-    trips = q.order_by(Trip.created_at.desc()).all()
-    return [
-        TripResponse(
-            **{k: getattr(t, k) for k in ("id", "organization_id", "driver_id", "vehicle_id", "source_preset_id", "destination_preset_id", "pickup_lat", "pickup_lng", "drop_lat", "drop_lng", "start_time", "end_time", "distance_km", "is_fixed_tariff", "total_amount", "status")},
-            pickup_location_name=t.source_preset.name if t.source_preset else ("GPS pickup" if (t.pickup_lat and t.pickup_lng) else None),
-            destination_name=t.destination_preset.name if t.destination_preset else ("GPS destination" if (t.drop_lat and t.drop_lng) else None),
-        )
-        for t in trips
-    ]
-
-
-def _trip_to_response(t):
-    """Build TripResponse with driver_name and vehicle_registration_number."""
-    pickup_name = t.source_preset.name if t.source_preset else ("GPS pickup" if (t.pickup_lat is not None and t.pickup_lng is not None) else None)
-    dest_name = t.destination_preset.name if t.destination_preset else ("GPS destination" if (t.drop_lat is not None and t.drop_lng is not None) else None)
-    base = {k: getattr(t, k) for k in ("id", "organization_id", "driver_id", "vehicle_id", "source_preset_id", "destination_preset_id", "pickup_lat", "pickup_lng", "drop_lat", "drop_lng", "start_time", "end_time", "distance_km", "is_fixed_tariff", "total_amount", "status")}
-    base["pickup_location_name"] = pickup_name
-    base["destination_name"] = dest_name
-    base["driver_name"] = t.driver.name if t.driver else None
-    base["vehicle_registration_number"] = t.vehicle.registration_number if t.vehicle else None
-    return TripResponse(**base)
+    return json_bytes_response(encode_trip_rows(db.execute(driver_trips_today_rows_stmt(driver.id))))
 
 
 @router.get("", response_model=list[TripResponse])
@@ -69,32 +43,12 @@ def list_trips(
     status: Optional[str] = Query(None),
     date_from: Optional[date] = Query(None, description="Filter trips from this date (inclusive)"),
     date_to: Optional[date] = Query(None, description="Filter trips until this date (inclusive)"),
-) -> list[Trip]:
-    """List trips with optional filters."""
-    q = (
-        db.query(Trip)
-        .options(
-            joinedload(Trip.driver),
-            joinedload(Trip.vehicle),
-            joinedload(Trip.source_preset),
-            joinedload(Trip.destination_preset),
-        )
+) -> Response:
+    """List trips with optional filters. Rows are encoded straight to JSON (see trip_rows_stmt)."""
+    stmt = trip_rows_stmt().where(
+        *trip_filters(organization_id, driver_id, vehicle_id, status, date_from, date_to)
     )
-    if organization_id:
-        q = q.filter(Trip.organization_id == organization_id)
-    if driver_id:
-        q = q.filter(Trip.driver_id == driver_id)
-    if vehicle_id:
-        q = q.filter(Trip.vehicle_id == vehicle_id)
-    if status:
-        q = q.filter(Trip.status == status)
-    trip_date = func.coalesce(func.date(Trip.start_time), func.date(Trip.created_at))
-    if date_from:
-        q = q.filter(trip_date >= date_from)
-    if date_to:
-        q = q.filter(trip_date <= date_to)
-    trips = q.order_by(Trip.created_at.desc()).all()
-    return [_trip_to_response(t) for t in trips]
+    return json_bytes_response(encode_trip_rows(db.execute(stmt)))
 
 
 @router.post("", response_model=TripResponse)
@@ -109,37 +63,49 @@ def get_trip(
     trip_id: int,
     db: DbSession,
     user=Depends(get_current_admin_or_driver),
-) -> Trip:
+) -> Response:
     """Get trip by ID. Admin can get any trip; driver can get only their own."""
-    trip = (
-        db.query(Trip)
-        .options(
-            joinedload(Trip.source_preset),
-            joinedload(Trip.destination_preset),
-        )
-        .filter(Trip.id == trip_id)
-        .first()
-    )
-    if not trip:
+    row = db.execute(trip_rows_stmt(with_people=False).where(Trip.id == trip_id)).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Trip not found")
-    if isinstance(user, Driver) and trip.driver_id != user.id:
+    if isinstance(user, Driver) and row.driver_id != user.id:
         raise HTTPException(status_code=403, detail="Not authorized to view this trip")
-    pickup_name = trip.source_preset.name if trip.source_preset else ("GPS pickup" if (trip.pickup_lat is not None and trip.pickup_lng is not None) else None)
-    dest_name = trip.destination_preset.name if trip.destination_preset else ("GPS destination" if (trip.drop_lat is not None and trip.drop_lng is not None) else None)
-    return TripResponse(
-        **{k: getattr(trip, k) for k in ("id", "organization_id", "driver_id", "vehicle_id", "source_preset_id", "destination_preset_id", "pickup_lat", "pickup_lng", "drop_lat", "drop_lng", "start_time", "end_time", "distance_km", "is_fixed_tariff", "total_amount", "status")},
-        pickup_location_name=pickup_name,
-        destination_name=dest_name,
-    )
+    return json_bytes_response(dumps(trip_row_to_dict(row)))
 
 
 @router.post("/{trip_id}/start", response_model=TripResponse)
-def start_trip_endpoint(trip_id: int, db: DbSession) -> Trip:
-    """Start a trip."""
+def start_trip_endpoint(
+    trip_id: int,
+    db: DbSession,
+    driver: Driver = Depends(get_current_driver),
+) -> TripResponse:
+    """Start the driver's own trip. The response carries the device token for the driver app's GPS updates."""
+    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    if not trip or trip.driver_id != driver.id:
+        raise HTTPException(status_code=404, detail="Trip not found")
     trip = start_trip(db, trip_id)
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found or not pending")
-    return trip
+    response = TripResponse.model_validate(trip)
+    response.device_token = issue_device_token(trip.vehicle_id, trip.id)
+    return response
+
+
+@router.post("/{trip_id}/device-token", response_model=TripResponse)
+def reissue_device_token(
+    trip_id: int,
+    db: DbSession,
+    driver: Driver = Depends(get_current_driver),
+) -> TripResponse:
+    """New device token for the driver's own in-progress trip (e.g. app reloaded on another device)."""
+    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    if not trip or trip.driver_id != driver.id:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    if trip.status != "in_progress":
+        raise HTTPException(status_code=400, detail="Trip is not in progress")
+    response = TripResponse.model_validate(trip)
+    response.device_token = issue_device_token(trip.vehicle_id, trip.id)
+    return response
 
 
 @router.post("/{trip_id}/end", response_model=TripResponse)
@@ -147,26 +113,13 @@ def end_trip_endpoint(
     trip_id: int,
     db: DbSession,
     body: TripEndRequest | None = Body(None),
-) -> Trip:
+) -> Response:
     """End a trip - calculates distance from GPS logs, bill, optional additional amount, creates invoice."""
     additional = body.additional_amount if body else None
     payment_received = body.payment_received if body else False
     trip = end_trip(db, trip_id, additional_amount=additional, payment_received=payment_received)
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found or not in progress")
-    trip = (
-        db.query(Trip)
-        .options(
-            joinedload(Trip.source_preset),
-            joinedload(Trip.destination_preset),
-        )
-        .filter(Trip.id == trip_id)
-        .first()
-    )
-    pickup_name = trip.source_preset.name if trip.source_preset else ("GPS pickup" if (trip.pickup_lat and trip.pickup_lng) else None)
-    dest_name = trip.destination_preset.name if trip.destination_preset else ("GPS destination" if (trip.drop_lat and trip.drop_lng) else None)
-    return TripResponse(
-        **{k: getattr(trip, k) for k in ("id", "organization_id", "driver_id", "vehicle_id", "source_preset_id", "destination_preset_id", "pickup_lat", "pickup_lng", "drop_lat", "drop_lng", "start_time", "end_time", "distance_km", "is_fixed_tariff", "total_amount", "status")},
-        pickup_location_name=pickup_name,
-        destination_name=dest_name,
-    )
+    revoke_trip_tokens(trip_id)
+    row = db.execute(trip_rows_stmt(with_people=False).where(Trip.id == trip_id)).first()
+    return json_bytes_response(dumps(trip_row_to_dict(row)))
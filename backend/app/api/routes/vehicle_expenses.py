@@ -4,11 +4,12 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
 from app.api.deps import DbSession, get_current_admin
 from app.models import Vehicle, VehicleExpense
 from app.schemas.vehicle_expense import VehicleExpenseCreate, VehicleExpenseResponse
+from app.services.expense_service import expense_filters
+from app.services.rollup_service import expense_totals, record_expense
 
 router = APIRouter(prefix="/vehicle-expenses", tags=["vehicle-expenses"], dependencies=[Depends(get_current_admin)])
 
@@ -22,32 +23,20 @@ def list_expenses(
     date_to: Optional[date] = Query(None),
 ) -> list[VehicleExpense]:
     """List vehicle expenses with optional filters."""
-    q = db.query(VehicleExpense)
-    if vehicle_id:
-        q = q.filter(VehicleExpense.vehicle_id == vehicle_id)
-    if expense_type:
-        q = q.filter(VehicleExpense.expense_type == expense_type)
-    if date_from:
-        q = q.filter(func.date(VehicleExpense.created_at) >= date_from)
-    if date_to:
-        q = q.filter(func.date(VehicleExpense.created_at) <= date_to)
+    q = db.query(VehicleExpense).filter(*expense_filters(vehicle_id, expense_type, date_from, date_to))
     return q.order_by(VehicleExpense.created_at.desc()).all()
 
 
 @router.get("/summary")
 def expenses_summary(
     db: DbSession,
+    organization_id: Optional[int] = Query(None),
+    vehicle_id: Optional[int] = Query(None),
     date_from: Optional[date] = Query(None),
     date_to: Optional[date] = Query(None),
 ) -> dict:
-    """Total expenses in period, for dashboard tile."""
-    q = db.query(func.coalesce(func.sum(VehicleExpense.amount), 0).label("total"))
-    if date_from:
-        q = q.filter(func.date(VehicleExpense.created_at) >= date_from)
-    if date_to:
-        q = q.filter(func.date(VehicleExpense.created_at) <= date_to)
-    row = q.first()
-    return {"total_amount": float(row.total) if row else 0}
+    """Total expenses in period (overall and per type), for dashboard tile. Reads the daily rollups."""
+    return expense_totals(db, organization_id, vehicle_id, date_from, date_to)
 
 
 @router.post("", response_model=VehicleExpenseResponse)
@@ -66,6 +55,7 @@ def create_expense(data: VehicleExpenseCreate, db: DbSession) -> VehicleExpense:
         qty_refueled=data.qty_refueled,
     )
     db.add(exp)
+    record_expense(db, exp, v.organization_id)
     db.commit()
     db.refresh(exp)
     return exp
@@ -86,6 +76,7 @@ def delete_expense(expense_id: int, db: DbSession) -> dict:
     exp = db.query(VehicleExpense).filter(VehicleExpense.id == expense_id).first()
     if not exp:
         raise HTTPException(status_code=404, detail="Expense not found")
+    record_expense(db, exp, exp.vehicle.organization_id, sign=-1)
     db.delete(exp)
     db.commit()
     return {"status": "deleted"}
@@ -2,10 +2,11 @@
 import logging
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
 from app.api.deps import DbSession, get_current_admin, get_current_admin_or_driver, get_current_driver
+from app.core.http_cache import check_not_modified
 from app.models import Driver, Organization, Vehicle
 from app.schemas.gps import VehicleLocationResponse
 from app.schemas.vehicle import VehicleCreate, VehicleUpdate, VehicleResponse
@@ -16,11 +17,16 @@ router = APIRouter(prefix="/vehicles", tags=["vehicles"])
 
 @router.get("/for-driver", response_model=list[VehicleResponse])
 def list_vehicles_for_driver(
+    request: Request,
+    response: Response,
     db: DbSession,
     driver: Driver = Depends(get_current_driver),
     active_only: bool = Query(True),
 ) -> list[Vehicle]:
     """List vehicles for the current driver's organization. Driver-only endpoint."""
+    cached = check_not_modified(request, response, ("vehicles", driver.organization_id))
+    if cached:
+        return cached
     q = db.query(Vehicle).filter(Vehicle.organization_id == driver.organization_id)
     if active_only:
         q = q.filter(Vehicle.active == True)
@@ -29,12 +35,17 @@ def list_vehicles_for_driver(
 
 @router.get("", response_model=list[VehicleResponse])
 def list_vehicles(
+    request: Request,
+    response: Response,
     db: DbSession,
     _user=Depends(get_current_admin_or_driver),
     organization_id: Optional[int] = Query(None),
     active_only: bool = Query(True),
 ) -> list[Vehicle]:
     """List vehicles, optionally filtered by organization."""
+    cached = check_not_modified(request, response, ("vehicles", organization_id or None))
+    if cached:
+        return cached
     q = db.query(Vehicle)
     if organization_id:
         q = q.filter(Vehicle.organization_id == organization_id)
@@ -0,0 +1,174 @@
+"""Negotiated response compression (brotli or gzip) as pure ASGI middleware.
+
+The encoding is picked from Accept-Encoding q-values (br preferred on a tie, when the brotli package
+is installed). Bodies under COMPRESSION_MIN_SIZE, 204/206/304 responses, responses that already
+carry a Content-Encoding (e.g. the pre-gzipped exports) and non-text media types pass through
+untouched. Bodies are compressed chunk by chunk and flushed after each chunk, so streamed exports
+still reach the client as they are produced. Strong ETags are weakened on compressed responses, since the
+bytes on the wire differ from the identity representation the ETag was computed for.
+"""
+import zlib
+from functools import lru_cache
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+_SKIP_STATUS = (204, 206, 304)
+
+
+@lru_cache(maxsize=256)
+def _qvalues(accept_encoding: str) -> dict[str, float]:
+    """Coding -> q of an Accept-Encoding header (shared by the cache; do not modify)."""
+    qvalues: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        params = params.strip()
+        try:
+            qvalues[coding.strip()] = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            continue
+    return qvalues
+
+
+def accepts_encoding(accept_encoding: str, coding: str) -> bool:
+    """Whether an Accept-Encoding header allows coding: q above 0, named or through "*"."""
+    qvalues = _qvalues(accept_encoding)
+    return qvalues.get(coding, qvalues.get("*", 0.0)) > 0
+
+
+@lru_cache(maxsize=256)
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Best supported coding for an Accept-Encoding header, or None for identity."""
+    qvalues = _qvalues(accept_encoding)
+    wildcard = qvalues.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:  # preference order breaks ties
+        q = qvalues.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _compressible(content_type: str) -> bool:
+    media_type = content_type.partition(";")[0].strip().lower()
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+
+
+class _Compressor:
+    """Streaming compressor with a common interface over zlib (gzip container) and brotli."""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=settings.compression_brotli_quality)
+            self._gz = None
+        else:
+            self._br = None
+            self._gz = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compress and flush, so the output can be sent now."""
+        if self._br is not None:
+            return self._br.process(data) + self._br.flush()
+        return self._gz.compress(data) + self._gz.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self._br is not None:
+            return self._br.process(data) + self._br.finish()
+        return self._gz.compress(data) + self._gz.flush()
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """One-shot compression of a complete body with the middleware's settings (used for measurements)."""
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.compression_brotli_quality)
+    compressor = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing responses with the client's preferred supported coding."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+        compressor: Optional[_Compressor] = None
+        buffered = b""
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough, compressor, buffered
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                passthrough = (
+                    message["status"] in _SKIP_STATUS
+                    or "content-encoding" in headers
+                    or not _compressible(headers.get("content-type", ""))
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start_message = message  # held until the body size decides the framing
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                # Responses passed through BaseHTTPMiddleware arrive as a stream even when they are a
+                # single small body, so buffer up to the threshold before choosing identity or coding.
+                buffered += body
+                if more_body and len(buffered) < settings.compression_min_size:
+                    return
+                body, buffered = buffered, b""
+                headers = MutableHeaders(raw=start_message["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body and len(body) < settings.compression_min_size:
+                    passthrough = True
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                headers["Content-Encoding"] = encoding
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = "W/" + etag
+                if "content-length" in headers:
+                    del headers["Content-Length"]
+                compressor = _Compressor(encoding)
+                await send(start_message)
+            step = compressor.chunk if more_body else compressor.finish
+            if len(body) >= settings.compression_thread_min_size:
+                data = await run_in_threadpool(step, body)
+            else:
+                data = step(body)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,132 @@
+"""GPS device tokens - compact HMAC-signed credentials checked on every ping without a DB lookup.
+
+A token is issued when a trip starts and binds vehicle, trip and expiry:
+
+    v1.<vehicle_id>.<trip_id>.<expires_unix>.<signature>
+
+The signature is a truncated (128-bit) HMAC-SHA256 of the other fields, so verification is a
+split, an HMAC and an expiry check. Ending a trip revokes its tokens: the trip id goes into this
+worker's in-memory revocation list and a Redis sorted set (score = latest possible expiry), which
+every worker pulls every DEVICE_TOKEN_REVOCATION_SYNC_S seconds. Entries drop out once no token
+for the trip can still be valid, so the list stays small.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import logging
+import threading
+import time
+from typing import Optional
+
+from app.core.config import settings
+from app.core.process_state import register_after_fork
+from app.core.redis_client import REDIS_ERRORS, get_async_redis, get_redis
+
+logger = logging.getLogger(__name__)
+
+TOKEN_VERSION = "v1"
+REVOKED_KEY = "device-tokens:revoked"
+
+
+def _signing_key() -> bytes:
+    if settings.device_token_secret:
+        return settings.device_token_secret.encode("utf-8")
+    return hmac.new(settings.secret_key.encode("utf-8"), b"gps-device-token", hashlib.sha256).digest()
+
+
+_KEY = _signing_key()
+
+
+def _sign(message: str) -> str:
+    digest = hmac.new(_KEY, message.encode("ascii"), hashlib.sha256).digest()[:16]
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+def _ttl_seconds() -> int:
+    return int(settings.device_token_ttl_hours * 3600)
+
+
+def issue_device_token(vehicle_id: int, trip_id: int) -> str:
+    """Token allowing GPS updates for this vehicle on this trip until it expires or the trip ends."""
+    message = f"{TOKEN_VERSION}.{vehicle_id}.{trip_id}.{int(time.time()) + _ttl_seconds()}"
+    return f"{message}.{_sign(message)}"
+
+
+class RevocationList:
+    """Revoked trip ids -> time after which no token for the trip can be valid anyway."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._revoked: dict[int, float] = {}
+
+    def __contains__(self, trip_id: int) -> bool:
+        return trip_id in self._revoked
+
+    def add(self, trip_id: int, until: float) -> None:
+        with self._lock:
+            self._revoked[trip_id] = until
+
+    def merge(self, entries: dict[int, float]) -> None:
+        """Add entries synced from Redis and drop expired ones (local-only entries are kept)."""
+        now = time.time()
+        with self._lock:
+            revoked = {t: u for t, u in self._revoked.items() if u > now}
+            revoked.update(entries)
+            self._revoked = revoked
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+revoked_trips = RevocationList()
+
+
+@register_after_fork
+def _reset_after_fork() -> None:
+    global revoked_trips
+    revoked_trips = RevocationList()
+
+
+def verify_device_token(token: str, vehicle_id: int, trip_id: Optional[int]) -> bool:
+    """True if the token is authentic, unexpired, unrevoked and covers this vehicle (and trip, if given)."""
+    parts = token.split(".")
+    if len(parts) != 5 or parts[0] != TOKEN_VERSION:
+        return False
+    if not hmac.compare_digest(parts[4], _sign(token[: -len(parts[4]) - 1])):
+        return False
+    try:
+        token_vehicle, token_trip, expires = int(parts[1]), int(parts[2]), int(parts[3])
+    except ValueError:
+        return False
+    if expires < time.time() or token_vehicle != vehicle_id:
+        return False
+    if trip_id is not None and trip_id != token_trip:
+        return False
+    return token_trip not in revoked_trips
+
+
+def revoke_trip_tokens(trip_id: int) -> None:
+    """Revoke every device token of a trip (called when the trip ends)."""
+    until = time.time() + _ttl_seconds()
+    revoked_trips.add(trip_id, until)
+    try:
+        get_redis().zadd(REVOKED_KEY, {str(trip_id): until})
+    except REDIS_ERRORS as e:
+        logger.warning("Device token revocation for trip %s not shared with other workers: %s", trip_id, e)
+
+
+async def sync_revocations() -> None:
+    """Pull the shared revocation list periodically. Runs as a task for the app lifetime."""
+    while True:
+        try:
+            redis_client = get_async_redis()
+            now = time.time()
+            await redis_client.zremrangebyscore(REVOKED_KEY, "-inf", now)
+            entries = await redis_client.zrangebyscore(REVOKED_KEY, now, "+inf", withscores=True)
+            revoked_trips.merge({int(member): score for member, score in entries})
+        except asyncio.CancelledError:
+            raise
+        except REDIS_ERRORS as e:
+            logger.warning("Device token revocation sync failed: %s", e)
+        await asyncio.sleep(settings.device_token_revocation_sync_s)
@@ -0,0 +1,79 @@
+"""HTTP conditional GET helpers - strong ETags and 304 Not Modified."""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+from app.core.versions import Scope, get_versions, version_key
+
+# Part of every version-based ETag; bump when a list endpoint's response shape changes so clients
+# holding bodies in the old shape refetch even though no data changed.
+ETAG_SCHEMA = "1"
+
+# Clients may cache but must revalidate every time (If-None-Match -> 304 when unchanged).
+REVALIDATE = "private, no-cache"
+
+
+def content_etag(body: bytes) -> str:
+    """Strong ETag from the response body."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if If-None-Match lists this ETag (or *). Weak validators compare equal for GET."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": REVALIDATE})
+
+
+def conditional_json(request: Request, body: bytes, etag: Optional[str] = None) -> Response:
+    """JSON response with an ETag (content hash unless given), or 304 if the client already has it."""
+    etag = etag or content_etag(body)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": REVALIDATE},
+    )
+
+
+def versioned_etag(request: Request, scopes: list[Scope]) -> Optional[str]:
+    """Strong ETag from route, query string and data version counters; None if versions are unavailable."""
+    versions = get_versions(scopes)
+    if versions is None:
+        return None
+    route = request.scope.get("route")
+    basis = "|".join((
+        ETAG_SCHEMA,
+        route.path if route is not None else request.url.path,
+        str(request.path_params),
+        str(sorted(request.query_params.multi_items())),
+        *(f"{version_key(*scope)}={version}" for scope, version in zip(scopes, versions)),
+    ))
+    return '"v' + hashlib.sha256(basis.encode()).hexdigest()[:32] + '"'
+
+
+def check_not_modified(request: Request, response: Response, *scopes: Scope) -> Optional[Response]:
+    """Conditional GET for lists keyed by version counters (no row query needed to answer 304).
+
+    Returns a 304 response if If-None-Match matches; otherwise sets ETag / Cache-Control on the
+    endpoint's response and returns None so the endpoint builds the body as usual.
+    """
+    etag = versioned_etag(request, list(scopes))
+    if etag is None:
+        return None
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = REVALIDATE
+    return None
@@ -0,0 +1,71 @@
+"""Logging setup - records are queued in the request path and written by a background thread."""
+import atexit
+import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from app.core.config import settings
+from app.core.process_state import register_after_fork
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(message)s"
+
+_listener: Optional[QueueListener] = None
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking (or raising) when the queue is full."""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """Route root logging through a bounded queue; a listener thread writes records to stderr."""
+    global _listener
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(logging.Formatter(LOG_FORMAT))
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, DroppingQueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(DroppingQueueHandler(log_queue))
+    root.setLevel(level)
+    if _listener is not None:
+        _listener.stop()
+    _listener = QueueListener(log_queue, stream, respect_handler_level=False)
+    _listener.start()
+
+
+@atexit.register
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread (process exit)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+@register_after_fork
+def _restart_listener_after_fork() -> None:
+    """Listener threads do not survive fork; give each worker its own queue and thread."""
+    global _listener
+    if _listener is not None:
+        _listener = None
+        configure_logging(logging.getLogger().level)
+
+
+def should_log_request(route_path: Optional[str], status_code: int, duration_ms: float) -> bool:
+    """Errors and slow requests are always logged; others are sampled per route (LOG_SAMPLE_RATES)."""
+    if status_code >= 400 or duration_ms >= settings.log_slow_request_ms:
+        return True
+    rate = settings.log_sample_rates.get(route_path, settings.log_sample_default)
+    return rate >= 1.0 or random.random() < rate
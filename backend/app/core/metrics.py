@@ -0,0 +1,142 @@
+"""Prometheus metrics - HTTP, DB, Redis and GPS ingest, aggregated across workers.
+
+With several workers run.py sets PROMETHEUS_MULTIPROC_DIR before the app is imported, so every
+worker writes its samples to shared files and /metrics reports the sum over all workers.
+Per-route metric children are resolved once per (route, method, status class) and cached, so the
+request path does no label formatting.
+"""
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template, method and status class",
+    ["route", "method", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template and method",
+    ["route", "method"],
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", multiprocess_mode="livesum",
+)
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed")
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+REDIS_LATENCY = Histogram(
+    "redis_command_duration_seconds", "Redis command (or pipeline round trip) latency",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5),
+)
+REDIS_ERRORS = Counter("redis_errors_total", "Redis commands that raised")
+GPS_POINTS = Counter("gps_points_ingested_total", "GPS location updates received")
+GPS_POINTS_LOGGED = Counter("gps_points_logged_total", "GPS points written to gps_logs")
+PASSWORD_HASH_QUEUE = Histogram(
+    "password_hash_queue_seconds", "Time a bcrypt job waited for an executor slot",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds", "bcrypt hash/verify execution time", ["op"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0),
+)
+PASSWORD_HASH_REJECTED = Counter("password_hash_rejected_total", "bcrypt jobs rejected because the queue was full")
+PASSWORD_CACHE_HITS = Counter("password_verify_cache_hits_total", "Logins verified from the verified-hash cache")
+
+_STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+_UNMATCHED = "unmatched"
+_children: dict[tuple, tuple] = {}
+
+
+def _route_children(route_path: str, method: str, status_code: int) -> tuple:
+    status_class = _STATUS_CLASSES[min(max(status_code // 100, 1), 5) - 1]
+    key = (route_path, method, status_class)
+    children = _children.get(key)
+    if children is None:
+        children = (
+            HTTP_REQUESTS.labels(route_path, method, status_class),
+            HTTP_LATENCY.labels(route_path, method),
+        )
+        _children[key] = children
+    return children
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request count, latency and in-flight requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            requests, latency = _route_children(
+                route.path if route is not None else _UNMATCHED, scope["method"], status_code
+            )
+            requests.inc()
+            latency.observe(time.perf_counter() - start)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_start"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info.pop("query_start", None)
+    DB_QUERIES.inc()
+    if start is not None:
+        DB_QUERY_LATENCY.observe(time.perf_counter() - start)
+
+
+def observe_redis(elapsed_seconds: float, error: bool = False) -> None:
+    """Called by the instrumented Redis clients for every command or pipeline."""
+    REDIS_LATENCY.observe(elapsed_seconds)
+    if error:
+        REDIS_ERRORS.inc()
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Exposition text for all workers (multiprocess) or this process."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid: int) -> None:
+    """Drop live gauges of an exited worker (gunicorn child_exit hook)."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,176 @@
+"""Bounded bcrypt offload - keeps login bursts from starving the request threadpool.
+
+bcrypt verify/hash calls run in a dedicated executor (threads by default; bcrypt releases the GIL,
+or a process pool with PASSWORD_HASH_EXECUTOR=process, started from a forkserver and not forked
+from the threaded worker) sized by PASSWORD_HASH_WORKERS, so at most that many run at once whatever
+the request volume. At most PASSWORD_HASH_MAX_PENDING jobs may be queued or running; further
+requests get PasswordHasherBusy (503) instead of piling up. Queue wait is exported as
+password_hash_queue_seconds.
+
+Successful verifications are remembered per password hash for PASSWORD_VERIFY_CACHE_TTL seconds
+so a driver re-logging in during a shift does not pay bcrypt again. Safeguards: the cache stores
+an HMAC (keyed with SECRET_KEY) of hash + password rather than the password, only successes are
+cached, an entry is tied to the exact stored hash (a password change makes it unreachable), and
+the cache is bounded and per worker.
+"""
+import asyncio
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import (
+    PASSWORD_CACHE_HITS,
+    PASSWORD_HASH_DURATION,
+    PASSWORD_HASH_QUEUE,
+    PASSWORD_HASH_REJECTED,
+)
+from app.core.process_state import pool_context, register_after_fork
+from app.core.security import hash_password, verify_password
+
+
+class PasswordHasherBusy(Exception):
+    """Too many password hash jobs queued; the caller should answer 503."""
+
+
+def _timed(func, *args) -> tuple[float, float, object]:
+    """Run in the executor: returns (start, end, result) on the system-wide monotonic clock."""
+    start = time.monotonic()
+    result = func(*args)
+    return start, time.monotonic(), result
+
+
+def _timed_verify(plain_password: str, hashed_password: str) -> tuple[float, float, bool]:
+    return _timed(verify_password, plain_password, hashed_password)
+
+
+def _timed_hash(plain_password: str) -> tuple[float, float, str]:
+    return _timed(hash_password, plain_password)
+
+
+class VerifiedHashCache:
+    """Bounded TTL map: password hash -> HMAC of (hash, password) that verified against it."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    @staticmethod
+    def _digest(plain_password: str, hashed_password: str) -> bytes:
+        message = hashed_password.encode("utf-8") + b"\0" + (plain_password or "").encode("utf-8")
+        return hmac.new(settings.secret_key.encode("utf-8"), message, hashlib.sha256).digest()
+
+    def check(self, plain_password: str, hashed_password: str) -> bool:
+        if self.ttl <= 0:
+            return False
+        with self._lock:
+            entry = self._entries.get(hashed_password)
+            if entry is None:
+                return False
+            if entry[0] < time.monotonic():
+                del self._entries[hashed_password]
+                return False
+        return hmac.compare_digest(entry[1], self._digest(plain_password, hashed_password))
+
+    def remember(self, plain_password: str, hashed_password: str) -> None:
+        if self.ttl <= 0:
+            return
+        digest = self._digest(plain_password, hashed_password)
+        with self._lock:
+            self._entries[hashed_password] = (time.monotonic() + self.ttl, digest)
+            self._entries.move_to_end(hashed_password)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class PasswordHasher:
+    """Executor plus admission control for bcrypt jobs."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+        self.pending = 0
+        self.rejected = 0
+        self.verified = VerifiedHashCache(settings.password_verify_cache_size, settings.password_verify_cache_ttl)
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                workers = max(settings.password_hash_workers, 1)
+                if settings.password_hash_executor == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=pool_context(__name__))
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+            return self._executor
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self.pending >= settings.password_hash_max_pending:
+                self.rejected += 1
+                PASSWORD_HASH_REJECTED.inc()
+                raise PasswordHasherBusy()
+            self.pending += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    async def _run(self, op: str, func, *args):
+        self._admit()
+        submitted = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            start, end, result = await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._release()
+        PASSWORD_HASH_QUEUE.observe(max(start - submitted, 0.0))
+        PASSWORD_HASH_DURATION.labels(op).observe(end - start)
+        return result
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """verify_password off the event loop and request threadpool, with the verified-hash cache."""
+        if self.verified.check(plain_password, hashed_password):
+            PASSWORD_CACHE_HITS.inc()
+            return True
+        ok = await self._run("verify", _timed_verify, plain_password, hashed_password)
+        if ok:
+            self.verified.remember(plain_password, hashed_password)
+        return ok
+
+    async def hash(self, plain_password: str) -> str:
+        """hash_password on the bounded executor."""
+        return await self._run("hash", _timed_hash, plain_password)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+password_hasher = PasswordHasher()
+
+
+@register_after_fork
+def _reset_after_fork() -> None:
+    """Executor threads / child processes do not survive fork; each worker creates its own."""
+    global password_hasher
+    password_hasher = PasswordHasher()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
+
+
+async def hash_password_async(plain_password: str) -> str:
+    return await password_hasher.hash(plain_password)
+
+
+def shutdown_password_hasher() -> None:
+    password_hasher.shutdown()
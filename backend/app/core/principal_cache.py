@@ -0,0 +1,142 @@
+"""Authenticated principal cache - skips the per-request DB lookup of the token's driver/admin.
+
+Active principals are cached per worker by (token type, subject) for PRINCIPAL_CACHE_TTL seconds
+in a bounded LRU. Hits return a fresh transient model instance built from the cached column
+values, so callers get the usual Driver / AdminUser attributes but no relationships or session.
+Changes that affect authentication call invalidate_principal(), which drops the local entry and
+publishes the key on a Redis channel; every worker's listener (started in the app lifespan)
+drops it too. If Redis is unavailable the TTL bounds how long other workers can serve stale data.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, TypeVar
+
+from sqlalchemy import inspect
+
+from app.core.config import settings
+from app.core.process_state import register_after_fork
+from app.core.redis_client import REDIS_ERRORS, get_async_redis, get_redis
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "principal-cache:invalidate"
+
+T = TypeVar("T")
+
+
+class PrincipalCache:
+    """Thread-safe TTL LRU of principal column values keyed by (token type, subject)."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str], tuple[float, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, kind: str, subject: str, model: type[T]) -> Optional[T]:
+        """Transient model instance for a cached, unexpired principal; None on miss."""
+        if self.ttl <= 0:
+            return None
+        key = (kind, subject)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            values = entry[1]
+        return model(**values)
+
+    def put(self, kind: str, subject: str, principal) -> None:
+        """Cache the column values of a loaded principal."""
+        if self.ttl <= 0:
+            return
+        values = {attr.key: getattr(principal, attr.key) for attr in inspect(principal).mapper.column_attrs}
+        with self._lock:
+            self._entries[(kind, subject)] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end((kind, subject))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, kind: str, subject: str) -> None:
+        with self._lock:
+            if self._entries.pop((kind, subject), None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_s": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+principal_cache = PrincipalCache(settings.principal_cache_size, settings.principal_cache_ttl)
+
+
+@register_after_fork
+def _reset_after_fork() -> None:
+    """Workers start with an empty cache (invalidations published before fork were not seen)."""
+    global principal_cache
+    principal_cache = PrincipalCache(settings.principal_cache_size, settings.principal_cache_ttl)
+
+
+def get_principal_cache() -> PrincipalCache:
+    return principal_cache
+
+
+def invalidate_principal(kind: str, subject: str) -> None:
+    """Drop a principal in this worker and tell the other workers. Call after the change is committed."""
+    principal_cache.discard(kind, subject)
+    try:
+        get_redis().publish(INVALIDATION_CHANNEL, f"{kind}:{subject}")
+    except REDIS_ERRORS as e:
+        logger.warning("Principal invalidation not published (other workers expire it by TTL): %s", e)
+
+
+async def listen_for_invalidations() -> None:
+    """Apply invalidations published by any worker. Runs as a task for the app lifetime."""
+    if settings.principal_cache_ttl <= 0:
+        return
+    while True:
+        pubsub = get_async_redis().pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            while True:
+                message = await pubsub.get_message(timeout=1.0)
+                if message is None:
+                    continue
+                data = message["data"]
+                kind, _, subject = (data.decode() if isinstance(data, bytes) else data).partition(":")
+                principal_cache.discard(kind, subject)
+        except asyncio.CancelledError:
+            raise
+        except REDIS_ERRORS as e:
+            # Missed messages cannot be replayed; drop everything so nothing stale outlives the outage.
+            principal_cache.clear()
+            logger.warning("Principal invalidation listener lost Redis, retrying: %s", e)
+            await asyncio.sleep(5)
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
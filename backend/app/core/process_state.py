@@ -0,0 +1,46 @@
+"""Process-local state registry - resets pools and caches inherited across a fork.
+
+With a preloaded app (gunicorn --preload) modules are imported in the master and workers are
+forked from it. Anything holding sockets, locks or cached data must be reset in each child so
+workers never share a connection or serve another process's stale cache. Modules that keep such
+state register a reset callback here; the launcher calls run_after_fork() in every new worker.
+
+Process pools started from a worker use pool_context(): their processes must not be forked from
+it either, since other threads (logging listener, DB / Redis pools, executors) may hold locks at
+the time of the fork and the child would inherit them locked.
+"""
+import logging
+import multiprocessing
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+_after_fork: list[Callable[[], None]] = []
+_forkserver_preload: set[str] = set()
+
+
+def register_after_fork(callback: Callable[[], None]) -> Callable[[], None]:
+    """Register a callback to run in each worker right after fork. Usable as a decorator."""
+    _after_fork.append(callback)
+    return callback
+
+
+def run_after_fork() -> None:
+    """Run all registered reset callbacks (called from the gunicorn post_fork hook)."""
+    for callback in _after_fork:
+        try:
+            callback()
+        except Exception:
+            logger.exception("after-fork reset failed: %s", getattr(callback, "__qualname__", callback))
+
+
+def pool_context(*preload: str):
+    """multiprocessing context for a ProcessPoolExecutor: forkserver, or spawn where that is
+    unavailable. preload names modules the forkserver imports once (before it first starts), so
+    pool processes are forked with them already loaded."""
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    _forkserver_preload.update(preload)
+    context.set_forkserver_preload(sorted(_forkserver_preload))
+    return context
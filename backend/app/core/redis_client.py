@@ -0,0 +1,203 @@
+"""Shared Redis clients - one connection pool per worker process (sync and asyncio)."""
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.core.metrics import observe_redis
+from app.core.process_state import register_after_fork
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean "Redis is unavailable right now"; callers degrade instead of failing.
+REDIS_ERRORS = (redis.ConnectionError, redis.TimeoutError)
+
+
+class RedisStats:
+    """Per-process Redis call counters and latency totals."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.pipelines = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms: float, error: bool = False, pipeline: bool = False) -> None:
+        observe_redis(elapsed_ms / 1000, error)
+        with self._lock:
+            self.calls += 1
+            self.total_ms += elapsed_ms
+            if elapsed_ms > self.max_ms:
+                self.max_ms = elapsed_ms
+            if error:
+                self.errors += 1
+            if pipeline:
+                self.pipelines += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "pipelines": self.pipelines,
+                "total_ms": round(self.total_ms, 3),
+                "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+                "max_ms": round(self.max_ms, 3),
+            }
+
+
+stats = RedisStats()
+
+
+class InstrumentedRedis(redis.Redis):
+    """Redis client that records latency of every command."""
+
+    def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        error = False
+        try:
+            return super().execute_command(*args, **options)
+        except redis.RedisError:
+            error = True
+            raise
+        finally:
+            stats.record((time.perf_counter() - start) * 1000, error=error)
+
+
+class InstrumentedAsyncRedis(aioredis.Redis):
+    """asyncio Redis client that records latency of every command."""
+
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        error = False
+        try:
+            return await super().execute_command(*args, **options)
+        except redis.RedisError:
+            error = True
+            raise
+        finally:
+            stats.record((time.perf_counter() - start) * 1000, error=error)
+
+
+_pool: Optional[redis.BlockingConnectionPool] = None
+_async_pool: Optional[aioredis.BlockingConnectionPool] = None
+_client: Optional[InstrumentedRedis] = None
+_async_client: Optional[InstrumentedAsyncRedis] = None
+_init_lock = threading.Lock()
+
+
+def _pool_kwargs() -> dict:
+    return {
+        "max_connections": settings.redis_max_connections,
+        "timeout": settings.redis_socket_timeout,
+        "socket_timeout": settings.redis_socket_timeout,
+        "socket_connect_timeout": settings.redis_socket_timeout,
+        "health_check_interval": settings.redis_health_check_interval,
+    }
+
+
+def init_redis() -> None:
+    """Create the process-wide sync and asyncio pools. Called from the app lifespan."""
+    global _pool, _async_pool, _client, _async_client
+    with _init_lock:
+        if _pool is None:
+            _pool = redis.BlockingConnectionPool.from_url(settings.redis_url, **_pool_kwargs())
+            _client = InstrumentedRedis(connection_pool=_pool)
+        if _async_pool is None:
+            _async_pool = aioredis.BlockingConnectionPool.from_url(settings.redis_url, **_pool_kwargs())
+            _async_client = InstrumentedAsyncRedis(connection_pool=_async_pool)
+
+
+async def close_redis() -> None:
+    """Disconnect both pools. Called from the app lifespan on shutdown."""
+    global _pool, _async_pool, _client, _async_client
+    if _async_pool is not None:
+        await _async_pool.disconnect()
+    if _pool is not None:
+        _pool.disconnect()
+    _pool = _async_pool = None
+    _client = _async_client = None
+
+
+@register_after_fork
+def _reset_after_fork() -> None:
+    """Drop pools inherited from the parent without closing its sockets; each worker builds its own."""
+    global _pool, _async_pool, _client, _async_client, stats
+    _pool = _async_pool = None
+    _client = _async_client = None
+    stats = RedisStats()
+
+
+def get_redis() -> InstrumentedRedis:
+    """Shared sync client. Initializes lazily so scripts and background threads work without the lifespan."""
+    if _client is None:
+        init_redis()
+    return _client
+
+
+def get_async_redis() -> InstrumentedAsyncRedis:
+    """Shared asyncio client for async endpoints."""
+    if _async_client is None:
+        init_redis()
+    return _async_client
+
+
+def execute_pipeline(pipe: redis.client.Pipeline) -> list:
+    """Execute a pipeline built from get_redis().pipeline(), recording one round trip."""
+    start = time.perf_counter()
+    error = False
+    try:
+        return pipe.execute()
+    except redis.RedisError:
+        error = True
+        raise
+    finally:
+        stats.record((time.perf_counter() - start) * 1000, error=error, pipeline=True)
+
+
+async def execute_pipeline_async(pipe: aioredis.client.Pipeline) -> list:
+    """Execute a pipeline built from get_async_redis().pipeline(), recording one round trip."""
+    start = time.perf_counter()
+    error = False
+    try:
+        return await pipe.execute()
+    except redis.RedisError:
+        error = True
+        raise
+    finally:
+        stats.record((time.perf_counter() - start) * 1000, error=error, pipeline=True)
+
+
+def _sync_pool_stats(pool: Optional[redis.ConnectionPool]) -> dict | None:
+    if pool is None:
+        return None
+    if not hasattr(pool, "pool"):
+        return _async_pool_stats(pool)
+    created = len(getattr(pool, "_connections", []))
+    idle = sum(1 for c in list(pool.pool.queue) if c is not None)
+    return {"max_connections": pool.max_connections, "created": created, "in_use": created - idle, "idle": idle}
+
+
+def _async_pool_stats(pool) -> dict | None:
+    if pool is None:
+        return None
+    idle = len(getattr(pool, "_available_connections", []))
+    in_use = len(getattr(pool, "_in_use_connections", []))
+    return {"max_connections": pool.max_connections, "created": idle + in_use, "in_use": in_use, "idle": idle}
+
+
+def redis_metrics() -> dict:
+    """Connection pool occupancy and command latency for this worker process."""
+    return {
+        "pid": os.getpid(),
+        "pool": _sync_pool_stats(_pool),
+        "async_pool": _async_pool_stats(_async_pool),
+        "commands": stats.snapshot(),
+    }
@@ -0,0 +1,15 @@
+"""JSON encoding with orjson - used by fast-path endpoints that build response bytes directly."""
+import orjson
+from fastapi import Response
+
+# UTC datetimes as "...Z" like Pydantic; naive datetimes stay naive.
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def dumps(obj) -> bytes:
+    return orjson.dumps(obj, option=ORJSON_OPTIONS)
+
+
+def json_bytes_response(body: bytes, status_code: int = 200) -> Response:
+    """Response for an already-encoded JSON body (bypasses response_model re-validation)."""
+    return Response(content=body, status_code=status_code, media_type="application/json")
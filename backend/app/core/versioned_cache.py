@@ -0,0 +1,81 @@
+"""Per-worker in-memory cache of values built from versioned tables (app/core/versions.py).
+
+Each entry keeps the data version counters it was built at. A lookup reads the current counters
+(one Redis MGET) and rebuilds the entry only if one of them changed, so a write committed by any
+worker is seen by every worker on its next lookup, with no pub/sub and no TTL. If Redis is
+unavailable nothing is cached: the value is rebuilt on every lookup rather than served stale.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+from app.core.process_state import register_after_fork
+from app.core.versions import Scope, get_versions
+
+T = TypeVar("T")
+
+_caches: list["VersionedCache"] = []
+
+
+class VersionedCache(Generic[T]):
+    """Thread-safe LRU of values keyed by any hashable, each valid while its version counters are unchanged."""
+
+    def __init__(self, name: str, maxsize: int) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[list[str], T]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        _caches.append(self)
+
+    def get(self, key: Hashable, scopes: list[Scope], build: Callable[[], T]) -> T:
+        """The cached value for key if its scopes' counters are unchanged, else build() (and cache it).
+
+        Counters are read before build(), so a write that commits while building leaves the entry
+        at the older versions and the next lookup rebuilds it.
+        """
+        versions = get_versions(scopes)
+        if versions is None:
+            return build()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == versions:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        value = build()
+        with self._lock:
+            self._entries[key] = (versions, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def versioned_cache_metrics() -> dict[str, dict]:
+    return {cache.name: cache.snapshot() for cache in _caches}
+
+
+@register_after_fork
+def _reset_after_fork() -> None:
+    """Entries built in the parent are still valid (they carry their versions); locks and stats are per worker."""
+    for cache in _caches:
+        cache._lock = threading.Lock()
+        cache.hits = cache.misses = 0
@@ -0,0 +1,105 @@
+"""Per-table / per-organization data version counters in Redis, bumped when ORM writes commit.
+
+Reference data lists (presets, destinations, vehicles, drivers, organizations, fixed tariffs) use
+these to build strong ETags without touching the rows: the ETag changes whenever any row of the
+table (or of the table within one organization) is inserted, updated or deleted through a
+Session. The fuel report cache is keyed by the vehicle_expenses counter the same way, and the
+in-memory caches of app/core/versioned_cache.py are checked against these counters. Counters
+are Redis keys ver:<table> and ver:<table>:<org_id>; a missing counter is seeded with a random
+value so a Redis flush can never bring back an ETag a client already holds.
+
+Writes that bypass the ORM unit of work (bulk query().update(), raw SQL) must call bump_versions().
+"""
+import logging
+import secrets
+from typing import Iterable, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.redis_client import REDIS_ERRORS, get_redis
+
+logger = logging.getLogger(__name__)
+
+# Tables whose writes are tracked; True = also keep per-organization counters (organization_id).
+VERSIONED_TABLES = {
+    "preset_locations": True,
+    "preset_destinations": False,
+    "vehicles": True,
+    "drivers": True,
+    "organizations": False,
+    "fixed_tariffs": True,
+    "vehicle_expenses": False,  # fuel report cache (app/services/fuel_service.py)
+    "distance_tariff_config": False,  # tariff table cache (app/services/tariff_service.py)
+}
+
+Scope = tuple[str, Optional[int]]
+
+
+def version_key(table: str, org_id: Optional[int] = None) -> str:
+    return f"ver:{table}" if org_id is None else f"ver:{table}:{org_id}"
+
+
+def _scopes_for(obj) -> set[Scope]:
+    table = getattr(obj, "__tablename__", None)
+    if table not in VERSIONED_TABLES:
+        return set()
+    scopes: set[Scope] = {(table, None)}
+    if VERSIONED_TABLES[table]:
+        history = inspect(obj).attrs.organization_id.history
+        for org_id in (*history.unchanged, *history.added, *history.deleted):
+            if org_id is not None:
+                scopes.add((table, org_id))
+    return scopes
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    pending = session.info.setdefault("version_scopes", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        pending.update(_scopes_for(obj))
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session):
+    scopes = session.info.pop("version_scopes", None)
+    if scopes:
+        bump_versions(scopes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("version_scopes", None)
+
+
+def bump_versions(scopes: Iterable[Scope]) -> None:
+    """Increment the counters of the given (table, org_id or None) scopes in one round trip."""
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for table, org_id in scopes:
+            key = version_key(table, org_id)
+            pipe.set(key, secrets.randbits(48), nx=True)
+            pipe.incr(key)
+        pipe.execute()
+    except REDIS_ERRORS as e:
+        # Clients may keep a stale list until the next successful bump of the same table.
+        logger.warning("Data version bump failed: %s", e)
+
+
+def get_versions(scopes: list[Scope]) -> Optional[list[str]]:
+    """Current counters for the scopes (seeding missing ones), or None if Redis is unavailable."""
+    keys = [version_key(table, org_id) for table, org_id in scopes]
+    try:
+        redis_client = get_redis()
+        values = redis_client.mget(keys)
+        missing = [k for k, v in zip(keys, values) if v is None]
+        if missing:
+            pipe = redis_client.pipeline(transaction=False)
+            for key in missing:
+                pipe.set(key, secrets.randbits(48), nx=True)
+            pipe.execute()
+            values = redis_client.mget(keys)
+    except REDIS_ERRORS as e:
+        logger.warning("Data version lookup failed, serving without ETag: %s", e)
+        return None
+    return [v.decode() if isinstance(v, bytes) else str(v) for v in values]
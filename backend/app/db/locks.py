@@ -0,0 +1,38 @@
+"""Transaction-scoped locks - serialize check-then-write sequences that no constraint enforces.
+
+On PostgreSQL a named lock is pg_advisory_xact_lock(key) and lock_row() is SELECT ... FOR UPDATE.
+SQLite has neither; a no-op UPDATE on the table takes the database write lock instead, which also
+lasts until the transaction ends.
+"""
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+# name -> (advisory lock key, table written by the no-op UPDATE on other dialects)
+LOCKS = {
+    "billing_runs": (0x62696C6C72, "billing_runs"),
+    "driver_logins": (0x6472697665, "drivers"),  # drivers.user_id is global and has no unique constraint
+}
+
+
+def _is_postgresql(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _write_lock(db: Session, table: str) -> None:
+    db.execute(text(f"UPDATE {table} SET id = id WHERE 1 = 0"))
+
+
+def xact_lock(db: Session, name: str) -> None:
+    """Block until the named lock is free and hold it until the caller's transaction ends."""
+    key, table = LOCKS[name]
+    if _is_postgresql(db):
+        db.execute(select(func.pg_advisory_xact_lock(key)))
+    else:
+        _write_lock(db, table)
+
+
+def lock_row(db: Session, obj) -> None:
+    """Reload obj with its row locked until the caller's transaction ends."""
+    if not _is_postgresql(db):
+        _write_lock(db, obj.__tablename__)
+    db.refresh(obj, with_for_update=True)
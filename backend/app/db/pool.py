@@ -0,0 +1,92 @@
+"""Instrumented SQLAlchemy connection pools - checkout counts, wait time, overflow and timeouts."""
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    """Per-process counters for one connection pool."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.overflow_peak = 0
+
+    def record(self, elapsed_ms: float, overflow: int, timeout: bool = False, error: bool = False) -> None:
+        with self._lock:
+            if timeout:
+                self.timeouts += 1
+            elif error:
+                self.errors += 1
+            else:
+                self.checkouts += 1
+            self.wait_total_ms += elapsed_ms
+            if elapsed_ms > self.wait_max_ms:
+                self.wait_max_ms = elapsed_ms
+            if overflow > self.overflow_peak:
+                self.overflow_peak = overflow
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts + self.errors
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "wait_total_ms": round(self.wait_total_ms, 3),
+                "wait_avg_ms": round(self.wait_total_ms / attempts, 3) if attempts else 0.0,
+                "wait_max_ms": round(self.wait_max_ms, 3),
+                "overflow_peak": self.overflow_peak,
+            }
+
+
+class _InstrumentedPoolMixin:
+    """Times Pool.connect(): queue wait plus connect / pre-ping when a new or stale connection is involved."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record((time.perf_counter() - start) * 1000, self.overflow(), timeout=True)
+            raise
+        except Exception:
+            self.metrics.record((time.perf_counter() - start) * 1000, self.overflow(), error=True)
+            raise
+        self.metrics.record((time.perf_counter() - start) * 1000, self.overflow())
+        return conn
+
+    def recreate(self):
+        new_pool = super().recreate()
+        new_pool.metrics = self.metrics
+        return new_pool
+
+    def stats(self) -> dict:
+        """Current occupancy plus cumulative counters."""
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "timeout_s": self.timeout(),
+            **self.metrics.snapshot(),
+        }
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """QueuePool for the sync engine."""
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool for the asyncio engine."""
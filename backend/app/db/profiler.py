@@ -0,0 +1,196 @@
+"""Opt-in per-request SQL profiler - query count, time and repeated statements (N+1 detection).
+
+Enable with SQL_PROFILE=true. Each request gets a QueryProfile in a context variable; engine events
+record every statement under a fingerprint (the SQL with IN-lists collapsed). Requests that exceed
+SQL_PROFILE_MAX_QUERIES / SQL_PROFILE_MAX_TIME_MS, or run one fingerprint more than
+SQL_PROFILE_MAX_REPEATS times, are logged at WARNING and get an X-SQL-Profile-Warning header.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+)\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Statement shape: whitespace normalized, expanded IN (...) parameter lists collapsed."""
+    return _IN_LIST.sub("(?)", _WHITESPACE.sub(" ", statement)).strip()
+
+
+class QueryProfile:
+    """Queries executed while this profile is active."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.statements[statement] += 1
+
+    def repeated(self, min_repeats: int = 2) -> list[tuple[str, int]]:
+        """Fingerprints executed at least min_repeats times, most repeated first."""
+        by_shape: Counter[str] = Counter()
+        for statement, n in self.statements.items():
+            by_shape[fingerprint(statement)] += n
+        return [(shape, n) for shape, n in by_shape.most_common() if n >= min_repeats]
+
+    @property
+    def max_repeat(self) -> int:
+        repeated = self.repeated(1)
+        return repeated[0][1] if repeated else 0
+
+    def violations(
+        self,
+        max_queries: Optional[int] = None,
+        max_repeats: Optional[int] = None,
+        max_time_ms: Optional[float] = None,
+    ) -> list[str]:
+        """Human-readable list of exceeded thresholds (empty when within budget)."""
+        problems = []
+        if max_queries is not None and self.count > max_queries:
+            problems.append(f"{self.count} queries > {max_queries}")
+        if max_time_ms is not None and self.total_ms > max_time_ms:
+            problems.append(f"{self.total_ms:.1f}ms in SQL > {max_time_ms:.0f}ms")
+        if max_repeats is not None:
+            for shape, n in self.repeated(max_repeats + 1):
+                problems.append(f"statement repeated {n}x > {max_repeats}: {shape[:200]}")
+        return problems
+
+
+_current: ContextVar[Optional[QueryProfile]] = ContextVar("sql_query_profile", default=None)
+_force_enabled = False
+_sinks: list[Callable[[str, QueryProfile], None]] = []
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info["profile_start"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    start = conn.info.pop("profile_start", None)
+    if profile is not None and start is not None:
+        profile.record(statement, (time.perf_counter() - start) * 1000)
+
+
+def profiling_enabled() -> bool:
+    return settings.sql_profile or _force_enabled
+
+
+class SQLProfilerMiddleware:
+    """Pure ASGI middleware attaching a QueryProfile to each request when profiling is enabled."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiling_enabled():
+            await self.app(scope, receive, send)
+            return
+        profile = QueryProfile()
+        token = _current.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                problems = profile.violations(
+                    settings.sql_profile_max_queries,
+                    settings.sql_profile_max_repeats,
+                    settings.sql_profile_max_time_ms,
+                )
+                if problems:
+                    header = f"queries={profile.count}; time_ms={profile.total_ms:.1f}; max_repeat={profile.max_repeat}"
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-sql-profile-warning", header.encode("latin-1"))
+                    ]
+                    logger.warning(
+                        "SQL budget exceeded on %s %s: %s",
+                        scope["method"], scope["path"], "; ".join(problems),
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            for sink in list(_sinks):
+                sink(scope["path"], profile)
+
+
+@contextmanager
+def profile_queries() -> Iterator[QueryProfile]:
+    """Profile queries run in the current context (same thread / task), e.g. a service call in a test."""
+    profile = QueryProfile()
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def capture_request_profiles() -> Iterator[list[tuple[str, QueryProfile]]]:
+    """Force profiling on and collect (path, profile) for every request served meanwhile.
+
+    Works with TestClient, which serves requests on another thread.
+    """
+    global _force_enabled
+    captured: list[tuple[str, QueryProfile]] = []
+    sink = lambda path, profile: captured.append((path, profile))  # noqa: E731
+    previous = _force_enabled
+    _force_enabled = True
+    _sinks.append(sink)
+    try:
+        yield captured
+    finally:
+        _sinks.remove(sink)
+        _force_enabled = previous
+
+
+def assert_query_budget(
+    profile: QueryProfile,
+    max_queries: Optional[int] = None,
+    max_repeats: Optional[int] = None,
+    max_time_ms: Optional[float] = None,
+) -> None:
+    """Raise AssertionError listing every exceeded threshold."""
+    problems = profile.violations(max_queries, max_repeats, max_time_ms)
+    if problems:
+        raise AssertionError("SQL query budget exceeded: " + "; ".join(problems))
+
+
+def assert_route_query_budget(
+    client,
+    method: str,
+    url: str,
+    max_queries: Optional[int] = None,
+    max_repeats: Optional[int] = None,
+    **request_kwargs,
+):
+    """Issue one request through a TestClient and assert its query budget. Returns the response.
+
+    Example: assert_route_query_budget(client, "GET", "/trips", max_queries=3, max_repeats=1, headers=admin)
+    """
+    with capture_request_profiles() as captured:
+        response = client.request(method, url, **request_kwargs)
+    if not captured:
+        raise AssertionError(f"No request profile captured for {method} {url}")
+    assert_query_budget(captured[-1][1], max_queries=max_queries, max_repeats=max_repeats)
+    return response
@@ -1,21 +1,80 @@
 """Database session management."""
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
+from app.core.process_state import register_after_fork
 from app.db.base import Base
+from app.db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+
+
+def pool_options(url: str, poolclass: type) -> dict:
+    """Pool sizing from Settings. SQLite keeps SQLAlchemy's default pool (sizing does not apply)."""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_use_lifo": settings.db_pool_use_lifo,
+    }
+
 
 engine = create_engine(
     settings.database_url,
-    pool_pre_ping=True,
+    pool_pre_ping=settings.db_pool_pre_ping,
     echo=False,
+    **pool_options(settings.database_url, InstrumentedQueuePool),
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL to its asyncio driver (asyncpg for Postgres, aiosqlite for SQLite)."""
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if dialect in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    return url
+
+
+# Async engine for the hot endpoints (app/api/routes/async_hot.py); runs alongside the sync engine.
+_async_url = settings.async_database_url or async_database_url(settings.database_url)
+async_engine = create_async_engine(
+    _async_url,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    echo=False,
+    **pool_options(_async_url, InstrumentedAsyncQueuePool),
+)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+@register_after_fork
+def _reset_pools_after_fork() -> None:
+    """Forget connections inherited from the parent process without closing them."""
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+
+
+def pool_metrics() -> dict:
+    """Stats for the sync and async pools of this worker (None when the pool is not instrumented)."""
+    sync_pool = engine.pool
+    async_pool = async_engine.sync_engine.pool
+    return {
+        "sync": sync_pool.stats() if hasattr(sync_pool, "stats") else None,
+        "async": async_pool.stats() if hasattr(async_pool, "stats") else None,
+    }
+
+
 def init_db() -> None:
     """Create all tables. Used for initial setup or testing."""
     import app.models  # noqa: F401 - ensure all models are registered
@@ -29,3 +88,9 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency that provides an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
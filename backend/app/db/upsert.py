@@ -0,0 +1,91 @@
+"""Dialect-aware upserts - INSERT ... ON CONFLICT on PostgreSQL and SQLite, update-then-insert elsewhere."""
+from collections import defaultdict
+from typing import Iterable
+
+from sqlalchemy import and_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _conflict_insert(db: Session, model):
+    insert = _INSERTS.get(db.get_bind().dialect.name)
+    return insert(model) if insert is not None else None
+
+
+def merge_rows(rows: Iterable[dict], keys: tuple, counters: tuple) -> list[dict]:
+    """Sum rows sharing a key (one upsert statement may not touch the same row twice)."""
+    merged: dict[tuple, dict] = defaultdict(lambda: dict.fromkeys(counters, 0))
+    for row in rows:
+        totals = merged[tuple(row[k] for k in keys)]
+        for c in counters:
+            totals[c] += row.get(c, 0) or 0
+    return [{**dict(zip(keys, key)), **totals} for key, totals in merged.items()]
+
+
+def upsert_add(db: Session, model, keys: tuple, counters: tuple, rows: Iterable[dict]) -> None:
+    """Add counter deltas onto the rows identified by keys (a unique constraint), inserting missing rows.
+
+    One statement: SET col = col + excluded.col, so concurrent writers never lose an increment.
+    """
+    rows = merge_rows(rows, keys, counters)
+    if not rows:
+        return
+    stmt = _conflict_insert(db, model)
+    if stmt is not None:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={c: getattr(model, c) + getattr(stmt.excluded, c) for c in counters},
+        )
+        db.execute(stmt, rows)
+        return
+    # Other dialects: update, insert when missing (not safe against concurrent first inserts).
+    for row in rows:
+        match = and_(*(getattr(model, k) == row[k] for k in keys))
+        result = db.execute(
+            update(model).where(match).values({c: getattr(model, c) + row[c] for c in counters})
+        )
+        if result.rowcount == 0:
+            db.add(model(**row))
+    db.flush()
+
+
+def increment_returning(db: Session, model, key: dict, counter: str, amount: int) -> int:
+    """Add amount to a counter column of the row identified by key (created at amount), returning the new value.
+
+    One statement (INSERT ... ON CONFLICT DO UPDATE ... RETURNING). The row stays locked until the
+    transaction ends, so concurrent callers for the same key wait and never get the same value.
+    """
+    column = getattr(model, counter)
+    stmt = _conflict_insert(db, model)
+    if stmt is not None:
+        stmt = stmt.values({**key, counter: amount}).on_conflict_do_update(
+            index_elements=list(key), set_={counter: column + getattr(stmt.excluded, counter)},
+        ).returning(column)
+        return db.execute(stmt).scalar_one()
+    # Other dialects: lock and update, insert when missing (not safe against concurrent first inserts).
+    row = db.query(model).filter_by(**key).with_for_update().first()
+    if row is None:
+        row = model(**key, **{counter: 0})
+        db.add(row)
+    setattr(row, counter, getattr(row, counter) + amount)
+    db.flush()
+    return getattr(row, counter)
+
+
+def upsert_replace(db: Session, model, keys: tuple, rows: list[dict]) -> None:
+    """Insert rows, overwriting the non-key columns of rows that already exist."""
+    if not rows:
+        return
+    stmt = _conflict_insert(db, model)
+    if stmt is not None:
+        columns = [c for c in rows[0] if c not in keys]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys), set_={c: getattr(stmt.excluded, c) for c in columns}
+        )
+        db.execute(stmt, rows)
+        return
+    for row in rows:
+        db.merge(model(**row))
+    db.flush()
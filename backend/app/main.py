@@ -1,10 +1,14 @@
 """Ambulance Fleet Management - FastAPI application."""
+import asyncio
 import logging
 import re
 import time
 from contextlib import asynccontextmanager
+from functools import lru_cache
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+from app.core.logging_setup import configure_logging, should_log_request
+
+configure_logging(logging.INFO)
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -24,15 +28,45 @@ from app.api.routes import (
     drivers,
     tariffs,
     organizations,
+    admin_metrics,
+    async_hot,
+    metrics,
+    driver_bootstrap,
+    exports,
+    dashboard,
+    analytics,
+    imports,
 )
-from app.db.session import init_db
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.core.device_tokens import sync_revocations
+from app.core.metrics import MetricsMiddleware
+from app.core.password_hasher import shutdown_password_hasher
+from app.core.principal_cache import listen_for_invalidations
+from app.core.redis_client import close_redis, init_redis
+from app.db.profiler import SQLProfilerMiddleware
+from app.db.session import async_engine, init_db
+from app.services.invoice_pdf import shutdown_pdf_pool
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Startup: ensure DB tables exist. Shutdown: cleanup."""
+    """Startup: ensure DB tables exist, open shared Redis pools, start background sync tasks
+    (principal invalidations, device token revocations). Shutdown: stop the tasks, close pools."""
     init_db()
+    init_redis()
+    tasks = [
+        asyncio.create_task(listen_for_invalidations()),
+        asyncio.create_task(sync_revocations()),
+    ]
     yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    shutdown_password_hasher()
+    shutdown_pdf_pool()
+    await close_redis()
+    await async_engine.dispose()
 
 
 app = FastAPI(
@@ -74,10 +108,16 @@ app.add_middleware(
 )
 
 
+@lru_cache(maxsize=256)
+def _origin_allowed(origin: str) -> bool:
+    """Cached CORS_ORIGIN_REGEX check; browsers send a handful of distinct origins."""
+    return CORS_ORIGIN_REGEX.match(origin) is not None
+
+
 def _cors_headers_for(request: Request) -> dict:
     """Return CORS headers to echo back the request origin if allowed."""
     origin = request.headers.get("origin")
-    if origin and CORS_ORIGIN_REGEX.match(origin):
+    if origin and _origin_allowed(origin):
         return {
             "Access-Control-Allow-Origin": origin,
             "Access-Control-Allow-Credentials": "true",
@@ -103,26 +143,34 @@ async def global_exception_handler(request: Request, exc: Exception):
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    """Log every request to help debug save failures."""
-    start = time.time()
+    """Log errors, slow requests and a per-route sample of the rest (see LOG_SAMPLE_RATES)."""
+    start = time.perf_counter()
     response = await call_next(request)
-    duration = (time.time() - start) * 1000
-    logging.info(
-        "%s %s -> %s (%.0fms)",
-        request.method,
-        request.url.path,
-        response.status_code,
-        duration,
-    )
-    # Ensure CORS headers on all responses (incl. 4xx/5xx) when origin is allowed
+    duration = (time.perf_counter() - start) * 1000
+    route = request.scope.get("route")
+    if should_log_request(route.path if route is not None else None, response.status_code, duration):
+        logging.log(
+            logging.WARNING if duration >= settings.log_slow_request_ms else logging.INFO,
+            "%s %s -> %s (%.0fms)",
+            request.method,
+            request.scope["path"],
+            response.status_code,
+            duration,
+        )
+    # Ensure CORS headers on all responses (incl. 4xx/5xx) when origin is allowed.
+    # Headers.__contains__ compares case-insensitively without building a set.
     origin = request.headers.get("origin")
-    if origin and CORS_ORIGIN_REGEX.match(origin) and "access-control-allow-origin" not in {
-        k.lower() for k in response.headers
-    }:
+    if origin and _origin_allowed(origin) and "access-control-allow-origin" not in response.headers:
         response.headers["Access-Control-Allow-Origin"] = origin
         response.headers["Access-Control-Allow-Credentials"] = "true"
     return response
 
+# Inside the profiler and metrics so their timings include compression
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(SQLProfilerMiddleware)
+# Outermost, so latency covers every other middleware
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth.router)
 app.include_router(trips.router)
 app.include_router(gps.router)
@@ -134,6 +182,14 @@ app.include_router(billing.router)
 app.include_router(drivers.router)
 app.include_router(tariffs.router)
 app.include_router(organizations.router)
+app.include_router(admin_metrics.router)
+app.include_router(async_hot.router)
+app.include_router(metrics.router)
+app.include_router(driver_bootstrap.router)
+app.include_router(exports.router)
+app.include_router(dashboard.router)
+app.include_router(analytics.router)
+app.include_router(imports.router)
 
 
 @app.get("/health")
@@ -11,6 +11,10 @@ from app.models.trip import Trip
 from app.models.gps_log import GPSLog
 from app.models.invoice import Invoice
 from app.models.vehicle_expense import VehicleExpense
+from app.models.daily_rollup import ExpenseDailyRollup, FleetDailyRollup
+from app.models.vehicle_utilization import AnalyticsWatermark, VehicleDayUtilization, VehicleGpsCursor
+from app.models.billing_run import BillingRun
+from app.models.invoice_sequence import InvoiceSequence
 
 __all__ = [
     "AdminUser",
@@ -25,4 +29,11 @@ __all__ = [
     "GPSLog",
     "Invoice",
     "VehicleExpense",
+    "FleetDailyRollup",
+    "ExpenseDailyRollup",
+    "VehicleDayUtilization",
+    "AnalyticsWatermark",
+    "VehicleGpsCursor",
+    "BillingRun",
+    "InvoiceSequence",
 ]
@@ -0,0 +1,31 @@
+"""BillingRun model - a batch invoice generation job and its progress."""
+from sqlalchemy import Column, Integer, Float, String, Date, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class BillingRun(Base):
+    """Invoices for the un-invoiced completed trips of a period (app/services/billing_run_service.py).
+
+    status: pending -> running -> completed | failed. Trips count toward the period by the UTC day
+    they ended; organization_id None bills every organization. heartbeat_at is touched with every
+    batch commit; a running run whose heartbeat is older than BILLING_RUN_STALE_AFTER_S is failed.
+    """
+
+    __tablename__ = "billing_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=True, index=True)
+    date_from = Column(Date, nullable=False)
+    date_to = Column(Date, nullable=False)
+    status = Column(String(20), default="pending", nullable=False, index=True)
+    total_trips = Column(Integer, default=0, nullable=False)
+    processed_trips = Column(Integer, default=0, nullable=False)
+    invoices_created = Column(Integer, default=0, nullable=False)
+    total_amount = Column(Float, default=0, nullable=False)
+    error = Column(String(500), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,49 @@
+"""Daily rollup models - per-day fleet and expense totals maintained by app/services/rollup_service.py.
+
+Derived data: ids are not foreign keys, so rollup rows never block deleting a vehicle or driver.
+"""
+from sqlalchemy import Column, Integer, Float, String, Date, UniqueConstraint
+
+from app.db.base import Base
+
+
+class FleetDailyRollup(Base):
+    """Trips, distance, revenue and invoices per day, organization, vehicle and driver.
+
+    Trips count on the (UTC) day they were completed, invoices on the day they were created.
+    """
+
+    __tablename__ = "fleet_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("day", "organization_id", "vehicle_id", "driver_id", name="uq_fleet_daily_rollup"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)  # leading column of the unique index
+    organization_id = Column(Integer, nullable=False, index=True)
+    vehicle_id = Column(Integer, nullable=False, index=True)
+    driver_id = Column(Integer, nullable=False, index=True)
+    trips_completed = Column(Integer, default=0, nullable=False)
+    distance_km = Column(Float, default=0, nullable=False)
+    revenue = Column(Float, default=0, nullable=False)
+    invoices_paid = Column(Integer, default=0, nullable=False)
+    invoices_paid_amount = Column(Float, default=0, nullable=False)
+    invoices_pending = Column(Integer, default=0, nullable=False)
+    invoices_pending_amount = Column(Float, default=0, nullable=False)
+
+
+class ExpenseDailyRollup(Base):
+    """Vehicle expenses per (UTC) day, organization, vehicle and expense type."""
+
+    __tablename__ = "expense_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("day", "organization_id", "vehicle_id", "expense_type", name="uq_expense_daily_rollup"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)  # leading column of the unique index
+    organization_id = Column(Integer, nullable=False, index=True)
+    vehicle_id = Column(Integer, nullable=False, index=True)
+    expense_type = Column(String(50), nullable=False)
+    expense_count = Column(Integer, default=0, nullable=False)
+    amount = Column(Float, default=0, nullable=False)
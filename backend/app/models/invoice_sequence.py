@@ -0,0 +1,16 @@
+"""InvoiceSequence model - per-organization invoice number counter."""
+from sqlalchemy import Column, Integer, ForeignKey
+
+from app.db.base import Base
+
+
+class InvoiceSequence(Base):
+    """Last invoice number issued for an organization (app/services/billing_service.py).
+
+    Incremented in the transaction that inserts the invoices, so a rollback gives the numbers back.
+    """
+
+    __tablename__ = "invoice_sequences"
+
+    organization_id = Column(Integer, ForeignKey("organizations.id"), primary_key=True)
+    last_number = Column(Integer, default=0, nullable=False)
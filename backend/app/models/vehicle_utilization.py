@@ -0,0 +1,54 @@
+"""Vehicle utilization models - per vehicle-day GPS analytics and the job watermark."""
+from sqlalchemy import Column, Integer, Float, String, Date, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class VehicleDayUtilization(Base):
+    """GPS-derived metrics per vehicle and (UTC) day, maintained by app/services/utilization_service.py.
+
+    Each interval between two consecutive points of a vehicle counts on the day of its first point.
+    Derived data like the daily rollups: ids are not foreign keys.
+    """
+
+    __tablename__ = "vehicle_day_utilization"
+    __table_args__ = (
+        UniqueConstraint("day", "organization_id", "vehicle_id", name="uq_vehicle_day_utilization"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)  # leading column of the unique index
+    organization_id = Column(Integer, nullable=False, index=True)
+    vehicle_id = Column(Integer, nullable=False, index=True)
+    points = Column(Integer, default=0, nullable=False)
+    distance_km = Column(Float, default=0, nullable=False)
+    tracked_seconds = Column(Float, default=0, nullable=False)  # intervals shorter than the max gap
+    on_trip_seconds = Column(Float, default=0, nullable=False)
+    idle_seconds = Column(Float, default=0, nullable=False)  # below the idle speed
+    hospital_seconds = Column(Float, default=0, nullable=False)  # within the radius of a preset destination
+
+
+class AnalyticsWatermark(Base):
+    """Last source row id processed by an incremental analytics job, with last-run throughput."""
+
+    __tablename__ = "analytics_watermarks"
+
+    job = Column(String(100), primary_key=True)
+    last_id = Column(Integer, default=0, nullable=False)
+    last_run_points = Column(Integer, default=0, nullable=False)
+    last_run_seconds = Column(Float, default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class VehicleGpsCursor(Base):
+    """Latest GPS point processed per vehicle, so the next chunk can close the interval that spans it."""
+
+    __tablename__ = "vehicle_gps_cursors"
+
+    vehicle_id = Column(Integer, primary_key=True)
+    gps_log_id = Column(Integer, nullable=False)
+    trip_id = Column(Integer, nullable=True)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    recorded_epoch = Column(Float, nullable=False)
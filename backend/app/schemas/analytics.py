@@ -0,0 +1,68 @@
+"""Analytics schemas."""
+from datetime import date, datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class VehicleDayUtilizationResponse(BaseModel):
+    """GPS-derived utilization of one vehicle on one (UTC) day. Durations in seconds."""
+
+    day: date
+    organization_id: int
+    vehicle_id: int
+    registration_number: Optional[str] = None
+    points: int
+    distance_km: float
+    tracked_seconds: float
+    on_trip_seconds: float
+    idle_seconds: float
+    hospital_seconds: float
+    on_trip_ratio: float  # on_trip_seconds / 24h
+
+
+class UtilizationJobStatus(BaseModel):
+    """Progress of the utilization job (scripts/process_utilization.py)."""
+
+    last_id: int
+    backlog_points: int
+    last_run_points: int
+    last_run_seconds: float
+    last_run_points_per_sec: float
+    updated_at: Optional[datetime] = None
+
+
+class FuelEfficiencyResponse(BaseModel):
+    """Fuel efficiency of one vehicle over refuel intervals closed in the period (full-tank method)."""
+
+    vehicle_id: int
+    organization_id: int
+    registration_number: Optional[str] = None
+    refuels: int
+    skipped_intervals: int  # odometer did not increase, or no litres
+    odometer_km: float
+    litres: float
+    fuel_cost: float
+    km_per_litre: Optional[float] = None
+    cost_per_km: Optional[float] = None
+    trip_km: float  # completed trips ending within the refuel intervals
+    trip_km_per_litre: Optional[float] = None
+    gps_km: Optional[float] = None  # vehicle_day_utilization over the period's days
+    flags: list[str]
+
+
+class RefuelIntervalResponse(BaseModel):
+    """Distance and fuel between a fuel entry and the vehicle's previous one."""
+
+    expense_id: int
+    created_at: datetime
+    previous_at: datetime
+    odometer_reading: float
+    previous_odometer: float
+    km: float
+    litres: float
+    amount: float
+    trip_km: float
+    km_per_litre: Optional[float] = None
+    cost_per_km: Optional[float] = None
+    valid: bool
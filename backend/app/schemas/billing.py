@@ -1,8 +1,8 @@
 """Billing schemas."""
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 
 
 class InvoiceResponse(BaseModel):
@@ -41,3 +41,39 @@ class InvoiceWithTripResponse(BaseModel):
     organization_address: Optional[str] = None
     organization_phone: Optional[str] = None
     organization_email: Optional[str] = None
+
+
+class BillingRunCreate(BaseModel):
+    """Start a batch billing run for the un-invoiced completed trips that ended in [date_from, date_to]."""
+
+    organization_id: Optional[int] = None  # None = all organizations
+    date_from: date
+    date_to: date
+
+    @model_validator(mode="after")
+    def range_valid(self):
+        if self.date_to < self.date_from:
+            raise ValueError("date_to must not be before date_from")
+        return self
+
+
+class BillingRunResponse(BaseModel):
+    """Batch billing run and its progress."""
+
+    id: int
+    organization_id: Optional[int] = None
+    date_from: date
+    date_to: date
+    status: str  # pending, running, completed, failed
+    total_trips: int
+    processed_trips: int
+    invoices_created: int
+    total_amount: float
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,49 @@
+"""Dashboard schemas - totals read from the daily rollups."""
+from datetime import date
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class FleetTotals(BaseModel):
+    """Fleet counters summed over a period (trips by completion day, invoices by creation day)."""
+
+    trips_completed: int = 0
+    distance_km: float = 0
+    revenue: float = 0
+    invoices_paid: int = 0
+    invoices_paid_amount: float = 0
+    invoices_pending: int = 0
+    invoices_pending_amount: float = 0
+
+
+class ExpenseTypeTotals(BaseModel):
+    count: int
+    amount: float
+
+
+class ExpenseTotals(BaseModel):
+    total_amount: float
+    count: int
+    by_type: dict[str, ExpenseTypeTotals]
+
+
+class DashboardSummary(BaseModel):
+    """Dashboard tiles for one period."""
+
+    fleet: FleetTotals
+    expenses: ExpenseTotals
+
+
+class FleetDay(FleetTotals):
+    day: date
+
+
+class VehicleFleetTotals(FleetTotals):
+    vehicle_id: int
+    registration_number: Optional[str] = None
+
+
+class DriverFleetTotals(FleetTotals):
+    driver_id: int
+    driver_name: Optional[str] = None
@@ -3,6 +3,11 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
+from app.schemas.preset_destination import PresetDestinationResponse
+from app.schemas.preset_location import PresetLocationResponse
+from app.schemas.trip import TripResponse
+from app.schemas.vehicle import VehicleResponse
+
 
 class DriverCreate(BaseModel):
     """Create driver."""
@@ -40,3 +45,14 @@ class DriverResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class DriverBootstrapResponse(BaseModel):
+    """Everything the driver app loads on launch, in one response."""
+
+    me: dict
+    vehicles: list[VehicleResponse]
+    preset_locations: list[PresetLocationResponse]
+    # Destinations with a fixed tariff from each preset location (same as /preset-destinations/by-source)
+    destinations_by_source: dict[int, list[PresetDestinationResponse]]
+    trips_today: list[TripResponse]
@@ -28,3 +28,5 @@ class VehicleLocationResponse(BaseModel):
     destination_lat: float | None = None
     destination_lng: float | None = None
     current_location_name: str | None = None
+    # Estimated seconds to the destination from the historical speed grid (app/services/eta_service.py)
+    eta_seconds: int | None = None
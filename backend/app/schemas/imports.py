@@ -0,0 +1,28 @@
+"""Bulk import schemas."""
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ImportRowError(BaseModel):
+    """One problem in an imported CSV. row is the line number in the file (the header is line 1)."""
+
+    row: int
+    field: Optional[str] = None
+    message: str
+
+
+class ImportErrorReport(BaseModel):
+    """422 detail of a rejected import: nothing was written."""
+
+    rows: int
+    errors: list[ImportRowError]
+
+
+class ImportResult(BaseModel):
+    """Outcome of an accepted import (or of a dry run, which writes nothing)."""
+
+    kind: str
+    rows: int
+    created: int
+    dry_run: bool
@@ -21,12 +21,13 @@ class PresetDestinationUpdate(BaseModel):
 
 
 class PresetDestinationResponse(BaseModel):
-    """Preset destination response."""
+    """Preset destination response. amount is the fixed tariff from the source in by-source lists."""
 
     id: int
     name: str
     latitude: float
     longitude: float
+    amount: Optional[float] = None
 
     class Config:
         from_attributes = True
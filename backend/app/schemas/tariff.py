@@ -1,7 +1,7 @@
 """Tariff schemas."""
-from typing import Optional
+from typing import Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class FixedTariffCreate(BaseModel):
@@ -42,3 +42,28 @@ class FixedTariffResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class TariffQuoteItem(BaseModel):
+    """One candidate destination: a preset destination, a distance, or both."""
+
+    destination_id: Optional[int] = None
+    distance_km: Optional[float] = Field(None, ge=0)
+
+
+class TariffQuoteRequest(BaseModel):
+    """Quote many destinations from one pickup preset."""
+
+    organization_id: Optional[int] = None  # drivers always get their own organization
+    source_id: Optional[int] = None
+    items: list[TariffQuoteItem] = Field(..., max_length=500)
+
+
+class TariffQuoteResponse(BaseModel):
+    """Quote for one item, in request order. pricing is None when neither a fixed tariff nor a distance applies."""
+
+    destination_id: Optional[int] = None
+    distance_km: Optional[float] = None
+    amount: Optional[float] = None
+    pricing: Optional[Literal["fixed", "distance"]] = None
+    fixed_tariff_id: Optional[int] = None
@@ -57,6 +57,8 @@ class TripResponse(BaseModel):
     destination_name: Optional[str] = None
     driver_name: Optional[str] = None
     vehicle_registration_number: Optional[str] = None
+    # Only set by trip start / device-token reissue: send as X-Device-Token with GPS updates.
+    device_token: Optional[str] = None
 
     class Config:
         from_attributes = True
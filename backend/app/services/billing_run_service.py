@@ -0,0 +1,208 @@
+"""Batch billing runs - invoices for all un-invoiced completed trips of a period.
+
+A run is created by POST /billing/runs and executed in the background by execute_billing_run():
+
+- Fixed tariffs of the run's organizations and the fallback rate per km are loaded once into a
+  dict; each trip is then priced in memory by price_trip() (same rules as calculate_trip_cost).
+- Trips are read as Core rows in id order, BILLING_RUN_BATCH_SIZE at a time. Each batch inserts its
+  invoices with one executemany INSERT, re-prices the trips with one bulk UPDATE by primary key,
+  adds the invoice and revenue deltas to the daily rollups, records progress on the run and commits.
+  Invoice numbers are taken per organization as one block of the gapless sequence, just before the
+  commit, so a failed batch gives its numbers back.
+- Only completed trips without any invoice are selected (NOT EXISTS), so a run that failed or was
+  interrupted can simply be started again for the same period; nothing is invoiced twice. Runs
+  whose scope overlaps a pending or running one are refused; the check and the insert of the new
+  run hold the billing_runs lock (app/db/locks.py), so two requests cannot both pass it.
+- A running run touches heartbeat_at with every batch commit. One whose heartbeat is older than
+  BILLING_RUN_STALE_AFTER_S (its worker died), or that stayed pending that long, is marked failed by
+  expire_stale_runs(), so it no longer blocks new runs for its period. Each batch locks its run row
+  (FOR UPDATE) before writing and stops if the run is no longer running; expire_stale_runs() skips
+  locked rows, so a run is only expired between batches and never while one is being written.
+"""
+import logging
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import and_, exists, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.locks import lock_row, xact_lock
+from app.db.session import SessionLocal
+from app.models import BillingRun, FixedTariff, Invoice, Trip
+from app.services.billing_service import allocate_invoice_numbers, price_trip
+from app.services.rollup_service import apply_fleet_rows, invoice_row, revenue_change_rows, utc_midnight
+from app.services.tariff_service import get_fallback_rate_per_km
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("pending", "running")
+
+_TRIP_COLUMNS = (
+    Trip.id,
+    Trip.organization_id,
+    Trip.vehicle_id,
+    Trip.driver_id,
+    Trip.status,
+    Trip.end_time,
+    Trip.is_fixed_tariff,
+    Trip.source_preset_id,
+    Trip.destination_preset_id,
+    Trip.distance_km,
+    Trip.total_amount,
+)
+
+
+def _unbilled_trips(run: BillingRun) -> list:
+    # Half-open range of UTC instants rather than func.date(), whose day depends on the session time zone.
+    clauses = [
+        Trip.status == "completed",
+        Trip.end_time >= utc_midnight(run.date_from),
+        Trip.end_time < utc_midnight(run.date_to + timedelta(days=1)),
+        ~exists().where(Invoice.trip_id == Trip.id),
+    ]
+    if run.organization_id:
+        clauses.append(Trip.organization_id == run.organization_id)
+    return clauses
+
+
+def expire_stale_runs(db: Session) -> int:
+    """Mark failed the running runs without a heartbeat and the pending runs not started within
+    BILLING_RUN_STALE_AFTER_S. Returns how many; caller commits."""
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(seconds=settings.billing_run_stale_after_s)
+    stale = db.scalars(
+        select(BillingRun).where(or_(
+            and_(BillingRun.status == "running", func.coalesce(BillingRun.heartbeat_at, BillingRun.started_at) < cutoff),
+            and_(BillingRun.status == "pending", BillingRun.created_at < cutoff),
+        )).with_for_update(skip_locked=True)  # a locked run is writing a batch right now
+    ).all()
+    for run in stale:
+        logger.warning("Billing run %s: no progress since %s, marking it failed", run.id, run.heartbeat_at or run.created_at)
+        run.error = f"No progress for {settings.billing_run_stale_after_s}s; the worker stopped ({run.status})"
+        run.status = "failed"
+        run.finished_at = now
+    return len(stale)
+
+
+def find_overlapping_run(
+    db: Session, organization_id: Optional[int], date_from: date, date_to: date,
+) -> Optional[BillingRun]:
+    """A pending or running run that could bill the same trips, if any. Stale runs are expired
+    first (expire_stale_runs). Holds the billing_runs lock until the transaction ends: create the
+    new run (create_billing_run) in the same transaction, then commit."""
+    xact_lock(db, "billing_runs")
+    expire_stale_runs(db)
+    stmt = select(BillingRun).where(
+        BillingRun.status.in_(ACTIVE_STATUSES),
+        BillingRun.date_from <= date_to,
+        BillingRun.date_to >= date_from,
+    )
+    if organization_id:
+        stmt = stmt.where(or_(BillingRun.organization_id.is_(None), BillingRun.organization_id == organization_id))
+    return db.scalars(stmt.limit(1)).first()
+
+
+def create_billing_run(db: Session, organization_id: Optional[int], date_from: date, date_to: date) -> BillingRun:
+    """Record a pending run with the number of trips it will bill. Caller commits."""
+    run = BillingRun(organization_id=organization_id, date_from=date_from, date_to=date_to, status="pending")
+    run.total_trips = db.scalar(select(func.count()).select_from(Trip).where(*_unbilled_trips(run)))
+    db.add(run)
+    return run
+
+
+def load_fixed_amounts(db: Session, organization_id: Optional[int]) -> dict[tuple[int, int, int], float]:
+    """(organization_id, source_id, destination_id) -> amount; the lowest id wins, like get_fixed_tariff."""
+    stmt = select(
+        FixedTariff.organization_id, FixedTariff.source_id, FixedTariff.destination_id, FixedTariff.amount
+    ).order_by(FixedTariff.id.desc())
+    if organization_id:
+        stmt = stmt.where(FixedTariff.organization_id == organization_id)
+    return {(org, src, dst): amount for org, src, dst, amount in db.execute(stmt)}
+
+
+def _bill_batch(db: Session, trips: list, fixed_amounts: dict, rate_per_km: float) -> float:
+    """Invoice one batch of trip rows; returns the invoiced total. Caller commits."""
+    invoices, repriced, rollup_rows = [], [], []
+    by_org = defaultdict(list)
+    for trip in trips:
+        amount = price_trip(trip, fixed_amounts, rate_per_km)
+        invoice = {"trip_id": trip.id, "amount": amount, "status": "pending"}
+        invoices.append(invoice)
+        by_org[trip.organization_id].append(invoice)
+        rollup_rows.append(invoice_row(Invoice(amount=amount, status="pending"), trip))
+        if amount != trip.total_amount:
+            repriced.append({"id": trip.id, "total_amount": amount})
+            rollup_rows.extend(revenue_change_rows(trip, trip.total_amount, amount))
+    if repriced:
+        db.execute(update(Trip), repriced)
+    apply_fleet_rows(db, rollup_rows)
+    # Numbers last (see allocate_invoice_numbers), one block per organization in id order, so two
+    # runs never wait on each other's counters in opposite orders; within it in trip id order.
+    for organization_id in sorted(by_org):
+        numbers = allocate_invoice_numbers(db, organization_id, len(by_org[organization_id]))
+        for invoice, number in zip(by_org[organization_id], numbers):
+            invoice["invoice_number"] = number
+    db.execute(insert(Invoice), invoices)
+    return sum(inv["amount"] for inv in invoices)
+
+
+def execute_billing_run(run_id: int, batch_size: Optional[int] = None) -> None:
+    """Run a pending billing run to completion in its own session (background task)."""
+    batch_size = batch_size or settings.billing_run_batch_size
+    db = SessionLocal()
+    try:
+        run = db.get(BillingRun, run_id)
+        if run is None:
+            return
+        lock_row(db, run)
+        if run.status != "pending":
+            db.rollback()
+            return
+        run.status = "running"
+        run.started_at = run.heartbeat_at = datetime.now(timezone.utc)
+        db.commit()
+        start = time.perf_counter()
+        fixed_amounts = load_fixed_amounts(db, run.organization_id)
+        rate_per_km = get_fallback_rate_per_km(db)
+        last_id = 0
+        while True:
+            lock_row(db, run)  # held until the batch commits
+            if run.status != "running":
+                # Expired as stale meanwhile; a new run may already be billing these trips.
+                logger.warning("Billing run %s was marked %s, stopping", run.id, run.status)
+                db.rollback()
+                return
+            trips = db.execute(
+                select(*_TRIP_COLUMNS)
+                .where(*_unbilled_trips(run), Trip.id > last_id)
+                .order_by(Trip.id)
+                .limit(batch_size)
+            ).all()
+            if not trips:
+                break
+            run.total_amount += _bill_batch(db, trips, fixed_amounts, rate_per_km)
+            run.invoices_created += len(trips)
+            run.processed_trips += len(trips)
+            last_id = trips[-1].id
+            run.heartbeat_at = datetime.now(timezone.utc)
+            db.commit()
+        run.status = "completed"
+        run.finished_at = datetime.now(timezone.utc)
+        db.commit()
+        logger.info(
+            "Billing run %s: %s invoices in %.2fs", run.id, run.invoices_created, time.perf_counter() - start,
+        )
+    except Exception as e:
+        logger.exception("Billing run %s failed", run_id)
+        db.rollback()
+        run = db.get(BillingRun, run_id)
+        if run is not None:
+            run.status = "failed"
+            run.error = str(e)[:500]
+            run.finished_at = datetime.now(timezone.utc)
+            db.commit()
+    finally:
+        db.close()
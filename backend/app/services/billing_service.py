@@ -1,9 +1,13 @@
 """Billing service - trip cost calculation and invoice generation."""
-import uuid
+from datetime import date
+from typing import Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session, joinedload
 
-from app.models import Invoice, Trip
+from app.db.upsert import increment_returning
+from app.models import Invoice, InvoiceSequence, Trip
+from app.services.rollup_service import record_invoice
 from app.services.tariff_service import get_fixed_tariff, calculate_distance_tariff
 
 
@@ -25,15 +29,107 @@ def calculate_trip_cost(db: Session, trip: Trip) -> float:
     return calculate_distance_tariff(distance, db)
 
 
+def price_trip(trip, fixed_amounts: dict[tuple[int, int, int], float], rate_per_km: float) -> float:
+    """calculate_trip_cost with the tariffs already loaded: fixed_amounts maps
+    (organization_id, source_id, destination_id) to amount. trip may be a Trip or a Core row."""
+    if trip.is_fixed_tariff and trip.source_preset_id and trip.destination_preset_id:
+        amount = fixed_amounts.get((trip.organization_id, trip.source_preset_id, trip.destination_preset_id))
+        if amount is not None:
+            return amount
+    return (trip.distance_km or 0.0) * rate_per_km
+
+
+def format_invoice_number(organization_id: int, number: int) -> str:
+    return f"INV-{organization_id}-{number:06d}"
+
+
+def allocate_invoice_numbers(db: Session, organization_id: int, count: int = 1) -> list[str]:
+    """Next count invoice numbers of the organization: 1, 2, 3... with no gaps.
+
+    The counter row is locked until the caller's transaction ends (a rollback returns the numbers),
+    so call this as the last write before commit: the lock is then held only for the commit, and
+    is never held while waiting for another lock, which rules out deadlocks with rollup writes.
+    """
+    last = increment_returning(db, InvoiceSequence, {"organization_id": organization_id}, "last_number", count)
+    return [format_invoice_number(organization_id, n) for n in range(last - count + 1, last + 1)]
+
+
 def create_invoice(db: Session, trip: Trip, amount: float, payment_received: bool = False) -> Invoice:
     """Create invoice for a trip. Mark as paid if payment_received."""
     inv = Invoice(
         trip_id=trip.id,
         amount=amount,
-        invoice_number=f"INV-{trip.id}-{uuid.uuid4().hex[:8].upper()}",
         status="paid" if payment_received else "pending",
     )
+    record_invoice(db, inv, trip)
+    inv.invoice_number = allocate_invoice_numbers(db, trip.organization_id)[0]
     db.add(inv)
     db.commit()
     db.refresh(inv)
     return inv
+
+
+def invoice_details_query(db: Session) -> Query:
+    """Invoices with their trip's driver, vehicle, presets and organization loaded (for invoice_details)."""
+    trip = joinedload(Invoice.trip)
+    return db.query(Invoice).options(
+        trip.joinedload(Trip.driver),
+        trip.joinedload(Trip.vehicle),
+        trip.joinedload(Trip.source_preset),
+        trip.joinedload(Trip.destination_preset),
+        trip.joinedload(Trip.organization),
+    )
+
+
+def invoice_details(inv: Invoice) -> dict:
+    """InvoiceWithTripResponse fields of an invoice loaded by invoice_details_query."""
+    t = inv.trip
+    pickup = t.source_preset.name if t.source_preset else None
+    if not pickup and t.pickup_lat is not None and t.pickup_lng is not None:
+        pickup = f"GPS: {t.pickup_lat:.4f}, {t.pickup_lng:.4f}"
+    drop = t.destination_preset.name if t.destination_preset else None
+    if not drop and t.drop_lat is not None and t.drop_lng is not None:
+        drop = f"GPS: {t.drop_lat:.4f}, {t.drop_lng:.4f}"
+    org = t.organization
+    return {
+        "id": inv.id,
+        "trip_id": inv.trip_id,
+        "amount": inv.amount,
+        "invoice_number": inv.invoice_number,
+        "status": inv.status,
+        "created_at": inv.created_at,
+        "driver_name": t.driver.name if t.driver else None,
+        "driver_mobile": t.driver.mobile if t.driver else None,
+        "vehicle_registration": t.vehicle.registration_number if t.vehicle else None,
+        "start_time": t.start_time,
+        "end_time": t.end_time,
+        "distance_km": t.distance_km,
+        "total_amount": t.total_amount,
+        "pickup_location": pickup,
+        "drop_location": drop,
+        "organization_name": org.name if org else None,
+        "organization_address": org.address if org else None,
+        "organization_phone": org.phone if org else None,
+        "organization_email": org.email if org else None,
+    }
+
+
+def invoice_details_list(
+    db: Session,
+    organization_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> list[dict]:
+    """invoice_details of the invoices created in [date_from, date_to], oldest first, in one query."""
+    q = invoice_details_query(db).join(Invoice.trip)
+    if organization_id:
+        q = q.filter(Trip.organization_id == organization_id)
+    if date_from:
+        q = q.filter(func.date(Invoice.created_at) >= date_from)
+    if date_to:
+        q = q.filter(func.date(Invoice.created_at) <= date_to)
+    if status:
+        q = q.filter(Invoice.status == status)
+    return [invoice_details(inv) for inv in q.order_by(Invoice.id).limit(limit).all()]
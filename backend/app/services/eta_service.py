@@ -0,0 +1,292 @@
+"""ETAs for live vehicles from a historical speed grid - no routing service needed.
+
+build_speed_grid() (scripts/build_speed_grid.py, offline) reads the last ETA_GRID_DAYS of gps_logs
+in id chunks and turns each interval between consecutive points of a trip into a speed, assigned to
+the grid cell of its midpoint (ETA_GRID_CELL_DEG degrees of latitude and longitude) and its local
+hour of the week (ETA_TIMEZONE). Stationary intervals (below UTILIZATION_IDLE_SPEED_KMH), gaps over
+UTILIZATION_MAX_GAP_S and GPS jumps are left out. The speed of a cell-hour is its total distance
+over its total time, used only if it has ETA_GRID_MIN_SECONDS of observations.
+
+The grid is one .npy file of a structured array, loaded memory-mapped (workers share the pages and
+pick up a rebuilt file on their next lookup). Row 0 is the fleet-wide speeds; its cell field
+holds minus the cell size in micro-degrees. The other rows are the cells, sorted by cell key.
+
+estimate_eta_seconds() prices all live vehicles at once: ETA_PATH_SAMPLES points along each
+straight line to the destination are looked up in the grid (searchsorted), and the line length
+times ETA_DETOUR_FACTOR is driven through them at those speeds. A cell-hour without data falls
+back to the cell's all-hours speed, then the fleet's speed for that hour, then the fleet's overall
+speed, then ETA_DEFAULT_SPEED_KMH (also used while no grid has been built).
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from sqlalchemy import extract, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import GPSLog
+from app.services.utilization_service import MAX_SPEED_KMH, haversine_km
+
+logger = logging.getLogger(__name__)
+
+HOURS_PER_WEEK = 168
+ETA_PATH_SAMPLES = 16
+GRID_DTYPE = np.dtype([("cell", "<i8"), ("speed", "<f4", (HOURS_PER_WEEK,)), ("all_hours", "<f4")])
+
+# Column order of the chunk arrays.
+ID, VEHICLE, TRIP, LAT, LNG, TS = range(6)
+_POINT_COLUMNS = (
+    GPSLog.id,
+    GPSLog.vehicle_id,
+    GPSLog.trip_id,
+    GPSLog.latitude,
+    GPSLog.longitude,
+    extract("epoch", GPSLog.recorded_at),
+)
+
+
+def grid_path() -> Path:
+    return Path(settings.eta_grid_path or os.path.join(tempfile.gettempdir(), "speed-grid.npy"))
+
+
+def cell_keys(lat: np.ndarray, lng: np.ndarray, cell_deg: float) -> np.ndarray:
+    """Integer key of the grid cell containing each point (row-major over the whole globe)."""
+    columns = int(np.ceil(360.0 / cell_deg))
+    rows = np.floor((np.asarray(lat) + 90.0) / cell_deg).astype(np.int64)
+    cols = np.floor((np.asarray(lng) + 180.0) / cell_deg).astype(np.int64) % columns
+    return rows * columns + cols
+
+
+def hour_of_week(epoch: np.ndarray, tz_name: str) -> np.ndarray:
+    """Local hour of the week, 0 = Monday 00:00-01:00. UTC offsets are looked up once per distinct hour."""
+    hours = np.floor(np.asarray(epoch) / 3600).astype(np.int64)
+    distinct, inverse = np.unique(hours, return_inverse=True)
+    tz = ZoneInfo(tz_name)
+    offsets = np.array(
+        [tz.utcoffset(datetime.fromtimestamp(int(h) * 3600, timezone.utc)).total_seconds() for h in distinct]
+    )
+    local = np.asarray(epoch) + offsets[inverse.reshape(-1)]
+    days = np.floor(local / 86400).astype(np.int64)
+    return ((days + 3) % 7) * 24 + np.floor((local % 86400) / 3600).astype(np.int64)  # 1970-01-01 was a Thursday
+
+
+# --- Building ---
+
+
+def interval_speeds(
+    points: np.ndarray, previous: np.ndarray, max_gap_s: float, idle_speed_kmh: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """(intervals, latest point per vehicle) for a chunk of points.
+
+    previous holds the latest point of each vehicle from earlier chunks, so intervals spanning two
+    chunks are counted once. Each interval row is (mid lat, mid lng, mid epoch, km, seconds).
+    """
+    allpts = np.vstack([previous, points]) if len(previous) else points
+    allpts = allpts[np.lexsort((allpts[:, ID], allpts[:, TS], allpts[:, VEHICLE]))]
+    a, b = allpts[:-1], allpts[1:]
+    dt = b[:, TS] - a[:, TS]
+    dist = haversine_km(a[:, LAT], a[:, LNG], b[:, LAT], b[:, LNG])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speed = np.where(dt > 0, dist / dt * 3600.0, np.inf)
+    keep = (
+        (a[:, VEHICLE] == b[:, VEHICLE])
+        & (a[:, TRIP] >= 0)
+        & (a[:, TRIP] == b[:, TRIP])
+        & (dt > 0)
+        & (dt <= max_gap_s)
+        & (speed >= idle_speed_kmh)
+        & (speed <= MAX_SPEED_KMH)
+    )
+    a, b = a[keep], b[keep]
+    intervals = np.column_stack([
+        (a[:, LAT] + b[:, LAT]) / 2, (a[:, LNG] + b[:, LNG]) / 2, (a[:, TS] + b[:, TS]) / 2, dist[keep], dt[keep],
+    ])
+    last_of_vehicle = np.append(allpts[1:, VEHICLE] != allpts[:-1, VEHICLE], True)
+    return intervals, allpts[last_of_vehicle]
+
+
+def _reduce(keys: np.ndarray, km: np.ndarray, seconds: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sum km and seconds per distinct key."""
+    distinct, inverse = np.unique(keys, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    n = len(distinct)
+    return distinct, np.bincount(inverse, km, n), np.bincount(inverse, seconds, n)
+
+
+def cell_hour_sums(intervals: np.ndarray, cell_deg: float, tz_name: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(cell * 168 + hour of week, km, seconds) summed per key, for (lat, lng, epoch, km, seconds) intervals."""
+    if not len(intervals):
+        return np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0)
+    keys = cell_keys(intervals[:, 0], intervals[:, 1], cell_deg) * HOURS_PER_WEEK + hour_of_week(intervals[:, 2], tz_name)
+    return _reduce(keys, intervals[:, 3], intervals[:, 4])
+
+
+def _speeds(km: np.ndarray, seconds: np.ndarray, min_seconds: float) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(seconds >= min_seconds, km / seconds * 3600.0, np.nan).astype(np.float32)
+
+
+def build_grid_array(
+    keys: np.ndarray, km: np.ndarray, seconds: np.ndarray, cell_deg: float, min_seconds: float,
+) -> np.ndarray:
+    """The GRID_DTYPE array (fleet row first, then cells by key) from distinct cell-hour sums."""
+    cells, how = keys // HOURS_PER_WEEK, keys % HOURS_PER_WEEK
+    cell_ids, cell_km, cell_s = _reduce(cells, km, seconds)
+    speed = np.full((len(cell_ids), HOURS_PER_WEEK), np.nan, dtype=np.float32)
+    speed[np.searchsorted(cell_ids, cells), how] = _speeds(km, seconds, min_seconds)
+
+    grid = np.zeros(len(cell_ids) + 1, dtype=GRID_DTYPE)
+    grid["cell"][0] = -round(cell_deg * 1e6)
+    grid["speed"][0] = _speeds(np.bincount(how, km, HOURS_PER_WEEK), np.bincount(how, seconds, HOURS_PER_WEEK), min_seconds)
+    grid["all_hours"][0] = _speeds(np.array([km.sum()]), np.array([seconds.sum()]), min_seconds)[0]
+    grid["cell"][1:] = cell_ids
+    grid["speed"][1:] = speed
+    grid["all_hours"][1:] = _speeds(cell_km, cell_s, min_seconds)
+    # Cells without enough data at any hour only cost space: the fleet speeds apply there anyway.
+    return np.concatenate([grid[:1], grid[1:][~np.isnan(grid["all_hours"][1:])]])
+
+
+def write_grid(grid: np.ndarray, path: Path) -> None:
+    """Atomic write (temp file + rename): workers that have the old file mapped keep reading it."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        np.save(f, grid)
+    os.replace(tmp, path)
+
+
+def build_speed_grid(
+    db: Session, days: Optional[int] = None, chunk_size: Optional[int] = None, path: Optional[Path] = None,
+) -> dict:
+    """Rebuild the grid file from the last days of gps_logs. Returns points, intervals, cells, seconds."""
+    days = days or settings.eta_grid_days
+    chunk_size = chunk_size or settings.utilization_chunk_size
+    path = path or grid_path()
+    start = time.perf_counter()
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    last_id = (db.scalar(select(func.min(GPSLog.id)).where(GPSLog.recorded_at >= since)) or 1) - 1
+    previous = np.zeros((0, 6))
+    sums = []
+    total = n_intervals = 0
+    while True:
+        rows = db.execute(
+            select(*_POINT_COLUMNS).where(GPSLog.id > last_id).order_by(GPSLog.id).limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+        points = np.array([(*r[:2], -1 if r[2] is None else r[2], *r[3:]) for r in rows], dtype=np.float64)
+        intervals, previous = interval_speeds(
+            points, previous, settings.utilization_max_gap_s, settings.utilization_idle_speed_kmh
+        )
+        sums.append(cell_hour_sums(intervals, settings.eta_grid_cell_deg, settings.eta_timezone))
+        total += len(points)
+        n_intervals += len(intervals)
+        last_id = int(points[-1, ID])
+    db.rollback()
+    if not sums:
+        sums = [(np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0))]
+    keys, km, seconds = (np.concatenate(parts) for parts in zip(*sums))
+    grid = build_grid_array(*_reduce(keys, km, seconds), settings.eta_grid_cell_deg, settings.eta_grid_min_seconds)
+    write_grid(grid, path)
+    elapsed = time.perf_counter() - start
+    logger.info("Speed grid: %d GPS points, %d intervals, %d cells in %.2fs", total, n_intervals, len(grid) - 1, elapsed)
+    return {"points": total, "intervals": n_intervals, "cells": len(grid) - 1, "seconds": elapsed, "path": str(path)}
+
+
+# --- Lookup ---
+
+_loaded: Optional[tuple[tuple[float, int], dict]] = None  # ((mtime, size), arrays)
+_load_lock = threading.Lock()
+
+
+def _open_grid(path: Path) -> dict:
+    grid = np.load(path, mmap_mode="r")
+    return {
+        "cell_deg": -float(grid[0]["cell"]) / 1e6,
+        "cells": np.array(grid["cell"][1:]),  # keys in memory for searchsorted; speeds stay mapped
+        "speed": grid["speed"][1:],
+        "all_hours": grid["all_hours"][1:],
+        "fleet": np.array(grid[0]["speed"]),
+        "fleet_all": float(grid[0]["all_hours"]),
+    }
+
+
+def get_speed_grid() -> Optional[dict]:
+    """The current grid (re-opened when the file changes), or None if it has not been built."""
+    global _loaded
+    path = grid_path()
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    signature = (stat.st_mtime, stat.st_size)
+    loaded = _loaded
+    if loaded is not None and loaded[0] == signature:
+        return loaded[1]
+    with _load_lock:
+        if _loaded is None or _loaded[0] != signature:
+            try:
+                _loaded = (signature, _open_grid(path))
+            except (OSError, ValueError, IndexError) as e:
+                logger.warning("Speed grid %s unreadable, using default speed: %s", path, e)
+                return None
+        return _loaded[1]
+
+
+def lookup_speeds(grid: Optional[dict], lat: np.ndarray, lng: np.ndarray, how: int) -> np.ndarray:
+    """km/h at each point for hour of week how, with the fallbacks described in the module docstring."""
+    default = settings.eta_default_speed_kmh
+    if grid is None:
+        return np.full(np.shape(lat), default)
+    keys = cell_keys(lat, lng, grid["cell_deg"])
+    cells = grid["cells"]
+    idx = np.minimum(np.searchsorted(cells, keys), max(len(cells) - 1, 0))
+    found = (cells[idx] == keys) if len(cells) else np.zeros(keys.shape, dtype=bool)
+    speed = np.full(keys.shape, np.nan)
+    if found.any():
+        rows = idx[found]
+        cell_speed = np.asarray(grid["speed"][rows, how], dtype=np.float64)
+        speed[found] = np.where(np.isnan(cell_speed), grid["all_hours"][rows], cell_speed)
+    for fallback in (grid["fleet"][how], grid["fleet_all"], default):
+        speed = np.where(np.isnan(speed), fallback, speed)
+    return speed
+
+
+def estimate_eta_seconds(
+    lat: np.ndarray, lng: np.ndarray, dest_lat: np.ndarray, dest_lng: np.ndarray, at: Optional[datetime] = None,
+) -> np.ndarray:
+    """Seconds to drive from each (lat, lng) to its destination, leaving at time at (default now)."""
+    lat, lng, dest_lat, dest_lng = (np.asarray(a, dtype=np.float64) for a in (lat, lng, dest_lat, dest_lng))
+    at = at or datetime.now(timezone.utc)
+    how = int(hour_of_week(np.array([at.timestamp()]), settings.eta_timezone)[0])
+    fractions = (np.arange(ETA_PATH_SAMPLES) + 0.5) / ETA_PATH_SAMPLES
+    path_lat = lat[:, None] + (dest_lat - lat)[:, None] * fractions
+    path_lng = lng[:, None] + (dest_lng - lng)[:, None] * fractions
+    speeds = lookup_speeds(get_speed_grid(), path_lat, path_lng, how)
+    km = haversine_km(lat, lng, dest_lat, dest_lng) * settings.eta_detour_factor
+    hours = (km / ETA_PATH_SAMPLES)[:, None] / np.maximum(speeds, 1.0)
+    return hours.sum(axis=1) * 3600.0
+
+
+def add_etas(rows: list[dict]) -> list[dict]:
+    """Set eta_seconds on live vehicle rows that have a destination (one vectorized pass); None otherwise."""
+    targets = [r for r in rows if r["destination_lat"] is not None and r["destination_lng"] is not None]
+    for r in rows:
+        r["eta_seconds"] = None
+    if targets:
+        coords = np.array(
+            [(r["latitude"], r["longitude"], r["destination_lat"], r["destination_lng"]) for r in targets],
+            dtype=np.float64,
+        )
+        etas = estimate_eta_seconds(coords[:, 0], coords[:, 1], coords[:, 2], coords[:, 3])
+        for r, eta in zip(targets, etas):
+            r["eta_seconds"] = int(round(eta))
+    return rows
@@ -0,0 +1,26 @@
+"""Vehicle expense service - shared filters."""
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import func
+
+from app.models import VehicleExpense
+
+
+def expense_filters(
+    vehicle_id: Optional[int] = None,
+    expense_type: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> list:
+    """WHERE clauses for the expense list filters (shared by GET /vehicle-expenses and the export)."""
+    clauses = []
+    if vehicle_id:
+        clauses.append(VehicleExpense.vehicle_id == vehicle_id)
+    if expense_type:
+        clauses.append(VehicleExpense.expense_type == expense_type)
+    if date_from:
+        clauses.append(func.date(VehicleExpense.created_at) >= date_from)
+    if date_to:
+        clauses.append(func.date(VehicleExpense.created_at) <= date_to)
+    return clauses
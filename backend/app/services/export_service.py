@@ -0,0 +1,141 @@
+"""Streaming exports - NDJSON / CSV rows straight from a server-side cursor, optionally gzipped.
+
+Each export opens its own session inside the generator (request-scoped sessions are closed before
+a streaming body is sent) and fetches with yield_per, so memory stays at one batch of rows whatever
+the result size. Rows are encoded and, when the client accepts it, gzip-compressed batch by batch.
+"""
+import csv
+import io
+import logging
+import zlib
+from datetime import date, datetime
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy import Select, func, select
+
+from app.core.serialization import dumps
+from app.db.session import SessionLocal
+from app.models import Invoice, VehicleExpense
+from app.services.expense_service import expense_filters
+from app.services.trip_service import TRIP_RESPONSE_FIELDS, trip_row_to_dict, trip_rows_stmt
+
+logger = logging.getLogger(__name__)
+
+BATCH_ROWS = 1000
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+TRIP_EXPORT_COLUMNS = (
+    *TRIP_RESPONSE_FIELDS, "pickup_location_name", "destination_name", "driver_name", "vehicle_registration_number",
+)
+INVOICE_EXPORT_COLUMNS = ("id", "trip_id", "amount", "invoice_number", "status", "created_at")
+EXPENSE_EXPORT_COLUMNS = (
+    "id", "vehicle_id", "expense_type", "bill_number", "description", "amount",
+    "odometer_reading", "qty_refueled", "created_at",
+)
+
+
+def trips_export_stmt(filters: list) -> Select:
+    return trip_rows_stmt().where(*filters)
+
+
+def invoices_export_stmt(
+    trip_id: Optional[int] = None, date_from: Optional[date] = None, date_to: Optional[date] = None
+) -> Select:
+    stmt = select(*(getattr(Invoice, c) for c in INVOICE_EXPORT_COLUMNS))
+    if trip_id:
+        stmt = stmt.where(Invoice.trip_id == trip_id)
+    if date_from:
+        stmt = stmt.where(func.date(Invoice.created_at) >= date_from)
+    if date_to:
+        stmt = stmt.where(func.date(Invoice.created_at) <= date_to)
+    return stmt.order_by(Invoice.created_at.desc())
+
+
+def expenses_export_stmt(filters: list) -> Select:
+    return (
+        select(*(getattr(VehicleExpense, c) for c in EXPENSE_EXPORT_COLUMNS))
+        .where(*filters)
+        .order_by(VehicleExpense.created_at.desc())
+    )
+
+
+def _trip_record(row) -> dict:
+    d = trip_row_to_dict(row)
+    d.pop("device_token")
+    return d
+
+
+def _plain_record(row) -> dict:
+    return dict(row._mapping)
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return "" if value is None else value
+
+
+def _encode_batches(rows, to_record: Callable, columns: tuple, fmt: str) -> Iterator[bytes]:
+    """Encoded bytes per batch of rows (CSV starts with a header line)."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for partition in rows.partitions():
+            for row in partition:
+                record = to_record(row)
+                writer.writerow([_csv_value(record[c]) for c in columns])
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+        return
+    for partition in rows.partitions():
+        yield b"".join(dumps(to_record(row)) + b"\n" for row in partition)
+
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def stream_export(stmt: Select, to_record: Callable, columns: tuple, fmt: str, gzip: bool) -> Iterator[bytes]:
+    """Generator for StreamingResponse: opens a session, streams rows with yield_per, closes at the end."""
+
+    def generate() -> Iterator[bytes]:
+        db = SessionLocal()
+        try:
+            rows = db.execute(stmt.execution_options(yield_per=BATCH_ROWS))
+            yield from _encode_batches(rows, to_record, columns, fmt)
+        except Exception:
+            # Headers are already sent; the client sees a truncated body.
+            logger.exception("Export stream failed")
+            raise
+        finally:
+            db.close()
+
+    return _gzip(generate()) if gzip else generate()
+
+
+def stream_trips(filters: list, fmt: str, gzip: bool) -> Iterator[bytes]:
+    return stream_export(trips_export_stmt(filters), _trip_record, TRIP_EXPORT_COLUMNS, fmt, gzip)
+
+
+def stream_invoices(
+    trip_id: Optional[int], date_from: Optional[date], date_to: Optional[date], fmt: str, gzip: bool,
+) -> Iterator[bytes]:
+    stmt = invoices_export_stmt(trip_id, date_from, date_to)
+    return stream_export(stmt, _plain_record, INVOICE_EXPORT_COLUMNS, fmt, gzip)
+
+
+def stream_expenses(
+    vehicle_id: Optional[int], expense_type: Optional[str], date_from: Optional[date], date_to: Optional[date],
+    fmt: str, gzip: bool,
+) -> Iterator[bytes]:
+    stmt = expenses_export_stmt(expense_filters(vehicle_id, expense_type, date_from, date_to))
+    return stream_export(stmt, _plain_record, EXPENSE_EXPORT_COLUMNS, fmt, gzip)
@@ -0,0 +1,263 @@
+"""Fuel efficiency - km per litre and cost per km between consecutive refuels, per vehicle.
+
+Uses the full-tank method: the litres and amount of a fuel entry pay for the distance driven since
+the vehicle's previous fuel entry, i.e. the odometer difference found with LAG() over the fuel
+entries of each vehicle (ordered by created_at). The same interval is matched with the km of the
+vehicle's completed trips that ended in it (correlated subquery on trips) and, for the whole period,
+with the GPS km of vehicle_day_utilization. Intervals whose odometer did not increase, or with no
+litres, are counted as skipped instead of distorting the averages.
+
+An interval belongs to the period of its closing entry; the opening entry may be older. Periods
+are UTC days, filtered as ranges of instants (utc_midnight), like vehicle_day_utilization.day and
+the rollups. The report for a period is cached in Redis, keyed by the vehicle_expenses version
+counter (a new, edited or deleted expense gives a new key) and the utilization job watermark (GPS
+km processed since give a new key), and expiring after FUEL_REPORT_CACHE_TTL. FUEL_REPORT_CLOSED_CACHE_TTL is used only once
+the period has ended before today and the utilization job has processed GPS points past its last
+day, so its GPS km can no longer grow. Trip km need no key of their own: a trip counts when it ends,
+within an interval that closes by the end of the period.
+"""
+import logging
+import statistics
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis_client import REDIS_ERRORS, get_redis
+from app.core.serialization import dumps
+from app.core.versions import get_versions
+from app.models import AnalyticsWatermark, GPSLog, Trip, Vehicle, VehicleDayUtilization, VehicleExpense
+from app.services.rollup_service import utc_day, utc_midnight
+from app.services.utilization_service import JOB as UTILIZATION_JOB
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "fuel-report"
+
+
+def _fills(organization_id: Optional[int], vehicle_id: Optional[int], date_to: Optional[date]):
+    """Fuel entries with the previous entry's odometer and time of the same vehicle (LAG)."""
+    window = {"partition_by": VehicleExpense.vehicle_id, "order_by": (VehicleExpense.created_at, VehicleExpense.id)}
+    stmt = (
+        select(
+            VehicleExpense.id.label("expense_id"),
+            VehicleExpense.vehicle_id,
+            Vehicle.organization_id,
+            Vehicle.registration_number,
+            VehicleExpense.created_at,
+            VehicleExpense.odometer_reading,
+            VehicleExpense.qty_refueled.label("litres"),
+            VehicleExpense.amount,
+            func.lag(VehicleExpense.odometer_reading).over(**window).label("previous_odometer"),
+            func.lag(VehicleExpense.created_at).over(**window).label("previous_at"),
+        )
+        .join(Vehicle, Vehicle.id == VehicleExpense.vehicle_id)
+        .where(VehicleExpense.expense_type == "fuel", VehicleExpense.odometer_reading.isnot(None))
+    )
+    if organization_id:
+        stmt = stmt.where(Vehicle.organization_id == organization_id)
+    if vehicle_id:
+        stmt = stmt.where(VehicleExpense.vehicle_id == vehicle_id)
+    if date_to:
+        # Later entries cannot be the previous entry of one in the period.
+        stmt = stmt.where(VehicleExpense.created_at < utc_midnight(date_to + timedelta(days=1)))
+    return stmt.subquery()
+
+
+def _intervals(
+    organization_id: Optional[int], vehicle_id: Optional[int], date_from: Optional[date], date_to: Optional[date],
+):
+    """One row per refuel interval closed in the period: odometer km, litres, amount and trip km."""
+    fills = _fills(organization_id, vehicle_id, date_to)
+    km = fills.c.odometer_reading - fills.c.previous_odometer
+    trip_km = (
+        select(func.coalesce(func.sum(Trip.distance_km), 0))
+        .where(
+            Trip.vehicle_id == fills.c.vehicle_id,
+            Trip.status == "completed",
+            Trip.end_time > fills.c.previous_at,
+            Trip.end_time <= fills.c.created_at,
+        )
+        .scalar_subquery()
+    )
+    stmt = select(
+        *fills.c,
+        km.label("km"),
+        trip_km.label("trip_km"),
+        and_(km > 0, fills.c.litres > 0).label("valid"),
+    ).where(fills.c.previous_odometer.isnot(None))
+    if date_from:
+        stmt = stmt.where(fills.c.created_at >= utc_midnight(date_from))
+    return stmt.subquery()
+
+
+def _ratio(numerator: float, denominator: float) -> Optional[float]:
+    return numerator / denominator if denominator else None
+
+
+def refuel_intervals(
+    db: Session, vehicle_id: int, date_from: Optional[date] = None, date_to: Optional[date] = None,
+) -> list[dict]:
+    """Refuel intervals of one vehicle, oldest first, with km/l and cost/km of each."""
+    intervals = _intervals(None, vehicle_id, date_from, date_to)
+    rows = db.execute(select(intervals).order_by(intervals.c.created_at, intervals.c.expense_id)).mappings().all()
+    result = []
+    for r in rows:
+        valid = bool(r["valid"])
+        result.append({
+            "expense_id": r["expense_id"],
+            "created_at": r["created_at"],
+            "previous_at": r["previous_at"],
+            "odometer_reading": r["odometer_reading"],
+            "previous_odometer": r["previous_odometer"],
+            "km": r["km"],
+            "litres": r["litres"] or 0.0,
+            "amount": r["amount"],
+            "trip_km": float(r["trip_km"]),
+            "km_per_litre": _ratio(r["km"], r["litres"]) if valid else None,
+            "cost_per_km": _ratio(r["amount"], r["km"]) if valid else None,
+            "valid": valid,
+        })
+    return result
+
+
+def _gps_km(
+    db: Session, organization_id: Optional[int], vehicle_id: Optional[int], date_from: Optional[date], date_to: Optional[date],
+) -> dict[int, float]:
+    stmt = select(VehicleDayUtilization.vehicle_id, func.sum(VehicleDayUtilization.distance_km)).group_by(
+        VehicleDayUtilization.vehicle_id
+    )
+    if organization_id:
+        stmt = stmt.where(VehicleDayUtilization.organization_id == organization_id)
+    if vehicle_id:
+        stmt = stmt.where(VehicleDayUtilization.vehicle_id == vehicle_id)
+    if date_from:
+        stmt = stmt.where(VehicleDayUtilization.day >= date_from)
+    if date_to:
+        stmt = stmt.where(VehicleDayUtilization.day <= date_to)
+    return {vid: float(km or 0) for vid, km in db.execute(stmt)}
+
+
+def fuel_efficiency(
+    db: Session,
+    organization_id: Optional[int] = None,
+    vehicle_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> list[dict]:
+    """Per-vehicle fuel efficiency for the period, least efficient first, with anomaly flags.
+
+    Flags: low_km_per_litre (below the median of the vehicles in the report by more than
+    FUEL_ANOMALY_TOLERANCE), odometer_exceeds_gps (odometer km above GPS km by more than the
+    tolerance), skipped_intervals (odometer went backwards or did not move between two refuels).
+    """
+    intervals = _intervals(organization_id, vehicle_id, date_from, date_to)
+    valid = intervals.c.valid
+
+    def valid_sum(column):
+        return func.coalesce(func.sum(case((valid, column), else_=0)), 0)
+
+    rows = db.execute(
+        select(
+            intervals.c.vehicle_id,
+            intervals.c.organization_id,
+            intervals.c.registration_number,
+            func.sum(case((valid, 1), else_=0)).label("refuels"),
+            func.sum(case((valid, 0), else_=1)).label("skipped_intervals"),
+            valid_sum(intervals.c.km).label("odometer_km"),
+            valid_sum(intervals.c.litres).label("litres"),
+            valid_sum(intervals.c.amount).label("fuel_cost"),
+            valid_sum(intervals.c.trip_km).label("trip_km"),
+        ).group_by(intervals.c.vehicle_id, intervals.c.organization_id, intervals.c.registration_number)
+    ).mappings().all()
+    gps_km = _gps_km(db, organization_id, vehicle_id, date_from, date_to)
+
+    report = []
+    for r in rows:
+        odometer_km, litres = float(r["odometer_km"]), float(r["litres"])
+        trip_km, fuel_cost = float(r["trip_km"]), float(r["fuel_cost"])
+        report.append({
+            "vehicle_id": r["vehicle_id"],
+            "organization_id": r["organization_id"],
+            "registration_number": r["registration_number"],
+            "refuels": int(r["refuels"]),
+            "skipped_intervals": int(r["skipped_intervals"]),
+            "odometer_km": odometer_km,
+            "litres": litres,
+            "fuel_cost": fuel_cost,
+            "km_per_litre": _ratio(odometer_km, litres),
+            "cost_per_km": _ratio(fuel_cost, odometer_km),
+            "trip_km": trip_km,
+            "trip_km_per_litre": _ratio(trip_km, litres),
+            "gps_km": gps_km.get(r["vehicle_id"]),
+            "flags": [],
+        })
+    _flag_anomalies(report, settings.fuel_anomaly_tolerance)
+    report.sort(key=lambda v: (v["km_per_litre"] is None, v["km_per_litre"] or 0.0))
+    return report
+
+
+def _flag_anomalies(report: list[dict], tolerance: float) -> None:
+    efficiencies = [v["km_per_litre"] for v in report if v["km_per_litre"] is not None]
+    median = statistics.median(efficiencies) if efficiencies else None
+    for v in report:
+        if median and v["km_per_litre"] is not None and v["km_per_litre"] < median * (1 - tolerance):
+            v["flags"].append("low_km_per_litre")
+        if v["gps_km"] and v["odometer_km"] > v["gps_km"] * (1 + tolerance):
+            v["flags"].append("odometer_exceeds_gps")
+        if v["skipped_intervals"]:
+            v["flags"].append("skipped_intervals")
+
+
+def _utilization_progress(db: Session) -> tuple[int, Optional[date]]:
+    """Watermark of the utilization job and the UTC day of the last GPS point it processed."""
+    row = db.execute(
+        select(AnalyticsWatermark.last_id, GPSLog.recorded_at)
+        .outerjoin(GPSLog, GPSLog.id == AnalyticsWatermark.last_id)
+        .where(AnalyticsWatermark.job == UTILIZATION_JOB)
+    ).first()
+    if row is None:
+        return 0, None
+    return row.last_id, utc_day(row.recorded_at) if row.recorded_at is not None else None
+
+
+def fuel_efficiency_json(
+    db: Session,
+    organization_id: Optional[int] = None,
+    vehicle_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> bytes:
+    """fuel_efficiency() as JSON bytes, served from the per-period Redis cache when possible."""
+    versions = get_versions([("vehicle_expenses", None)])
+    key = None
+    if versions is not None:
+        gps_mark, gps_day = _utilization_progress(db)
+        key = (
+            f"{CACHE_PREFIX}:{versions[0]}:{gps_mark}:{organization_id or ''}:{vehicle_id or ''}"
+            f":{date_from or ''}:{date_to or ''}"
+        )
+        try:
+            cached = get_redis().get(key)
+            if cached is not None:
+                return cached
+        except REDIS_ERRORS as e:
+            logger.warning("Fuel report cache read failed: %s", e)
+            key = None
+    body = dumps(fuel_efficiency(db, organization_id, vehicle_id, date_from, date_to))
+    if key is not None:
+        closed = (
+            date_to is not None
+            and date_to < datetime.utcnow().date()
+            and gps_day is not None
+            and gps_day > date_to
+        )
+        ttl = settings.fuel_report_closed_cache_ttl if closed else settings.fuel_report_cache_ttl
+        try:
+            if ttl > 0:
+                get_redis().setex(key, int(ttl), body)
+        except REDIS_ERRORS as e:
+            logger.warning("Fuel report cache write failed: %s", e)
+    return body
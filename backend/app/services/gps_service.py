@@ -5,14 +5,27 @@ from datetime import datetime
 from typing import Optional
 
 import redis
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 
-from app.core.config import settings
-from app.models import GPSLog, Vehicle
+from app.core.redis_client import REDIS_ERRORS, get_async_redis, get_redis
+from app.models import GPSLog, Trip, Vehicle
+from app.services.eta_service import add_etas
 
 logger = logging.getLogger(__name__)
 
 
+def _live_payload(vehicle_id: int, latitude: float, longitude: float, trip_id: Optional[int]) -> str:
+    return json.dumps({
+        "vehicle_id": vehicle_id,
+        "latitude": latitude,
+        "longitude": longitude,
+        "trip_id": trip_id,
+        "last_updated": datetime.utcnow().isoformat(),
+    })
+
+
 class GPSService:
     """Service for GPS tracking and logging."""
 
@@ -21,14 +34,11 @@ class GPSService:
 
     def __init__(self, db: Session):
         self.db = db
-        self._redis: Optional[redis.Redis] = None
 
     @property
     def redis_client(self) -> redis.Redis:
-        """Lazy Redis connection."""
-        if self._redis is None:
-            self._redis = redis.from_url(settings.redis_url)
-        return self._redis
+        """Shared process-wide Redis client (pooled connections)."""
+        return get_redis()
 
     def update_vehicle_location(
         self,
@@ -39,20 +49,13 @@ class GPSService:
     ) -> None:
         """Update live vehicle location in Redis and optionally store GPS log."""
         key = f"{self.LIVE_KEY_PREFIX}{vehicle_id}"
-        data = {
-            "vehicle_id": vehicle_id,
-            "latitude": latitude,
-            "longitude": longitude,
-            "trip_id": trip_id,
-            "last_updated": datetime.utcnow().isoformat(),
-        }
         try:
             self.redis_client.setex(
                 key,
                 self.LIVE_TTL,
-                json.dumps(data),
+                _live_payload(vehicle_id, latitude, longitude, trip_id),
             )
-        except redis.ConnectionError as e:
+        except REDIS_ERRORS as e:
             logger.warning("Redis unavailable, skipping live location update: %s", e)
 
     def store_gps_log(
@@ -75,15 +78,133 @@ class GPSService:
         return log
 
     def get_live_vehicle_locations(self) -> list[dict]:
-        """Get all live vehicle locations from Redis."""
+        """Get all live vehicle locations from Redis (SCAN for keys, one MGET for values)."""
         try:
-            keys = self.redis_client.keys(f"{self.LIVE_KEY_PREFIX}*")
-            result = []
-            for key in keys:
-                data = self.redis_client.get(key)
-                if data:
-                    result.append(json.loads(data))
-            return result
-        except redis.ConnectionError as e:
+            keys = list(self.redis_client.scan_iter(match=f"{self.LIVE_KEY_PREFIX}*", count=500))
+            if not keys:
+                return []
+            return [json.loads(data) for data in self.redis_client.mget(keys) if data]
+        except REDIS_ERRORS as e:
             logger.warning("Redis unavailable, returning empty live locations: %s", e)
             return []
+
+    def get_live_vehicles(self) -> list[dict]:
+        """Live locations enriched with vehicle and trip details (two queries, not two per vehicle)."""
+        locations = self.get_live_vehicle_locations()
+        if not locations:
+            return []
+        vehicles, trips = _live_context_statements(locations)
+        reg_numbers = dict(self.db.execute(vehicles).all())
+        trips_by_id = {t.id: t for t in self.db.scalars(trips).unique()} if trips is not None else {}
+        return build_live_vehicle_rows(locations, reg_numbers, trips_by_id)
+
+
+async def update_vehicle_location_async(
+    vehicle_id: int,
+    latitude: float,
+    longitude: float,
+    trip_id: Optional[int] = None,
+) -> None:
+    """Async variant of GPSService.update_vehicle_location using the shared asyncio client."""
+    try:
+        await get_async_redis().setex(
+            f"{GPSService.LIVE_KEY_PREFIX}{vehicle_id}",
+            GPSService.LIVE_TTL,
+            _live_payload(vehicle_id, latitude, longitude, trip_id),
+        )
+    except REDIS_ERRORS as e:
+        logger.warning("Redis unavailable, skipping live location update: %s", e)
+
+
+async def get_live_vehicle_locations_async() -> list[dict]:
+    """Async variant of GPSService.get_live_vehicle_locations."""
+    client = get_async_redis()
+    try:
+        keys = [k async for k in client.scan_iter(match=f"{GPSService.LIVE_KEY_PREFIX}*", count=500)]
+        if not keys:
+            return []
+        return [json.loads(data) for data in await client.mget(keys) if data]
+    except REDIS_ERRORS as e:
+        logger.warning("Redis unavailable, returning empty live locations: %s", e)
+        return []
+
+
+async def get_live_vehicles_async(db: AsyncSession) -> list[dict]:
+    """Async variant of GPSService.get_live_vehicles."""
+    locations = await get_live_vehicle_locations_async()
+    if not locations:
+        return []
+    vehicles, trips = _live_context_statements(locations)
+    reg_numbers = dict((await db.execute(vehicles)).all())
+    trips_by_id = {t.id: t for t in (await db.scalars(trips)).unique()} if trips is not None else {}
+    return build_live_vehicle_rows(locations, reg_numbers, trips_by_id)
+
+
+def _live_context_statements(locations: list[dict]):
+    """Statements loading registration numbers and active trips for a batch of live locations."""
+    vehicle_ids = {loc["vehicle_id"] for loc in locations}
+    trip_ids = {loc["trip_id"] for loc in locations if loc.get("trip_id")}
+    vehicles = select(Vehicle.id, Vehicle.registration_number).where(Vehicle.id.in_(vehicle_ids))
+    trips = None
+    if trip_ids:
+        trips = (
+            select(Trip)
+            .options(
+                joinedload(Trip.source_preset),
+                joinedload(Trip.destination_preset),
+                joinedload(Trip.driver),
+            )
+            .where(Trip.id.in_(trip_ids))
+        )
+    return vehicles, trips
+
+
+def build_live_vehicle_rows(
+    locations: list[dict],
+    reg_numbers: dict[int, str],
+    trips_by_id: dict[int, Trip],
+) -> list[dict]:
+    """Combine Redis live locations with preloaded vehicles and trips into VehicleLocationResponse
+    shaped dicts (encoded with orjson by the routes, no per-row model), with ETAs to the destination."""
+    result = []
+    for loc in locations:
+        vehicle_id = loc["vehicle_id"]
+        pickup_lat = None
+        pickup_lng = None
+        dest_lat = None
+        dest_lng = None
+        driver_name = None
+        trip_id = loc.get("trip_id")
+        trip = trips_by_id.get(trip_id) if trip_id else None
+        if trip:
+            driver_name = trip.driver.name if trip.driver else None
+            if trip.source_preset:
+                pickup_lat = trip.source_preset.latitude
+                pickup_lng = trip.source_preset.longitude
+            elif trip.pickup_lat is not None and trip.pickup_lng is not None:
+                pickup_lat = trip.pickup_lat
+                pickup_lng = trip.pickup_lng
+            if trip.destination_preset:
+                dest_lat = trip.destination_preset.latitude
+                dest_lng = trip.destination_preset.longitude
+            elif trip.drop_lat is not None and trip.drop_lng is not None:
+                dest_lat = trip.drop_lat
+                dest_lng = trip.drop_lng
+
+        result.append({
+            "vehicle_id": vehicle_id,
+            "registration_number": reg_numbers.get(vehicle_id) or str(vehicle_id),
+            "driver_name": driver_name,
+            "latitude": float(loc["latitude"]),
+            "longitude": float(loc["longitude"]),
+            "last_updated": loc["last_updated"],
+            "trip_id": trip_id,
+            "pickup_location_name": None,
+            "pickup_lat": pickup_lat,
+            "pickup_lng": pickup_lng,
+            "destination_name": None,
+            "destination_lat": dest_lat,
+            "destination_lng": dest_lng,
+            "current_location_name": None,
+        })
+    return add_etas(result)
@@ -0,0 +1,305 @@
+"""Bulk CSV import - vehicles, drivers, preset locations, fixed tariffs and vehicle expenses of one organization.
+
+validate_import() checks every row of the file with the schema of the matching single-create
+endpoint and resolves references in bulk: one query per lookup (existing registration numbers,
+user IDs, preset and destination names, vehicles of the organization) instead of one per row.
+Any error rejects the whole file; each error carries its CSV line number. write_import() then
+inserts all rows with one executemany INSERT in a single transaction. Driver passwords are hashed
+before that by hash_passwords(), PASSWORD_HASH_WORKERS at a time on the shared bcrypt executor.
+
+Driver user IDs are global and have no unique constraint, and the bcrypt step leaves a long gap
+between validation and the INSERT. write_import() therefore checks them again inside the writing
+transaction, holding the driver_logins lock (app/db/locks.py) that the driver create and update
+routes also take, and raises ImportConflict if another request registered one meanwhile.
+
+The bulk INSERT bypasses the ORM unit of work: write_import() adds imported expenses to the daily
+rollups itself, and bump_import_versions() bumps the data version counters after the commit.
+"""
+import asyncio
+import csv
+import io
+from collections import defaultdict
+from typing import Callable, Optional
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.password_hasher import hash_password_async
+from app.core.versions import VERSIONED_TABLES, bump_versions
+from app.db.locks import xact_lock
+from app.models import Driver, FixedTariff, PresetDestination, PresetLocation, Vehicle, VehicleExpense
+from app.schemas.driver import DriverCreate
+from app.schemas.preset_location import PresetLocationCreate
+from app.schemas.tariff import FixedTariffCreate
+from app.schemas.vehicle import VehicleCreate
+from app.schemas.vehicle_expense import VehicleExpenseCreate
+from app.services.rollup_service import apply_expense_rows, expense_row
+
+Row = tuple[int, dict]  # (CSV line number, non-empty values by lower-case column name)
+
+class ImportConflict(Exception):
+    """Values validated as new were written by another request before this import's INSERT."""
+
+    def __init__(self, field: str, values: list[str]) -> None:
+        super().__init__(f"{field} already exists: {', '.join(values)}")
+        self.field = field
+        self.values = values
+
+
+def read_csv(content: bytes) -> list[Row]:
+    """Parse a UTF-8 CSV with a header row. Raises ValueError if it is unreadable or too long."""
+    reader = csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
+    if not reader.fieldnames:
+        raise ValueError("CSV has no header row")
+    reader.fieldnames = [(name or "").strip().lower() for name in reader.fieldnames]
+    rows = []
+    for record in reader:
+        values = {k: v.strip() for k, v in record.items() if k and isinstance(v, str) and v.strip()}
+        if values:
+            rows.append((reader.line_num, values))
+        if len(rows) > settings.import_max_rows:
+            raise ValueError(f"CSV has more than {settings.import_max_rows} rows")
+    return rows
+
+
+def _error(errors: list[dict], line: int, field: Optional[str], message: str) -> None:
+    errors.append({"row": line, "field": field, "message": message})
+
+
+def _validate(schema: type[BaseModel], line: int, values: dict, errors: list[dict]) -> Optional[BaseModel]:
+    try:
+        return schema.model_validate(values)
+    except ValidationError as e:
+        for err in e.errors():
+            _error(errors, line, ".".join(str(p) for p in err["loc"]) or None, err["msg"].removeprefix("Value error, "))
+        return None
+
+
+def _validate_all(schema: type[BaseModel], rows: list[Row], errors: list[dict], **extra) -> list[tuple[int, BaseModel]]:
+    items = []
+    for line, values in rows:
+        model = _validate(schema, line, {**values, **extra}, errors)
+        if model is not None:
+            items.append((line, model))
+    return items
+
+
+def _unique(items: list[tuple[int, BaseModel]], key: Callable, existing: set, field: str, errors: list[dict], label: str):
+    """Yield the items whose key is neither in the database (existing) nor repeated earlier in the file."""
+    seen = set()
+    for line, model in items:
+        value = key(model)
+        if value in existing:
+            _error(errors, line, field, f"{label} already exists")
+        elif value in seen:
+            _error(errors, line, field, f"Duplicate {label.lower()} in file")
+        else:
+            seen.add(value)
+            yield line, model
+
+
+def _vehicles(db: Session, organization_id: int, rows: list[Row], errors: list[dict]) -> list[dict]:
+    items = _validate_all(VehicleCreate, rows, errors, organization_id=organization_id)
+    regs = {m.registration_number for _, m in items}
+    existing = set(db.scalars(
+        select(Vehicle.registration_number).where(
+            Vehicle.organization_id == organization_id, Vehicle.registration_number.in_(regs)
+        )
+    ))
+    return [
+        {
+            "organization_id": organization_id,
+            "registration_number": m.registration_number,
+            "make_model": (m.make_model or "").strip() or None,
+            "active": m.active,
+        }
+        for _, m in _unique(items, lambda m: m.registration_number, existing, "registration_number", errors, "Vehicle")
+    ]
+
+
+def _drivers(db: Session, organization_id: int, rows: list[Row], errors: list[dict]) -> list[dict]:
+    items = _validate_all(DriverCreate, rows, errors, organization_id=organization_id)
+    user_ids = {m.user_id for _, m in items}
+    existing = set(db.scalars(select(Driver.user_id).where(Driver.user_id.in_(user_ids))))
+    return [
+        {
+            "organization_id": organization_id,
+            "name": m.name,
+            "user_id": m.user_id,
+            "mobile": m.mobile,
+            "license_number": m.license_number,
+            "active": m.active,
+            "password": m.password,  # replaced by password_hash in hash_passwords()
+        }
+        for _, m in _unique(items, lambda m: m.user_id, existing, "user_id", errors, "User ID")
+    ]
+
+
+def _preset_locations(db: Session, organization_id: int, rows: list[Row], errors: list[dict]) -> list[dict]:
+    items = _validate_all(PresetLocationCreate, rows, errors, organization_id=organization_id)
+    names = {m.name for _, m in items}
+    existing = set(db.scalars(
+        select(PresetLocation.name).where(PresetLocation.organization_id == organization_id, PresetLocation.name.in_(names))
+    ))
+    # Unique names per organization, so fixed tariffs can be imported by preset name.
+    return [
+        m.model_dump()
+        for _, m in _unique(items, lambda m: m.name, existing, "name", errors, "Preset location")
+    ]
+
+
+def _resolve_names(db: Session, column_id, column_name, names: set[str], *where) -> dict[str, list[int]]:
+    ids = defaultdict(list)
+    if names:
+        for id_, name in db.execute(select(column_id, column_name).where(column_name.in_(names), *where)):
+            ids[name].append(id_)
+    return ids
+
+
+def _resolve_ref(
+    values: dict, line: int, id_field: str, name_field: str, by_name: dict, valid_ids: set, errors: list[dict], label: str,
+) -> None:
+    """Set values[id_field] from the name column, or check the given id; errors if unknown or ambiguous."""
+    if id_field in values:
+        try:
+            if int(values[id_field]) not in valid_ids:
+                _error(errors, line, id_field, f"{label} {values[id_field]} not found")
+        except ValueError:
+            pass  # reported by the schema
+    elif name_field in values:
+        matches = by_name.get(values[name_field], [])
+        if len(matches) == 1:
+            values[id_field] = matches[0]
+        else:
+            problem = f"is ambiguous, use {id_field}" if matches else "not found"
+            _error(errors, line, name_field, f"{label} '{values[name_field]}' {problem}")
+
+
+def _int_values(rows: list[Row], field: str) -> set[int]:
+    return {int(v[field]) for _, v in rows if v.get(field, "").isdigit()}
+
+
+def _fixed_tariffs(db: Session, organization_id: int, rows: list[Row], errors: list[dict]) -> list[dict]:
+    """Source and destination by name (source, destination) or by id (source_id, destination_id)."""
+    sources = _resolve_names(
+        db, PresetLocation.id, PresetLocation.name, {v["source"] for _, v in rows if "source" in v},
+        PresetLocation.organization_id == organization_id,
+    )
+    destinations = _resolve_names(
+        db, PresetDestination.id, PresetDestination.name, {v["destination"] for _, v in rows if "destination" in v},
+    )
+    source_ids = set(db.scalars(select(PresetLocation.id).where(
+        PresetLocation.organization_id == organization_id, PresetLocation.id.in_(_int_values(rows, "source_id"))
+    )))
+    destination_ids = set(db.scalars(
+        select(PresetDestination.id).where(PresetDestination.id.in_(_int_values(rows, "destination_id")))
+    ))
+    resolved = []
+    for line, values in rows:
+        values = dict(values)
+        before = len(errors)
+        _resolve_ref(values, line, "source_id", "source", sources, source_ids, errors, "Preset location")
+        _resolve_ref(values, line, "destination_id", "destination", destinations, destination_ids, errors, "Preset destination")
+        if len(errors) == before:
+            resolved.append((line, values))
+    items = _validate_all(FixedTariffCreate, resolved, errors, organization_id=organization_id)
+    existing = set(db.execute(
+        select(FixedTariff.source_id, FixedTariff.destination_id).where(
+            FixedTariff.organization_id == organization_id,
+            FixedTariff.source_id.in_({m.source_id for _, m in items}),
+        )
+    ).tuples())
+    return [
+        m.model_dump()
+        for _, m in _unique(items, lambda m: (m.source_id, m.destination_id), existing, "destination", errors, "Fixed tariff")
+    ]
+
+
+def _vehicle_expenses(db: Session, organization_id: int, rows: list[Row], errors: list[dict]) -> list[dict]:
+    """Vehicle by registration_number or vehicle_id; it must belong to the organization."""
+    vehicles = _resolve_names(
+        db, Vehicle.id, Vehicle.registration_number, {v["registration_number"] for _, v in rows if "registration_number" in v},
+        Vehicle.organization_id == organization_id,
+    )
+    vehicle_ids = set(db.scalars(select(Vehicle.id).where(
+        Vehicle.organization_id == organization_id, Vehicle.id.in_(_int_values(rows, "vehicle_id"))
+    )))
+    resolved = []
+    for line, values in rows:
+        values = dict(values)
+        before = len(errors)
+        _resolve_ref(values, line, "vehicle_id", "registration_number", vehicles, vehicle_ids, errors, "Vehicle")
+        if len(errors) == before:
+            resolved.append((line, values))
+    return [
+        {**m.model_dump(), "description": (m.description or "").strip() or None}
+        for _, m in _validate_all(VehicleExpenseCreate, resolved, errors)
+    ]
+
+
+IMPORT_KINDS: dict[str, tuple[Callable, type]] = {
+    "vehicles": (_vehicles, Vehicle),
+    "drivers": (_drivers, Driver),
+    "preset_locations": (_preset_locations, PresetLocation),
+    "fixed_tariffs": (_fixed_tariffs, FixedTariff),
+    "vehicle_expenses": (_vehicle_expenses, VehicleExpense),
+}
+
+
+def validate_import(db: Session, kind: str, organization_id: int, rows: list[Row]) -> tuple[list[dict], list[dict]]:
+    """(records ready to insert, per-row errors sorted by line). Reads only."""
+    errors: list[dict] = []
+    records = IMPORT_KINDS[kind][0](db, organization_id, rows, errors)
+    errors.sort(key=lambda e: e["row"])
+    return records, errors
+
+
+async def hash_passwords(records: list[dict]) -> None:
+    """Replace each driver record's password with its bcrypt hash, in parallel on the password executor.
+
+    At most PASSWORD_HASH_WORKERS jobs are submitted at once, so an import keeps the executor busy
+    without filling its queue (logins still get in). Raises PasswordHasherBusy if the queue is full.
+    """
+    limit = asyncio.Semaphore(max(settings.password_hash_workers, 1))
+
+    async def hash_one(record: dict) -> None:
+        async with limit:
+            record["password_hash"] = await hash_password_async(record.pop("password"))
+
+    await asyncio.gather(*(hash_one(r) for r in records))
+
+
+def _check_driver_logins(db: Session, records: list[dict]) -> None:
+    """Raise ImportConflict if a user ID was registered since validation. Holds the driver_logins
+    lock until the transaction ends, so no other import or driver create / update checks meanwhile."""
+    xact_lock(db, "driver_logins")
+    user_ids = {r["user_id"] for r in records}
+    taken = sorted(db.scalars(select(Driver.user_id).where(Driver.user_id.in_(user_ids))))
+    if taken:
+        raise ImportConflict("user_id", taken)
+
+
+def write_import(db: Session, kind: str, organization_id: int, records: list[dict]) -> int:
+    """Insert the validated records with one executemany INSERT. Caller commits, then calls bump_import_versions().
+
+    Raises ImportConflict (nothing written; caller rolls back) if a driver user ID was taken meanwhile.
+    """
+    model = IMPORT_KINDS[kind][1]
+    if model is Driver and records:
+        _check_driver_logins(db, records)
+    if records:
+        db.execute(insert(model), records)
+    if model is VehicleExpense:
+        apply_expense_rows(db, [expense_row(VehicleExpense(**r), organization_id) for r in records])
+    return len(records)
+
+
+def bump_import_versions(kind: str, organization_id: int) -> None:
+    """The bulk INSERT is invisible to the versions session hooks; bump the table's counters directly."""
+    table = IMPORT_KINDS[kind][1].__tablename__
+    scopes = [(table, None)]
+    if VERSIONED_TABLES.get(table):
+        scopes.append((table, organization_id))
+    bump_versions(scopes)
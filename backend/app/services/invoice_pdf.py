@@ -0,0 +1,307 @@
+"""Invoice PDFs rendered on the server - same layout as frontend/admin/src/utils/invoicePdf.js.
+
+render_invoice_pdf() takes the InvoiceWithTripResponse fields as a dict and returns the PDF bytes
+(fpdf2, A4, core Helvetica). Core fonts are Latin-1 only: the rupee sign is written "Rs." and
+other characters outside Latin-1 become "?". Times are shown in INVOICE_TIMEZONE.
+
+PDFs are cached on disk in INVOICE_PDF_CACHE_DIR as <invoice id>-<status>.pdf (an invoice's
+amount and trip do not change; marking it paid changes the status and so the file). The directory
+may be shared by workers and deleted at any time. iter_invoice_pdfs() serves many invoices,
+rendering the uncached ones in a process pool of INVOICE_PDF_WORKERS, and zip_stream() streams
+them as a ZIP without building it in memory. Pool processes are started by a forkserver ("spawn"
+where that is unavailable), never forked from the threaded worker, whose locks may be held by other
+threads at the time of the fork.
+"""
+import io
+import logging
+import os
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+from zoneinfo import ZoneInfo
+
+from fpdf import FPDF
+
+from app.core.config import settings
+from app.core.process_state import pool_context, register_after_fork
+
+logger = logging.getLogger(__name__)
+
+FONT = "helvetica"
+PRIMARY = (30, 58, 138)  # #1e3a8a
+MUTED = (100, 116, 139)  # #64748b
+BORDER = (226, 232, 240)  # #e2e8f0
+TEXT = (51, 65, 85)
+HEADING = (15, 23, 42)
+PAID = (22, 101, 52)
+PENDING = (146, 64, 14)
+SEPARATOR = " \xb7 "  # middle dot; the browser version uses a bullet, which is not Latin-1
+
+# Batches with fewer uncached invoices than this are rendered in the request thread.
+POOL_MIN_BATCH = 8
+
+
+def _latin1(value) -> str:
+    return str(value).encode("latin-1", "replace").decode("latin-1")
+
+
+def format_inr(amount: float) -> str:
+    """12,34,567.50 - Indian digit grouping, like toLocaleString('en-IN')."""
+    whole, frac = f"{abs(amount):.2f}".split(".")
+    head, tail = whole[:-3], whole[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    if head:
+        groups.insert(0, head)
+    return ("-" if amount < 0 else "") + ",".join([*groups, tail]) + "." + frac
+
+
+def _local_time(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)  # stored as UTC
+    local = value.astimezone(ZoneInfo(settings.invoice_timezone))
+    # 1/3/2025, 8:05:00 am - like toLocaleString('en-IN')
+    return f"{local.day}/{local.month}/{local.year}, {local.hour % 12 or 12}:{local:%M:%S} {'am' if local.hour < 12 else 'pm'}"
+
+
+def render_invoice_pdf(data: dict) -> bytes:
+    """PDF of one invoice from its InvoiceWithTripResponse fields."""
+    pdf = FPDF(unit="mm", format="A4")
+    pdf.set_auto_page_break(False)
+    pdf.add_page()
+    w, h = pdf.w, pdf.h
+    y = 20
+
+    def text(x: float, y: float, value, align: str = "left") -> None:
+        value = _latin1(value)
+        if align == "right":
+            x -= pdf.get_string_width(value)
+        elif align == "center":
+            x -= pdf.get_string_width(value) / 2
+        pdf.text(x, y, value)
+
+    # Header
+    pdf.set_font(FONT, "B", 24)
+    pdf.set_text_color(*PRIMARY)
+    text(20, y, "INVOICE")
+    y += 12
+    pdf.set_font(FONT, "", 10)
+    pdf.set_text_color(*MUTED)
+    text(20, y, f"#{data.get('invoice_number')}")
+    text(w - 20, y, f"Trip #{data.get('trip_id')}", "right")
+    y += 10
+
+    # Organization info
+    if data.get("organization_name"):
+        pdf.set_font(FONT, "B", 10)
+        pdf.set_text_color(*TEXT)
+        text(20, y, data["organization_name"])
+        y += 5
+    pdf.set_font(FONT, "", 9)
+    pdf.set_text_color(*MUTED)
+    if data.get("organization_address"):
+        text(20, y, data["organization_address"])
+        y += 5
+    contact = SEPARATOR.join(v for v in (data.get("organization_phone"), data.get("organization_email")) if v)
+    if contact:
+        text(20, y, contact)
+        y += 5
+    y += 5
+
+    # Divider
+    pdf.set_draw_color(*BORDER)
+    pdf.set_line_width(0.5)
+    pdf.line(20, y, w - 20, y)
+    y += 15
+
+    # Trip details
+    box_x, box_w, line_h = 20, w - 40, 7
+    distance = data.get("distance_km")
+    rows = [
+        ("Driver", SEPARATOR.join(v for v in (data.get("driver_name"), data.get("driver_mobile")) if v) or "-"),
+        ("Vehicle", data.get("vehicle_registration") or "-"),
+        ("Trip Start", _local_time(data.get("start_time")) or "-"),
+        ("Pickup", data.get("pickup_location") or "-"),
+        ("Drop", data.get("drop_location") or "-"),
+        ("Distance", f"{distance:.2f} km" if distance is not None else "-"),
+    ]
+    pdf.set_font(FONT, "B", 11)
+    pdf.set_text_color(*HEADING)
+    text(box_x, y, "Trip Details")
+    y += 10
+    pdf.set_font(FONT, "", 10)
+    for label, value in rows:
+        pdf.set_text_color(*MUTED)
+        text(box_x, y, f"{label}:")
+        pdf.set_text_color(*TEXT)
+        text(box_x + 45, y, value)
+        y += line_h
+    y += 8
+
+    # Amount box
+    pdf.set_draw_color(*BORDER)
+    pdf.set_line_width(0.3)
+    pdf.rect(box_x, y, box_w, 28)
+    y += 10
+    pdf.set_font(FONT, "B", 12)
+    pdf.set_text_color(*PRIMARY)
+    text(box_x + 10, y, "Total Fare")
+    text(w - 30, y, f"Rs. {format_inr(float(data.get('amount') or data.get('total_amount') or 0))}", "right")
+    y += 12
+    pdf.set_font(FONT, "", 9)
+    pdf.set_text_color(*MUTED)
+    text(box_x + 10, y, "Amount includes base fare and any additional charges.")
+    y += 20
+
+    # Status badge
+    pdf.set_font(FONT, "", 9)
+    if (data.get("status") or "pending").lower() == "paid":
+        pdf.set_text_color(*PAID)
+        text(box_x, y, "PAID")
+    else:
+        pdf.set_text_color(*PENDING)
+        text(box_x, y, "PENDING")
+
+    # Footer
+    y = h - 25
+    pdf.set_draw_color(*BORDER)
+    pdf.line(20, y, w - 20, y)
+    y += 10
+    pdf.set_font(FONT, "", 8)
+    pdf.set_text_color(*MUTED)
+    text(w / 2, y, "Thank you for your business.", "center")
+    text(w / 2, y + 5, f"Generated on {_local_time(datetime.now(timezone.utc))}", "center")
+    return bytes(pdf.output())
+
+
+def pdf_filename(data: dict) -> str:
+    return f"Invoice-{data['invoice_number']}.pdf"
+
+
+# --- Disk cache ---
+
+
+def _cache_dir() -> Path:
+    return Path(settings.invoice_pdf_cache_dir or os.path.join(tempfile.gettempdir(), "invoice-pdfs"))
+
+
+def _cache_path(data: dict) -> Path:
+    return _cache_dir() / f"{data['id']}-{(data.get('status') or 'pending').lower()}.pdf"
+
+
+def read_cached_pdf(data: dict) -> Optional[bytes]:
+    try:
+        return _cache_path(data).read_bytes()
+    except OSError:
+        return None
+
+
+def write_cached_pdf(data: dict, pdf: bytes) -> None:
+    """Atomic write (temp file + rename), so a concurrent reader never sees a partial PDF."""
+    path = _cache_path(data)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("Invoice PDF cache write failed: %s", e)
+
+
+def invoice_pdf(data: dict) -> bytes:
+    """Cached PDF of one invoice, rendered and cached on a miss."""
+    pdf = read_cached_pdf(data)
+    if pdf is None:
+        pdf = render_invoice_pdf(data)
+        write_cached_pdf(data, pdf)
+    return pdf
+
+
+# --- Batch rendering ---
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=max(settings.invoice_pdf_workers, 1), mp_context=pool_context(__name__))
+        return _pool
+
+
+@register_after_fork
+def _reset_after_fork() -> None:
+    """Pool processes belong to the parent; each worker starts its own."""
+    global _pool
+    _pool = None
+
+
+def shutdown_pdf_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _render_many(items: list[dict]) -> Iterator[bytes]:
+    """PDFs in input order; large batches are spread over the process pool."""
+    workers = max(settings.invoice_pdf_workers, 1)
+    if len(items) < POOL_MIN_BATCH or workers == 1:
+        return map(render_invoice_pdf, items)
+    return _get_pool().map(render_invoice_pdf, items, chunksize=max(1, len(items) // (workers * 4)))
+
+
+def iter_invoice_pdfs(items: list[dict]) -> Iterator[tuple[dict, bytes]]:
+    """(details, pdf) for each invoice in order: cached PDFs from disk, the rest rendered and cached."""
+    cached = [read_cached_pdf(d) for d in items]
+    rendered = _render_many([d for d, pdf in zip(items, cached) if pdf is None])
+    for data, pdf in zip(items, cached):
+        if pdf is None:
+            pdf = next(rendered)
+            write_cached_pdf(data, pdf)
+        yield data, pdf
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable write target for ZipFile; the written bytes are drained after each member."""
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self.chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def zip_stream(files: Iterable[tuple[str, bytes, Optional[datetime]]]) -> Iterator[bytes]:
+    """Stream (name, content, modified time) entries as a ZIP. Stored, not deflated: PDF content is
+    already compressed. Entry times come from the data, so the same files give the same ZIP."""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as zf:
+        for name, content, modified in files:
+            modified = modified or datetime.now(timezone.utc)
+            zf.writestr(zipfile.ZipInfo(name, date_time=modified.timetuple()[:6]), content)
+            yield sink.drain()
+    yield sink.drain()
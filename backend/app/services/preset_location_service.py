@@ -1,29 +1,39 @@
 """Preset location auto-detection service."""
-from typing import Optional
+from typing import Iterable, Optional
 
+from sqlalchemy import Select, select
 from sqlalchemy.orm import Session
 
 from app.models import PresetLocation
 from app.services.haversine import haversine_meters
 
 
-def detect_preset_location(
-    db: Session,
-    organization_id: int,
+def active_presets_stmt(organization_id: int) -> Select:
+    """Active preset locations of an organization."""
+    return select(PresetLocation).where(
+        PresetLocation.organization_id == organization_id,
+        PresetLocation.active == True,
+    )
+
+
+def match_preset_location(
+    presets: Iterable[PresetLocation],
     lat: float,
     lng: float,
 ) -> Optional[PresetLocation]:
-    """Detect if given coordinates fall within any preset location's radius."""
-    presets = (
-        db.query(PresetLocation)
-        .filter(
-            PresetLocation.organization_id == organization_id,
-            PresetLocation.active == True,
-        )
-        .all()
-    )
+    """First preset whose geofence radius contains the given coordinates."""
     for preset in presets:
         dist_m = haversine_meters(lat, lng, preset.latitude, preset.longitude)
         if dist_m <= preset.radius_meters:
             return preset
     return None
+
+
+def detect_preset_location(
+    db: Session,
+    organization_id: int,
+    lat: float,
+    lng: float,
+) -> Optional[PresetLocation]:
+    """Detect if given coordinates fall within any preset location's radius."""
+    return match_preset_location(db.scalars(active_presets_stmt(organization_id)), lat, lng)
@@ -0,0 +1,259 @@
+"""Daily rollups - incrementally maintained per-day totals for the dashboards.
+
+Writes that change a total add a delta row in the same transaction: trip completion (end_trip),
+invoice creation (create_invoice) and expense create/delete. Deltas are applied with a single
+INSERT ... ON CONFLICT DO UPDATE SET col = col + excluded.col (PostgreSQL and SQLite), so concurrent
+workers never lose an increment. Days are UTC dates, like func.date() on the UTC timestamps stored
+by the app. rebuild_rollups() recomputes a date range from the source tables.
+"""
+from datetime import date, datetime, time as dtime, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import Date, case, delete, func, select, type_coerce
+from sqlalchemy.orm import Session
+
+from app.db.upsert import merge_rows, upsert_add
+from app.models import Driver, ExpenseDailyRollup, FleetDailyRollup, Invoice, Trip, Vehicle, VehicleExpense
+
+FLEET_KEYS = ("day", "organization_id", "vehicle_id", "driver_id")
+FLEET_COUNTERS = (
+    "trips_completed", "distance_km", "revenue",
+    "invoices_paid", "invoices_paid_amount", "invoices_pending", "invoices_pending_amount",
+)
+EXPENSE_KEYS = ("day", "organization_id", "vehicle_id", "expense_type")
+EXPENSE_COUNTERS = ("expense_count", "amount")
+
+
+def utc_midnight(day: date) -> datetime:
+    """Start of a UTC day. Filter a day range as >= utc_midnight(first) and < utc_midnight(last + 1 day):
+    unlike func.date(), that does not depend on the database session's time zone."""
+    return datetime.combine(day, dtime.min, tzinfo=timezone.utc)
+
+
+def utc_day(value: Optional[datetime]) -> date:
+    """Rollup day of a timestamp; None (server default not loaded yet) means now."""
+    if value is None:
+        return datetime.utcnow().date()
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def apply_fleet_rows(db: Session, rows: Iterable[dict]) -> None:
+    """Add fleet deltas (FLEET_KEYS plus any FLEET_COUNTERS) to the rollups. Caller commits."""
+    upsert_add(db, FleetDailyRollup, FLEET_KEYS, FLEET_COUNTERS, rows)
+
+
+def apply_expense_rows(db: Session, rows: Iterable[dict]) -> None:
+    """Add expense deltas (EXPENSE_KEYS plus EXPENSE_COUNTERS) to the rollups. Caller commits."""
+    upsert_add(db, ExpenseDailyRollup, EXPENSE_KEYS, EXPENSE_COUNTERS, rows)
+
+
+def _fleet_key(day: date, trip: Trip) -> dict:
+    return {"day": day, "organization_id": trip.organization_id, "vehicle_id": trip.vehicle_id, "driver_id": trip.driver_id}
+
+
+def trip_completed_row(trip: Trip) -> dict:
+    return {
+        **_fleet_key(utc_day(trip.end_time), trip),
+        "trips_completed": 1,
+        "distance_km": trip.distance_km or 0.0,
+        "revenue": trip.total_amount or 0.0,
+    }
+
+
+def invoice_row(invoice: Invoice, trip: Trip) -> dict:
+    prefix = "invoices_paid" if invoice.status == "paid" else "invoices_pending"
+    return {**_fleet_key(utc_day(invoice.created_at), trip), prefix: 1, f"{prefix}_amount": invoice.amount}
+
+
+def expense_row(expense: VehicleExpense, organization_id: int, sign: int = 1) -> dict:
+    return {
+        "day": utc_day(expense.created_at),
+        "organization_id": organization_id,
+        "vehicle_id": expense.vehicle_id,
+        "expense_type": expense.expense_type,
+        "expense_count": sign,
+        "amount": sign * expense.amount,
+    }
+
+
+def record_trip_completed(db: Session, trip: Trip) -> None:
+    apply_fleet_rows(db, [trip_completed_row(trip)])
+
+
+def record_invoice(db: Session, invoice: Invoice, trip: Trip) -> None:
+    apply_fleet_rows(db, [invoice_row(invoice, trip)])
+
+
+def revenue_change_rows(trip: Trip, previous_amount: Optional[float], amount: Optional[float]) -> list[dict]:
+    """Delta moving a completed trip's revenue from previous_amount to amount (none if unchanged)."""
+    delta = (amount or 0.0) - (previous_amount or 0.0)
+    if trip.status == "completed" and trip.end_time is not None and delta:
+        return [{**_fleet_key(utc_day(trip.end_time), trip), "revenue": delta}]
+    return []
+
+
+def record_revenue_change(db: Session, trip: Trip, previous_amount: Optional[float]) -> None:
+    """Re-priced trip (e.g. invoice regenerated): move the completed trip's revenue by the difference."""
+    apply_fleet_rows(db, revenue_change_rows(trip, previous_amount, trip.total_amount))
+
+
+def record_expense(db: Session, expense: VehicleExpense, organization_id: int, sign: int = 1) -> None:
+    """Count a created expense (sign=1) or remove a deleted one (sign=-1)."""
+    apply_expense_rows(db, [expense_row(expense, organization_id, sign)])
+
+
+def _day_expr(column):
+    # type_coerce (not CAST): SQLite's date() returns text, which the Date type parses on the way out.
+    return type_coerce(func.date(column), Date)
+
+
+def _day_range(column, date_from: Optional[date], date_to: Optional[date]) -> list:
+    clauses = []
+    if date_from:
+        clauses.append(column >= date_from)
+    if date_to:
+        clauses.append(column <= date_to)
+    return clauses
+
+
+def rebuild_rollups(db: Session, date_from: Optional[date] = None, date_to: Optional[date] = None) -> dict:
+    """Recompute the rollups for a day range (all days when open) from trips, invoices and expenses.
+
+    Runs in the caller's transaction; the caller commits. Returns the number of rollup rows written.
+    """
+    db.execute(delete(FleetDailyRollup).where(*_day_range(FleetDailyRollup.day, date_from, date_to)))
+    db.execute(delete(ExpenseDailyRollup).where(*_day_range(ExpenseDailyRollup.day, date_from, date_to)))
+
+    trip_day = _day_expr(Trip.end_time)
+    trips = db.execute(
+        select(
+            trip_day.label("day"), Trip.organization_id, Trip.vehicle_id, Trip.driver_id,
+            func.count().label("trips_completed"),
+            func.coalesce(func.sum(Trip.distance_km), 0).label("distance_km"),
+            func.coalesce(func.sum(Trip.total_amount), 0).label("revenue"),
+        )
+        .where(Trip.status == "completed", Trip.end_time.isnot(None), *_day_range(func.date(Trip.end_time), date_from, date_to))
+        .group_by(func.date(Trip.end_time), Trip.organization_id, Trip.vehicle_id, Trip.driver_id)
+    ).mappings().all()
+
+    paid = Invoice.status == "paid"
+    invoice_day = _day_expr(Invoice.created_at)
+    invoices = db.execute(
+        select(
+            invoice_day.label("day"), Trip.organization_id, Trip.vehicle_id, Trip.driver_id,
+            func.sum(case((paid, 1), else_=0)).label("invoices_paid"),
+            func.sum(case((paid, Invoice.amount), else_=0)).label("invoices_paid_amount"),
+            func.sum(case((paid, 0), else_=1)).label("invoices_pending"),
+            func.sum(case((paid, 0), else_=Invoice.amount)).label("invoices_pending_amount"),
+        )
+        .join(Trip, Invoice.trip_id == Trip.id)
+        .where(Invoice.created_at.isnot(None), *_day_range(func.date(Invoice.created_at), date_from, date_to))
+        .group_by(func.date(Invoice.created_at), Trip.organization_id, Trip.vehicle_id, Trip.driver_id)
+    ).mappings().all()
+
+    expense_day = _day_expr(VehicleExpense.created_at)
+    expenses = db.execute(
+        select(
+            expense_day.label("day"), Vehicle.organization_id, VehicleExpense.vehicle_id, VehicleExpense.expense_type,
+            func.count().label("expense_count"),
+            func.coalesce(func.sum(VehicleExpense.amount), 0).label("amount"),
+        )
+        .join(Vehicle, VehicleExpense.vehicle_id == Vehicle.id)
+        .where(VehicleExpense.created_at.isnot(None), *_day_range(func.date(VehicleExpense.created_at), date_from, date_to))
+        .group_by(func.date(VehicleExpense.created_at), Vehicle.organization_id, VehicleExpense.vehicle_id, VehicleExpense.expense_type)
+    ).mappings().all()
+
+    fleet_rows = merge_rows([*map(dict, trips), *map(dict, invoices)], FLEET_KEYS, FLEET_COUNTERS)
+    expense_rows = [dict(r) for r in expenses]
+    apply_fleet_rows(db, fleet_rows)
+    apply_expense_rows(db, expense_rows)
+    return {"fleet_rows": len(fleet_rows), "expense_rows": len(expense_rows)}
+
+
+# --- Dashboard reads (rollup tables only, plus names for the per-vehicle / per-driver lists) ---
+
+
+def _fleet_filters(organization_id: Optional[int], date_from: Optional[date], date_to: Optional[date]) -> list:
+    clauses = _day_range(FleetDailyRollup.day, date_from, date_to)
+    if organization_id:
+        clauses.append(FleetDailyRollup.organization_id == organization_id)
+    return clauses
+
+
+def _expense_filters(
+    organization_id: Optional[int], vehicle_id: Optional[int], date_from: Optional[date], date_to: Optional[date],
+) -> list:
+    clauses = _day_range(ExpenseDailyRollup.day, date_from, date_to)
+    if organization_id:
+        clauses.append(ExpenseDailyRollup.organization_id == organization_id)
+    if vehicle_id:
+        clauses.append(ExpenseDailyRollup.vehicle_id == vehicle_id)
+    return clauses
+
+
+def _fleet_sums() -> list:
+    return [func.coalesce(func.sum(getattr(FleetDailyRollup, c)), 0).label(c) for c in FLEET_COUNTERS]
+
+
+def fleet_totals(db: Session, organization_id: Optional[int], date_from: Optional[date], date_to: Optional[date]) -> dict:
+    row = db.execute(select(*_fleet_sums()).where(*_fleet_filters(organization_id, date_from, date_to))).mappings().one()
+    return dict(row)
+
+
+def fleet_daily(db: Session, organization_id: Optional[int], date_from: Optional[date], date_to: Optional[date]) -> list[dict]:
+    rows = db.execute(
+        select(FleetDailyRollup.day, *_fleet_sums())
+        .where(*_fleet_filters(organization_id, date_from, date_to))
+        .group_by(FleetDailyRollup.day)
+        .order_by(FleetDailyRollup.day)
+    ).mappings().all()
+    return [dict(r) for r in rows]
+
+
+def fleet_by_vehicle(db: Session, organization_id: Optional[int], date_from: Optional[date], date_to: Optional[date]) -> list[dict]:
+    rows = db.execute(
+        select(FleetDailyRollup.vehicle_id, Vehicle.registration_number, *_fleet_sums())
+        .outerjoin(Vehicle, Vehicle.id == FleetDailyRollup.vehicle_id)
+        .where(*_fleet_filters(organization_id, date_from, date_to))
+        .group_by(FleetDailyRollup.vehicle_id, Vehicle.registration_number)
+        .order_by(func.sum(FleetDailyRollup.revenue).desc())
+    ).mappings().all()
+    return [dict(r) for r in rows]
+
+
+def fleet_by_driver(db: Session, organization_id: Optional[int], date_from: Optional[date], date_to: Optional[date]) -> list[dict]:
+    rows = db.execute(
+        select(FleetDailyRollup.driver_id, Driver.name.label("driver_name"), *_fleet_sums())
+        .outerjoin(Driver, Driver.id == FleetDailyRollup.driver_id)
+        .where(*_fleet_filters(organization_id, date_from, date_to))
+        .group_by(FleetDailyRollup.driver_id, Driver.name)
+        .order_by(func.sum(FleetDailyRollup.trips_completed).desc())
+    ).mappings().all()
+    return [dict(r) for r in rows]
+
+
+def expense_totals(
+    db: Session,
+    organization_id: Optional[int] = None,
+    vehicle_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> dict:
+    """Total amount and count, overall and per expense type."""
+    rows = db.execute(
+        select(
+            ExpenseDailyRollup.expense_type,
+            func.coalesce(func.sum(ExpenseDailyRollup.expense_count), 0).label("count"),
+            func.coalesce(func.sum(ExpenseDailyRollup.amount), 0).label("amount"),
+        )
+        .where(*_expense_filters(organization_id, vehicle_id, date_from, date_to))
+        .group_by(ExpenseDailyRollup.expense_type)
+    ).all()
+    by_type = {r.expense_type: {"count": int(r.count), "amount": float(r.amount)} for r in rows if r.count}
+    return {
+        "total_amount": sum(t["amount"] for t in by_type.values()),
+        "count": sum(t["count"] for t in by_type.values()),
+        "by_type": by_type,
+    }
@@ -1,10 +1,28 @@
-"""Tariff service - fixed and distance-based tariff calculation."""
+"""Tariff service - fixed and distance-based tariff calculation.
+
+quote_tariffs() prices many destinations at once from the organization's tariff table: its fixed
+tariffs by (source, destination) and the fallback rate per km, kept in memory per worker and
+rebuilt when the fixed_tariffs or distance_tariff_config version counters change.
+destination_adjacency() is the driver's destination dropdown, cached the same way: for each
+source preset of an organization, the destinations with a fixed tariff from it, sorted by name.
+"""
 from typing import Optional
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.models import DistanceTariffConfig, FixedTariff
+from app.core.versioned_cache import VersionedCache
+from app.models import DistanceTariffConfig, FixedTariff, PresetDestination
+
+# organization_id -> ({(source_id, destination_id): (fixed_tariff_id, amount)}, rate_per_km)
+TariffTable = tuple[dict[tuple[int, int], tuple[int, float]], float]
+
+# organization_id -> {source_id: [destination dicts with amount]}
+Adjacency = dict[int, list[dict]]
+
+_tariff_tables: VersionedCache[TariffTable] = VersionedCache("tariff_tables", settings.reference_cache_size)
+_adjacency: VersionedCache[Adjacency] = VersionedCache("destination_adjacency", settings.reference_cache_size)
 
 
 def get_fallback_rate_per_km(db: Session) -> float:
@@ -37,3 +55,80 @@ def calculate_distance_tariff(distance_km: float, db: Optional[Session] = None)
     """Calculate tariff based on distance using configured rate per km."""
     rate = get_fallback_rate_per_km(db) if db else settings.distance_tariff_per_km
     return distance_km * rate
+
+
+def _load_tariff_table(db: Session, organization_id: int) -> TariffTable:
+    fixed = {}
+    rows = db.execute(
+        select(FixedTariff.id, FixedTariff.source_id, FixedTariff.destination_id, FixedTariff.amount)
+        .where(FixedTariff.organization_id == organization_id)
+        .order_by(FixedTariff.id.desc())
+    )
+    for tariff_id, source_id, destination_id, amount in rows:
+        fixed[(source_id, destination_id)] = (tariff_id, amount)  # the lowest id wins
+    return fixed, get_fallback_rate_per_km(db)
+
+
+def get_tariff_table(db: Session, organization_id: int) -> TariffTable:
+    """The organization's fixed tariffs and fallback rate, from this worker's cache when current."""
+    return _tariff_tables.get(
+        organization_id,
+        [("fixed_tariffs", organization_id), ("distance_tariff_config", None)],
+        lambda: _load_tariff_table(db, organization_id),
+    )
+
+
+def quote_tariffs(db: Session, organization_id: int, source_id: Optional[int], items: list) -> list[dict]:
+    """Price each item (destination_id and/or distance_km) like calculate_trip_cost: the fixed tariff
+    from source_id to destination_id if there is one, else distance_km at the fallback rate, else no
+    amount."""
+    fixed, rate_per_km = get_tariff_table(db, organization_id)
+    quotes = []
+    for item in items:
+        quote = {
+            "destination_id": item.destination_id,
+            "distance_km": item.distance_km,
+            "amount": None,
+            "pricing": None,
+            "fixed_tariff_id": None,
+        }
+        tariff = fixed.get((source_id, item.destination_id)) if source_id and item.destination_id else None
+        if tariff is not None:
+            quote.update(fixed_tariff_id=tariff[0], amount=tariff[1], pricing="fixed")
+        elif item.distance_km is not None:
+            quote.update(amount=item.distance_km * rate_per_km, pricing="distance")
+        quotes.append(quote)
+    return quotes
+
+
+def _load_adjacency(db: Session, organization_id: int) -> Adjacency:
+    rows = db.execute(
+        select(
+            FixedTariff.source_id, FixedTariff.amount,
+            PresetDestination.id, PresetDestination.name, PresetDestination.latitude, PresetDestination.longitude,
+        )
+        .join(PresetDestination, FixedTariff.destination_id == PresetDestination.id)
+        .where(FixedTariff.organization_id == organization_id)
+        .order_by(FixedTariff.id.desc())
+    )
+    by_source: dict[int, dict[int, dict]] = {}
+    for source_id, amount, dest_id, name, latitude, longitude in rows:
+        # The lowest tariff id wins, like get_fixed_tariff
+        by_source.setdefault(source_id, {})[dest_id] = {
+            "id": dest_id, "name": name, "latitude": latitude, "longitude": longitude, "amount": amount,
+        }
+    return {
+        source_id: sorted(dests.values(), key=lambda d: (d["name"].lower(), d["id"]))
+        for source_id, dests in by_source.items()
+    }
+
+
+def destination_adjacency(db: Session, organization_id: int) -> Adjacency:
+    """source_id -> destinations with a fixed tariff from it (with the amount), sorted by name.
+    From this worker's cache while the fixed_tariffs and preset_destinations counters are unchanged;
+    the lists are shared, do not modify them."""
+    return _adjacency.get(
+        organization_id,
+        [("fixed_tariffs", organization_id), ("preset_destinations", None)],
+        lambda: _load_adjacency(db, organization_id),
+    )
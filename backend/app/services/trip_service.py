@@ -1,15 +1,137 @@
 """Trip service - create, start, end trips with distance and billing."""
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, func, null, or_, select
+from sqlalchemy.orm import Session, aliased, joinedload
 
-from app.models import GPSLog, Trip
-from app.schemas.trip import TripCreate
+from app.core.serialization import dumps
+from app.models import Driver, GPSLog, PresetDestination, PresetLocation, Trip, Vehicle
+from app.schemas.trip import TripCreate, TripResponse
 from app.services.billing_service import calculate_trip_cost, create_invoice
+from app.services.rollup_service import record_trip_completed
 from app.services.haversine import haversine_km
 
 
+TRIP_RESPONSE_FIELDS = (
+    "id", "organization_id", "driver_id", "vehicle_id", "source_preset_id", "destination_preset_id",
+    "pickup_lat", "pickup_lng", "drop_lat", "drop_lng", "start_time", "end_time", "distance_km",
+    "is_fixed_tariff", "total_amount", "status",
+)
+
+
+def _today_clause():
+    today = date.today()
+    return or_(
+        func.date(Trip.start_time) == today,
+        func.date(Trip.end_time) == today,
+        func.date(Trip.created_at) == today,
+    )
+
+
+def driver_trips_today_stmt(driver_id: int) -> Select:
+    """Driver's trips for today (started, ended or created today), newest first, presets eager-loaded."""
+    return (
+        select(Trip)
+        .options(
+            joinedload(Trip.source_preset),
+            joinedload(Trip.destination_preset),
+        )
+        .where(Trip.driver_id == driver_id)
+        .where(_today_clause())
+        .order_by(Trip.created_at.desc())
+    )
+
+
+def trip_rows_stmt(with_people: bool = True) -> Select:
+    """Core select of exactly the TripResponse columns (no ORM hydration), newest first.
+
+    Preset, driver and vehicle names come from outer joins; with_people=False leaves driver_name /
+    vehicle_registration_number NULL (driver app views). Add filters with .where().
+    """
+    source = aliased(PresetLocation)
+    destination = aliased(PresetDestination)
+    columns = [getattr(Trip, k) for k in TRIP_RESPONSE_FIELDS] + [
+        source.name.label("source_name"),
+        destination.name.label("destination_name"),
+    ]
+    stmt = (
+        select(*columns)
+        .outerjoin(source, Trip.source_preset_id == source.id)
+        .outerjoin(destination, Trip.destination_preset_id == destination.id)
+    )
+    if with_people:
+        stmt = stmt.add_columns(
+            Driver.name.label("driver_name"), Vehicle.registration_number.label("vehicle_registration_number")
+        ).outerjoin(Driver, Trip.driver_id == Driver.id).outerjoin(Vehicle, Trip.vehicle_id == Vehicle.id)
+    else:
+        stmt = stmt.add_columns(null().label("driver_name"), null().label("vehicle_registration_number"))
+    return stmt.order_by(Trip.created_at.desc())
+
+
+def trip_filters(
+    organization_id: Optional[int] = None,
+    driver_id: Optional[int] = None,
+    vehicle_id: Optional[int] = None,
+    status: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> list:
+    """WHERE clauses for the admin trip list filters (shared by GET /trips and the trip export)."""
+    clauses = []
+    if organization_id:
+        clauses.append(Trip.organization_id == organization_id)
+    if driver_id:
+        clauses.append(Trip.driver_id == driver_id)
+    if vehicle_id:
+        clauses.append(Trip.vehicle_id == vehicle_id)
+    if status:
+        clauses.append(Trip.status == status)
+    trip_date = func.coalesce(func.date(Trip.start_time), func.date(Trip.created_at))
+    if date_from:
+        clauses.append(trip_date >= date_from)
+    if date_to:
+        clauses.append(trip_date <= date_to)
+    return clauses
+
+
+def driver_trips_today_rows_stmt(driver_id: int) -> Select:
+    """trip_rows_stmt for /trips/driver/today."""
+    return trip_rows_stmt(with_people=False).where(Trip.driver_id == driver_id).where(_today_clause())
+
+
+def trip_row_to_dict(row) -> dict:
+    """TripResponse-shaped dict (same keys, order and name fallbacks) from a trip_rows_stmt row."""
+    m = row._mapping
+    d = {k: m[k] for k in TRIP_RESPONSE_FIELDS}
+    if m["source_name"] is not None:
+        d["pickup_location_name"] = m["source_name"]
+    else:
+        d["pickup_location_name"] = "GPS pickup" if (d["pickup_lat"] is not None and d["pickup_lng"] is not None) else None
+    if m["destination_name"] is not None:
+        d["destination_name"] = m["destination_name"]
+    else:
+        d["destination_name"] = "GPS destination" if (d["drop_lat"] is not None and d["drop_lng"] is not None) else None
+    d["driver_name"] = m["driver_name"]
+    d["vehicle_registration_number"] = m["vehicle_registration_number"]
+    d["device_token"] = None
+    return d
+
+
+def encode_trip_rows(rows) -> bytes:
+    """JSON array of trips straight from Core rows - skips ORM objects and Pydantic validation."""
+    return dumps([trip_row_to_dict(r) for r in rows])
+
+
+def trip_to_driver_response(t: Trip) -> TripResponse:
+    """TripResponse with preset names, as shown in the driver app."""
+    return TripResponse(
+        **{k: getattr(t, k) for k in TRIP_RESPONSE_FIELDS},
+        pickup_location_name=t.source_preset.name if t.source_preset else ("GPS pickup" if (t.pickup_lat and t.pickup_lng) else None),
+        destination_name=t.destination_preset.name if t.destination_preset else ("GPS destination" if (t.drop_lat and t.drop_lng) else None),
+    )
+
+
 def create_trip(db: Session, data: TripCreate) -> Trip:
     """Create a new trip."""
     trip = Trip(
@@ -80,6 +202,7 @@ def end_trip(
         trip.total_amount = (trip.total_amount or 0) + additional_amount
     create_invoice(db, trip, trip.total_amount, payment_received=payment_received)
     trip.status = "completed"
+    record_trip_completed(db, trip)
     db.commit()
     db.refresh(trip)
     return trip
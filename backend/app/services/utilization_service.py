@@ -0,0 +1,293 @@
+"""Vehicle utilization - incremental, vectorized processing of gps_logs into per vehicle-day metrics.
+
+process_new_points() reads gps_logs after the job watermark in id order, in chunks of
+UTILIZATION_CHUNK_SIZE rows, as one float64 NumPy array per chunk. Points are sorted by vehicle
+and time, and each interval between consecutive points of a vehicle contributes:
+
+- distance (haversine), except jumps faster than MAX_SPEED_KMH (GPS glitches)
+- time, if the interval is no longer than UTILIZATION_MAX_GAP_S (longer gaps are signal loss
+  or the vehicle being off), split into on-trip, idle (below UTILIZATION_IDLE_SPEED_KMH) and
+  at-hospital (first point within UTILIZATION_HOSPITAL_RADIUS_M of a preset destination)
+
+The sums per (vehicle, UTC day) are added to vehicle_day_utilization, the last point per vehicle
+is kept in vehicle_gps_cursors (so the interval spanning two chunks is counted once) and the
+watermark is advanced, all in one transaction per chunk. Rows younger than
+UTILIZATION_SAFETY_LAG_S are left for the next run, so a late-committing insert with a lower id
+is not skipped.
+"""
+import logging
+import time
+from datetime import date, timedelta
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import extract, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.upsert import upsert_add, upsert_replace
+from app.models import (
+    AnalyticsWatermark,
+    GPSLog,
+    PresetDestination,
+    Vehicle,
+    VehicleDayUtilization,
+    VehicleGpsCursor,
+)
+
+logger = logging.getLogger(__name__)
+
+JOB = "vehicle_utilization"
+MAX_SPEED_KMH = 200.0
+EARTH_RADIUS_KM = 6371.0
+UTILIZATION_KEYS = ("day", "organization_id", "vehicle_id")
+UTILIZATION_COUNTERS = (
+    "points", "distance_km", "tracked_seconds", "on_trip_seconds", "idle_seconds", "hospital_seconds",
+)
+
+# Column order of the chunk arrays; trip_id -1 = no trip.
+ID, VEHICLE, TRIP, LAT, LNG, TS = range(6)
+_POINT_COLUMNS = (
+    GPSLog.id,
+    GPSLog.vehicle_id,
+    func.coalesce(GPSLog.trip_id, -1),
+    GPSLog.latitude,
+    GPSLog.longitude,
+    extract("epoch", GPSLog.recorded_at),
+)
+_EPOCH = date(1970, 1, 1)
+
+
+def haversine_km(lat1: np.ndarray, lng1: np.ndarray, lat2: np.ndarray, lng2: np.ndarray) -> np.ndarray:
+    """Element-wise haversine distance in km (see app/services/haversine.py for the scalar version)."""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(np.radians(lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def near_any(lat: np.ndarray, lng: np.ndarray, targets: np.ndarray, radius_m: float) -> np.ndarray:
+    """True where a point is within radius_m of any (lat, lng) target (equirectangular approximation)."""
+    near = np.zeros(lat.shape, dtype=bool)
+    if not len(targets) or not len(lat):
+        return near
+    radius_deg = radius_m / 111_320.0
+    cos_lat = np.cos(np.radians(lat))
+    for t_lat, t_lng in targets:
+        d_lat = lat - t_lat
+        d_lng = (lng - t_lng) * cos_lat
+        near |= d_lat * d_lat + d_lng * d_lng <= radius_deg * radius_deg
+    return near
+
+
+def compute_utilization(
+    points: np.ndarray,
+    previous: np.ndarray,
+    hospitals: np.ndarray,
+    max_gap_s: float,
+    idle_speed_kmh: float,
+    hospital_radius_m: float,
+) -> tuple[dict[tuple[int, int], dict], np.ndarray]:
+    """Metrics per (vehicle_id, epoch day) for a chunk of new points.
+
+    previous holds at most one already-counted point per vehicle (its cursor). Returns the sums
+    and the latest point per vehicle (the next cursors).
+    """
+    allpts = np.vstack([previous, points]) if len(previous) else points
+    is_new = np.concatenate([np.zeros(len(previous), dtype=bool), np.ones(len(points), dtype=bool)])
+    order = np.lexsort((allpts[:, ID], allpts[:, TS], allpts[:, VEHICLE]))
+    allpts, is_new = allpts[order], is_new[order]
+    vehicle = allpts[:, VEHICLE].astype(np.int64)
+    day = np.floor(allpts[:, TS] / 86400).astype(np.int64)
+
+    a, b = allpts[:-1], allpts[1:]
+    same = vehicle[:-1] == vehicle[1:]
+    dt = b[:, TS] - a[:, TS]
+    dist = haversine_km(a[:, LAT], a[:, LNG], b[:, LAT], b[:, LNG])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speed = np.where(dt > 0, dist / dt * 3600.0, np.inf)
+    timed = same & (dt > 0) & (dt <= max_gap_s)
+    at_hospital = near_any(a[:, LAT], a[:, LNG], hospitals, hospital_radius_m)
+    interval = {
+        "distance_km": np.where(same & (speed <= MAX_SPEED_KMH), dist, 0.0),
+        "tracked_seconds": np.where(timed, dt, 0.0),
+        "on_trip_seconds": np.where(timed & (a[:, TRIP] >= 0), dt, 0.0),
+        "idle_seconds": np.where(timed & (speed < idle_speed_kmh), dt, 0.0),
+        "hospital_seconds": np.where(timed & at_hospital, dt, 0.0),
+    }
+
+    # Group intervals (by their first point) and new points into (vehicle, day) buckets.
+    keys = np.concatenate([
+        np.stack([vehicle[:-1], day[:-1]], axis=1),
+        np.stack([vehicle[is_new], day[is_new]], axis=1),
+    ])
+    buckets, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    n_intervals = len(a)
+    sums = {
+        name: np.bincount(inverse[:n_intervals], weights=values, minlength=len(buckets))
+        for name, values in interval.items()
+    }
+    sums["points"] = np.bincount(inverse[n_intervals:], minlength=len(buckets))
+    result = {
+        (int(v), int(d)): {name: float(sums[name][i]) for name in UTILIZATION_COUNTERS}
+        for i, (v, d) in enumerate(buckets)
+    }
+    last_of_vehicle = np.append(vehicle[1:] != vehicle[:-1], True)
+    return result, allpts[last_of_vehicle]
+
+
+def _load_chunk(db: Session, after_id: int, limit: int, cutoff_epoch: float) -> np.ndarray:
+    rows = db.execute(select(*_POINT_COLUMNS).where(GPSLog.id > after_id).order_by(GPSLog.id).limit(limit)).all()
+    chunk = np.array(rows, dtype=np.float64).reshape(-1, 6)
+    too_recent = np.flatnonzero(chunk[:, TS] > cutoff_epoch)
+    return chunk[: too_recent[0]] if len(too_recent) else chunk
+
+
+def _load_cursors(db: Session, vehicle_ids: list[int]) -> np.ndarray:
+    rows = db.execute(
+        select(
+            VehicleGpsCursor.gps_log_id,
+            VehicleGpsCursor.vehicle_id,
+            func.coalesce(VehicleGpsCursor.trip_id, -1),
+            VehicleGpsCursor.latitude,
+            VehicleGpsCursor.longitude,
+            VehicleGpsCursor.recorded_epoch,
+        ).where(VehicleGpsCursor.vehicle_id.in_(vehicle_ids))
+    ).all()
+    return np.array(rows, dtype=np.float64).reshape(-1, 6)
+
+
+def _cursor_rows(last_points: np.ndarray) -> list[dict]:
+    return [
+        {
+            "vehicle_id": int(p[VEHICLE]),
+            "gps_log_id": int(p[ID]),
+            "trip_id": int(p[TRIP]) if p[TRIP] >= 0 else None,
+            "latitude": float(p[LAT]),
+            "longitude": float(p[LNG]),
+            "recorded_epoch": float(p[TS]),
+        }
+        for p in last_points
+    ]
+
+
+def _watermark(db: Session) -> AnalyticsWatermark:
+    mark = db.get(AnalyticsWatermark, JOB, with_for_update=True)
+    if mark is None:
+        mark = AnalyticsWatermark(job=JOB, last_id=0, last_run_points=0, last_run_seconds=0)
+        db.add(mark)
+        db.flush()
+    return mark
+
+
+def process_new_points(db: Session, chunk_size: Optional[int] = None, max_chunks: Optional[int] = None) -> dict:
+    """Process gps_logs past the watermark, committing per chunk. Returns points, seconds, points_per_sec."""
+    chunk_size = chunk_size or settings.utilization_chunk_size
+    hospitals = np.array(
+        db.execute(select(PresetDestination.latitude, PresetDestination.longitude)).all(), dtype=np.float64
+    ).reshape(-1, 2)
+    organizations: dict[int, int] = {}
+    start = time.perf_counter()
+    total = chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        mark = _watermark(db)
+        cutoff = time.time() - settings.utilization_safety_lag_s
+        points = _load_chunk(db, mark.last_id, chunk_size, cutoff)
+        if not len(points):
+            db.rollback()
+            break
+        vehicle_ids = [int(v) for v in np.unique(points[:, VEHICLE])]
+        missing = [v for v in vehicle_ids if v not in organizations]
+        if missing:
+            organizations.update(
+                db.execute(select(Vehicle.id, Vehicle.organization_id).where(Vehicle.id.in_(missing))).all()
+            )
+        metrics, last_points = compute_utilization(
+            points,
+            _load_cursors(db, vehicle_ids),
+            hospitals,
+            settings.utilization_max_gap_s,
+            settings.utilization_idle_speed_kmh,
+            settings.utilization_hospital_radius_m,
+        )
+        rows = [
+            {"day": _EPOCH + timedelta(days=day), "organization_id": organizations[vehicle_id],
+             "vehicle_id": vehicle_id, **values}
+            for (vehicle_id, day), values in metrics.items()
+            if vehicle_id in organizations  # vehicle deleted since the points were logged
+        ]
+        upsert_add(db, VehicleDayUtilization, UTILIZATION_KEYS, UTILIZATION_COUNTERS, rows)
+        upsert_replace(db, VehicleGpsCursor, ("vehicle_id",), _cursor_rows(last_points))
+        mark.last_id = int(points[-1, ID])
+        db.commit()
+        total += len(points)
+        chunks += 1
+        if len(points) < chunk_size:
+            break  # caught up (or stopped at the safety lag)
+    elapsed = time.perf_counter() - start
+    if total:
+        mark = _watermark(db)
+        mark.last_run_points = total
+        mark.last_run_seconds = elapsed
+        db.commit()
+        logger.info("Utilization: %d GPS points in %.2fs (%.0f points/s)", total, elapsed, total / elapsed)
+    return {
+        "points": total,
+        "chunks": chunks,
+        "seconds": elapsed,
+        "points_per_sec": total / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def reset_utilization(db: Session) -> None:
+    """Forget all processed state so the next run reprocesses gps_logs from the start. Caller commits."""
+    db.query(VehicleDayUtilization).delete()
+    db.query(VehicleGpsCursor).delete()
+    db.query(AnalyticsWatermark).filter(AnalyticsWatermark.job == JOB).delete()
+
+
+def utilization_status(db: Session) -> dict:
+    """Watermark, backlog (approximate, by id) and last-run throughput."""
+    mark = db.get(AnalyticsWatermark, JOB)
+    max_id = db.scalar(select(func.max(GPSLog.id))) or 0
+    last_id = mark.last_id if mark else 0
+    seconds = mark.last_run_seconds if mark else 0.0
+    points = mark.last_run_points if mark else 0
+    return {
+        "last_id": last_id,
+        "backlog_points": max(max_id - last_id, 0),
+        "last_run_points": points,
+        "last_run_seconds": seconds,
+        "last_run_points_per_sec": points / seconds if seconds else 0.0,
+        "updated_at": mark.updated_at if mark else None,
+    }
+
+
+def utilization_rows(
+    db: Session,
+    organization_id: Optional[int] = None,
+    vehicle_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> list[dict]:
+    """Per vehicle-day metrics with the vehicle's registration number, newest day first."""
+    stmt = (
+        select(VehicleDayUtilization, Vehicle.registration_number)
+        .outerjoin(Vehicle, Vehicle.id == VehicleDayUtilization.vehicle_id)
+        .order_by(VehicleDayUtilization.day.desc(), VehicleDayUtilization.vehicle_id)
+    )
+    if organization_id:
+        stmt = stmt.where(VehicleDayUtilization.organization_id == organization_id)
+    if vehicle_id:
+        stmt = stmt.where(VehicleDayUtilization.vehicle_id == vehicle_id)
+    if date_from:
+        stmt = stmt.where(VehicleDayUtilization.day >= date_from)
+    if date_to:
+        stmt = stmt.where(VehicleDayUtilization.day <= date_to)
+    result = []
+    for row, registration_number in db.execute(stmt):
+        d = {c: getattr(row, c) for c in ("day", "organization_id", "vehicle_id", *UTILIZATION_COUNTERS)}
+        d["registration_number"] = registration_number
+        d["on_trip_ratio"] = row.on_trip_seconds / 86400.0
+        result.append(d)
+    return result
@@ -1,5 +1,83 @@
-"""Run FastAPI with uvicorn on port 9322."""
+"""Run FastAPI on port 9322.
+
+WEB_CONCURRENCY=1 (default) runs a single uvicorn process. WEB_CONCURRENCY>1 runs gunicorn
+with uvicorn workers: the app is preloaded in the master, workers are recycled after
+MAX_REQUESTS (+ jitter) requests, and `kill -HUP <master pid>` reloads workers gracefully.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
 import uvicorn
 
+from app.core.config import settings
+
+APP = "app.main:app"
+
+
+def _post_fork(server, worker) -> None:
+    from app.core.process_state import run_after_fork
+
+    run_after_fork()
+
+
+def _child_exit(server, worker) -> None:
+    from app.core.metrics import mark_worker_dead
+
+    mark_worker_dead(worker.pid)
+
+
+def _prepare_metrics_dir() -> None:
+    """Shared directory for Prometheus multiprocess samples; must be set before the app is imported."""
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+    else:
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="ambulance-metrics-")
+
+
+def run_gunicorn(workers: int, bind: str) -> None:
+    """Serve with gunicorn + uvicorn workers (Linux/macOS only)."""
+    from gunicorn.app.base import BaseApplication
+
+    _prepare_metrics_dir()
+
+    class _Application(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": bind,
+                "workers": workers,
+                "worker_class": "uvicorn_worker.UvicornWorker",
+                "preload_app": settings.preload_app,
+                "max_requests": settings.max_requests,
+                "max_requests_jitter": settings.max_requests_jitter,
+                "graceful_timeout": settings.graceful_timeout,
+                "timeout": settings.worker_timeout,
+                "keepalive": 5,
+                "post_fork": _post_fork,
+                "child_exit": _child_exit,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+
+            return app
+
+    _Application().run()
+
+
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="0.0.0.0", port=9322, reload=False)
+    parser = argparse.ArgumentParser(description="Run the ambulance fleet backend.")
+    parser.add_argument("--workers", type=int, default=settings.web_concurrency)
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=settings.port)
+    args = parser.parse_args()
+    if args.workers > 1:
+        run_gunicorn(args.workers, f"{args.host}:{args.port}")
+    else:
+        # Request logging is done (sampled) by the app middleware; skip uvicorn's per-request access log.
+        uvicorn.run(APP, host=args.host, port=args.port, reload=False, access_log=False)
@@ -0,0 +1,94 @@
+"""Benchmark hot endpoints: sync routes vs their /async counterparts, requests/sec per worker.
+
+Run against a live server started with a single worker (python run.py), e.g.:
+
+    python scripts/bench_hot_routes.py --base-url http://localhost:9322 --concurrency 64 --duration 15
+
+Requires httpx (pip install httpx) and seed data (scripts/seed_data.py) for the default logins.
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - benchmark-only dependency
+    sys.exit("httpx is required for this benchmark: pip install httpx")
+
+
+def _routes(vehicle_id: int, organization_id: int) -> list[tuple[str, str, str, dict]]:
+    """(name, method, path, kwargs) for each hot route; the /async variant is derived from path."""
+    return [
+        ("gps/update", "POST", "/gps/update", {"json": {"vehicle_id": vehicle_id, "latitude": 12.97, "longitude": 77.59}}),
+        ("trips/driver/today", "GET", "/trips/driver/today", {"auth": "driver"}),
+        ("gps/vehicles/live", "GET", "/gps/vehicles/live", {"auth": "admin"}),
+        ("preset-locations/nearby", "GET", "/preset-locations/nearby",
+         {"params": {"lat": 12.97, "lng": 77.59, "organization_id": organization_id}}),
+    ]
+
+
+async def _login(client: httpx.AsyncClient, args) -> dict[str, dict]:
+    driver = await client.post("/auth/login", json={"user_id": args.driver_user, "password": args.driver_password})
+    admin = await client.post("/auth/admin-login", json={"username": args.admin_user, "password": args.admin_password})
+    driver.raise_for_status()
+    admin.raise_for_status()
+    return {
+        "driver": {"Authorization": f"Bearer {driver.json()['access_token']}"},
+        "admin": {"Authorization": f"Bearer {admin.json()['access_token']}"},
+    }
+
+
+async def _run(client: httpx.AsyncClient, method: str, path: str, kwargs: dict, concurrency: int, duration: float) -> tuple[int, int]:
+    deadline = time.perf_counter() + duration
+    ok = 0
+    failed = 0
+
+    async def worker():
+        nonlocal ok, failed
+        while time.perf_counter() < deadline:
+            try:
+                r = await client.request(method, path, **kwargs)
+            except httpx.TransportError:  # e.g. a keep-alive connection the server closed meanwhile
+                failed += 1
+                continue
+            if r.status_code < 400:
+                ok += 1
+            else:
+                failed += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return ok, failed
+
+
+async def main(args) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        headers = await _login(client, args)
+        print(f"{'route':<28}{'sync req/s':>12}{'async req/s':>13}{'speedup':>10}")
+        for name, method, path, kwargs in _routes(args.vehicle_id, args.organization_id):
+            kwargs = dict(kwargs)
+            auth = kwargs.pop("auth", None)
+            if auth:
+                kwargs["headers"] = headers[auth]
+            rates = []
+            for prefix in ("", "/async"):
+                ok, failed = await _run(client, method, prefix + path, kwargs, args.concurrency, args.duration)
+                if failed:
+                    print(f"  {prefix + path}: {failed} failed requests", file=sys.stderr)
+                rates.append(ok / args.duration)
+            print(f"{name:<28}{rates[0]:>12.1f}{rates[1]:>13.1f}{rates[1] / rates[0] if rates[0] else 0:>9.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:9322")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per route and variant")
+    parser.add_argument("--vehicle-id", type=int, default=1)
+    parser.add_argument("--organization-id", type=int, default=1)
+    parser.add_argument("--driver-user", default="+1234567890")
+    parser.add_argument("--driver-password", default="driver123")
+    parser.add_argument("--admin-user", default="admin")
+    parser.add_argument("--admin-password", default="admin123")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,144 @@
+"""Benchmark trip list serialization: ORM + Pydantic (previous path) vs Core select + orjson.
+
+Builds a throwaway SQLite database with N trips (default 10,000) unless --database-url points at an
+existing one, checks both paths produce the same JSON, then times each:
+
+    python scripts/bench_trip_serialization.py --trips 10000 --repeat 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trips", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", default="", help="Use an existing database instead of a temporary SQLite file")
+    return parser.parse_args()
+
+
+args = _parse_args()
+if not args.database_url:
+    args.database_url = f"sqlite:///{tempfile.mkdtemp()}/bench_trips.db"
+os.environ["DATABASE_URL"] = args.database_url
+
+import orjson  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import func, insert, select  # noqa: E402
+from sqlalchemy.orm import joinedload  # noqa: E402
+
+from app.db.session import SessionLocal, init_db  # noqa: E402
+from app.models import Driver, Organization, PresetDestination, PresetLocation, Trip, Vehicle  # noqa: E402
+from app.schemas.trip import TripResponse  # noqa: E402
+from app.services.trip_service import encode_trip_rows, trip_rows_stmt  # noqa: E402
+
+
+def seed(db, n: int) -> None:
+    existing = db.scalar(select(func.count()).select_from(Trip))
+    if existing >= n:
+        return
+    org = Organization(name="Bench Org", code="BENCH")
+    db.add(org)
+    db.flush()
+    drivers = [Driver(organization_id=org.id, name=f"Driver {i}", user_id=f"bench{i}", password_hash="x") for i in range(20)]
+    vehicles = [Vehicle(organization_id=org.id, registration_number=f"KA-01-{i:04d}") for i in range(20)]
+    presets = [PresetLocation(organization_id=org.id, name=f"Base {i}", latitude=12.9, longitude=77.6) for i in range(5)]
+    dests = [PresetDestination(name=f"Hospital {i}", latitude=12.95, longitude=77.65) for i in range(5)]
+    db.add_all(drivers + vehicles + presets + dests)
+    db.flush()
+    start = datetime(2025, 1, 1, 8, 0, 0)
+    rows = []
+    for i in range(n - existing):
+        fixed = i % 3 == 0
+        rows.append({
+            "organization_id": org.id,
+            "driver_id": drivers[i % 20].id,
+            "vehicle_id": vehicles[i % 20].id,
+            "source_preset_id": presets[i % 5].id if fixed else None,
+            "destination_preset_id": dests[i % 5].id if fixed else None,
+            "pickup_lat": 12.9 + (i % 100) / 1000,
+            "pickup_lng": 77.6,
+            "drop_lat": None if fixed else 12.95,
+            "drop_lng": None if fixed else 77.65,
+            "start_time": start + timedelta(minutes=i),
+            "end_time": start + timedelta(minutes=i + 25),
+            "distance_km": 7.5 + i % 10,
+            "is_fixed_tariff": fixed,
+            "total_amount": 700.0 if fixed else 375.0,
+            "status": "completed",
+            "created_at": start + timedelta(minutes=i),
+        })
+    db.execute(insert(Trip), rows)
+    db.commit()
+
+
+def orm_path(db) -> bytes:
+    """Previous list_trips: joinedload ORM objects, TripResponse per row, response_model re-validation."""
+    trips = (
+        db.query(Trip)
+        .options(
+            joinedload(Trip.driver),
+            joinedload(Trip.vehicle),
+            joinedload(Trip.source_preset),
+            joinedload(Trip.destination_preset),
+        )
+        .order_by(Trip.created_at.desc())
+        .all()
+    )
+    responses = []
+    for t in trips:
+        base = {k: getattr(t, k) for k in ("id", "organization_id", "driver_id", "vehicle_id", "source_preset_id", "destination_preset_id", "pickup_lat", "pickup_lng", "drop_lat", "drop_lng", "start_time", "end_time", "distance_km", "is_fixed_tariff", "total_amount", "status")}
+        base["pickup_location_name"] = t.source_preset.name if t.source_preset else ("GPS pickup" if (t.pickup_lat is not None and t.pickup_lng is not None) else None)
+        base["destination_name"] = t.destination_preset.name if t.destination_preset else ("GPS destination" if (t.drop_lat is not None and t.drop_lng is not None) else None)
+        base["driver_name"] = t.driver.name if t.driver else None
+        base["vehicle_registration_number"] = t.vehicle.registration_number if t.vehicle else None
+        responses.append(TripResponse(**base))
+    adapter = TypeAdapter(list[TripResponse])
+    return adapter.dump_json(adapter.validate_python(responses, from_attributes=True))
+
+
+def core_path(db) -> bytes:
+    """Current list_trips: Core select of the response columns, rows encoded with orjson."""
+    return encode_trip_rows(db.execute(trip_rows_stmt()))
+
+
+def timed(label: str, func, repeat: int) -> bytes:
+    best = float("inf")
+    body = b""
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            start = time.perf_counter()
+            body = func(db)
+            best = min(best, time.perf_counter() - start)
+        finally:
+            db.close()
+    print(f"{label:<22} best of {repeat}: {best * 1000:8.1f} ms  ({len(body) / 1024:.0f} KiB)")
+    return body
+
+
+def main() -> None:
+    init_db()
+    db = SessionLocal()
+    try:
+        seed(db, args.trips)
+        count = db.scalar(select(func.count()).select_from(Trip))
+    finally:
+        db.close()
+    print(f"{count} trips in {args.database_url}")
+    old = timed("ORM + Pydantic", orm_path, args.repeat)
+    new = timed("Core select + orjson", core_path, args.repeat)
+    if orjson.loads(old) != orjson.loads(new):
+        sys.exit("Mismatch: the two paths produced different JSON")
+    print("Outputs identical.")
+
+
+if __name__ == "__main__":
+    main()
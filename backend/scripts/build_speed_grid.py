@@ -0,0 +1,37 @@
+"""Build the historical speed grid used for live vehicle ETAs from recent gps_logs.
+
+Run from cron / a systemd timer, e.g. nightly; workers pick up the new file on their next lookup:
+
+    python scripts/build_speed_grid.py                     # last ETA_GRID_DAYS days
+    python scripts/build_speed_grid.py --days 30 --output /var/lib/ambulance/speed-grid.npy
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.db.session import SessionLocal, init_db
+from app.services.eta_service import build_speed_grid
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=None, help="History to use (default ETA_GRID_DAYS)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Rows per chunk (default UTILIZATION_CHUNK_SIZE)")
+    parser.add_argument("--output", type=Path, default=None, help="Grid file (default ETA_GRID_PATH)")
+    args = parser.parse_args()
+    init_db()
+    db = SessionLocal()
+    try:
+        stats = build_speed_grid(db, days=args.days, chunk_size=args.chunk_size, path=args.output)
+    finally:
+        db.close()
+    print(
+        f"{stats['points']} points, {stats['intervals']} intervals -> {stats['cells']} cells "
+        f"in {stats['seconds']:.2f}s, written to {stats['path']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
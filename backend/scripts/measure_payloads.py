@@ -0,0 +1,152 @@
+"""Measure payload size and encode time of the biggest list responses: /trips and /gps/vehicles/live.
+
+For each payload prints the JSON encode time (Pydantic response_model, stdlib json, orjson) and the
+body size and compression time raw / gzip / brotli at the levels CompressionMiddleware uses. Trips
+come from a throwaway SQLite database (or --database-url); live vehicles are synthesized in memory,
+one per vehicle with half of them on a trip, as GPSService.get_live_vehicles would return them:
+
+    python scripts/measure_payloads.py --trips 10000 --vehicles 500
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trips", type=int, default=10_000)
+    parser.add_argument("--vehicles", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", default="", help="Use an existing database instead of a temporary SQLite file")
+    return parser.parse_args()
+
+
+args = _parse_args()
+if not args.database_url:
+    args.database_url = f"sqlite:///{tempfile.mkdtemp()}/measure_payloads.db"
+os.environ["DATABASE_URL"] = args.database_url
+
+import orjson  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app.core.compression import SUPPORTED_ENCODINGS, compress  # noqa: E402
+from app.core.serialization import dumps  # noqa: E402
+from app.db.session import SessionLocal, init_db  # noqa: E402
+from app.models import Driver, Organization, PresetDestination, PresetLocation, Trip, Vehicle  # noqa: E402
+from app.schemas.gps import VehicleLocationResponse  # noqa: E402
+from app.schemas.trip import TripResponse  # noqa: E402
+from app.services.gps_service import build_live_vehicle_rows  # noqa: E402
+from app.services.trip_service import trip_row_to_dict, trip_rows_stmt  # noqa: E402
+
+
+def seed_trips(db, n: int) -> None:
+    existing = db.scalar(select(func.count()).select_from(Trip))
+    if existing >= n:
+        return
+    org = Organization(name="Measure Org", code="MEASURE")
+    db.add(org)
+    db.flush()
+    drivers = [Driver(organization_id=org.id, name=f"Driver {i}", user_id=f"measure{i}", password_hash="x") for i in range(20)]
+    vehicles = [Vehicle(organization_id=org.id, registration_number=f"KA-01-{i:04d}") for i in range(20)]
+    presets = [PresetLocation(organization_id=org.id, name=f"Base {i}", latitude=12.9, longitude=77.6) for i in range(5)]
+    dests = [PresetDestination(name=f"Hospital {i}", latitude=12.95, longitude=77.65) for i in range(5)]
+    db.add_all(drivers + vehicles + presets + dests)
+    db.flush()
+    start = datetime(2025, 1, 1, 8, 0, 0)
+    rows = []
+    for i in range(n - existing):
+        fixed = i % 3 == 0
+        rows.append({
+            "organization_id": org.id,
+            "driver_id": drivers[i % 20].id,
+            "vehicle_id": vehicles[i % 20].id,
+            "source_preset_id": presets[i % 5].id if fixed else None,
+            "destination_preset_id": dests[i % 5].id if fixed else None,
+            "pickup_lat": 12.9 + (i % 100) / 1000,
+            "pickup_lng": 77.6,
+            "drop_lat": None if fixed else 12.95,
+            "drop_lng": None if fixed else 77.65,
+            "start_time": start + timedelta(minutes=i),
+            "end_time": start + timedelta(minutes=i + 25),
+            "distance_km": 7.5 + i % 10,
+            "is_fixed_tariff": fixed,
+            "total_amount": 700.0 if fixed else 375.0,
+            "status": "completed",
+            "created_at": start + timedelta(minutes=i),
+        })
+    db.execute(insert(Trip), rows)
+    db.commit()
+
+
+def trip_records() -> list[dict]:
+    db = SessionLocal()
+    try:
+        seed_trips(db, args.trips)
+        return [trip_row_to_dict(row) for row in db.execute(trip_rows_stmt())]
+    finally:
+        db.close()
+
+
+def live_records(n: int) -> list[dict]:
+    now = datetime.utcnow().isoformat()
+    locations = [
+        {"vehicle_id": i, "latitude": 12.9 + i / 1e4, "longitude": 77.6 - i / 1e4,
+         "trip_id": i if i % 2 else None, "last_updated": now}
+        for i in range(1, n + 1)
+    ]
+    preset = PresetLocation(name="Base", latitude=12.9, longitude=77.6)
+    dest = PresetDestination(name="Hospital", latitude=12.95, longitude=77.65)
+    trips = {
+        i: Trip(id=i, driver=Driver(name=f"Driver {i}"), source_preset=preset, destination_preset=dest)
+        for i in range(1, n + 1, 2)
+    }
+    return build_live_vehicle_rows(locations, {i: f"KA-01-{i:04d}" for i in range(1, n + 1)}, trips)
+
+
+def best_ms(func, repeat: int) -> tuple[float, bytes]:
+    best, out = float("inf"), b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, out
+
+
+def report(name: str, records: list[dict], model) -> None:
+    adapter = TypeAdapter(list[model])
+    encoders = {
+        "pydantic dump_json": lambda: adapter.dump_json(adapter.validate_python(records)),
+        "stdlib json": lambda: json.dumps(records, default=str, separators=(",", ":")).encode(),
+        "orjson": lambda: dumps(records),
+    }
+    print(f"\n{name}: {len(records)} items")
+    body = b""
+    for label, func in encoders.items():
+        ms, out = best_ms(func, args.repeat)
+        print(f"  encode {label:<20} {ms:8.1f} ms")
+        if label == "orjson":
+            body = out
+    if orjson.loads(body) != orjson.loads(encoders["pydantic dump_json"]()):
+        print("  WARNING: orjson body differs from the response_model body")
+    print(f"  {'identity':<27} {len(body) / 1024:8.1f} KiB")
+    for encoding in SUPPORTED_ENCODINGS:
+        ms, out = best_ms(lambda: compress(body, encoding), args.repeat)
+        print(f"  {encoding:<27} {len(out) / 1024:8.1f} KiB  ({len(out) / len(body):.1%}, {ms:.1f} ms)")
+
+
+def main() -> None:
+    init_db()
+    report("/trips", trip_records(), TripResponse)
+    report("/gps/vehicles/live", live_records(args.vehicles), VehicleLocationResponse)
+
+
+if __name__ == "__main__":
+    main()
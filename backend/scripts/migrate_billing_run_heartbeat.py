@@ -0,0 +1,29 @@
+"""Add heartbeat_at to billing_runs. Run once if upgrading from older schema."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text
+
+from app.db.session import engine
+
+
+def migrate():
+    col_type = "TIMESTAMP WITH TIME ZONE" if engine.dialect.name == "postgresql" else "DATETIME"
+    with engine.connect() as conn:
+        try:
+            conn.execute(text(f"ALTER TABLE billing_runs ADD COLUMN heartbeat_at {col_type}"))
+            conn.commit()
+            print("Added column billing_runs.heartbeat_at")
+        except Exception as e:
+            msg = str(e).lower()
+            if "already exists" in msg or "duplicate column" in msg:
+                print("Column billing_runs.heartbeat_at already exists, skipping.")
+            else:
+                raise
+    print("Migration complete.")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,54 @@
+"""Process new GPS points into per vehicle-day utilization metrics and report throughput.
+
+Run from cron / a systemd timer, or keep it running with --follow:
+
+    python scripts/process_utilization.py                  # catch up once
+    python scripts/process_utilization.py --follow 60      # catch up every 60 s
+    python scripts/process_utilization.py --reset          # reprocess all gps_logs from scratch
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.db.session import SessionLocal, init_db
+from app.services.utilization_service import process_new_points, reset_utilization
+
+
+def run_once(chunk_size: int | None) -> None:
+    db = SessionLocal()
+    try:
+        stats = process_new_points(db, chunk_size=chunk_size)
+    finally:
+        db.close()
+    print(
+        f"{stats['points']} points in {stats['chunks']} chunk(s), {stats['seconds']:.2f}s "
+        f"({stats['points_per_sec']:,.0f} points/sec)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunk-size", type=int, default=None, help="Rows per chunk (default UTILIZATION_CHUNK_SIZE)")
+    parser.add_argument("--follow", type=float, metavar="SECONDS", default=None, help="Repeat every SECONDS")
+    parser.add_argument("--reset", action="store_true", help="Drop computed metrics and start from the first GPS point")
+    args = parser.parse_args()
+    init_db()
+    if args.reset:
+        db = SessionLocal()
+        try:
+            reset_utilization(db)
+            db.commit()
+        finally:
+            db.close()
+        print("Utilization state reset.")
+    run_once(args.chunk_size)
+    while args.follow:
+        time.sleep(args.follow)
+        run_once(args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
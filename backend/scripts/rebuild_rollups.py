@@ -0,0 +1,36 @@
+"""Rebuild the daily rollup tables from trips, invoices and vehicle expenses.
+
+Run after deploying the rollups (backfill), after bulk SQL changes to the source tables, or to
+repair a range:
+
+    python scripts/rebuild_rollups.py                      # all days
+    python scripts/rebuild_rollups.py --from 2025-01-01 --to 2025-01-31
+"""
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.db.session import SessionLocal, init_db
+from app.services.rollup_service import rebuild_rollups
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, default=None)
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+    init_db()
+    db = SessionLocal()
+    try:
+        counts = rebuild_rollups(db, args.date_from, args.date_to)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Rebuilt {counts['fleet_rows']} fleet and {counts['expense_rows']} expense rollup rows.")
+
+
+if __name__ == "__main__":
+    main()
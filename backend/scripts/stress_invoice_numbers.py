@@ -0,0 +1,201 @@
+"""Stress test gapless invoice numbering: concurrent trip-end invoices, rollbacks and a billing run.
+
+Seeds --orgs organizations with completed, un-invoiced trips into the scratch database given by
+--database-url (never the app's DATABASE_URL; tables are created there), then at the same time:
+
+- --threads threads invoice their share of today's trips one by one with create_invoice(), as
+  ending a trip does, and every --rollback-every-th time take a number and roll it back instead;
+- a billing run (execute_billing_run) invoices yesterday's trips in batches.
+
+Finally checks that each organization's invoice numbers are exactly 1..N, with no gap and no
+duplicate, and that its counter stands at N:
+
+    python scripts/stress_invoice_numbers.py --database-url postgresql://.../scratch --threads 64
+
+The script refuses a database that holds organizations it did not create.
+"""
+import argparse
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, func, insert, select
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.session import SessionLocal
+from app.models import BillingRun, Driver, Invoice, InvoiceSequence, Organization, Trip, Vehicle
+from app.services.billing_run_service import create_billing_run, execute_billing_run
+from app.services.billing_service import allocate_invoice_numbers, create_invoice
+
+
+CODE_PREFIX = "STRESS-"
+
+
+def _seed(orgs: int, trips: int, run_trips: int) -> list[int]:
+    """Organizations with one vehicle and driver each; trips spread over them round-robin."""
+    db = SessionLocal()
+    try:
+        stamp = int(time.time())
+        created = [Organization(name=f"Stress {stamp}-{i}", code=f"{CODE_PREFIX}{stamp}-{i}") for i in range(orgs)]
+        db.add_all(created)
+        db.flush()
+        fleet = []
+        for org in created:
+            vehicle = Vehicle(organization_id=org.id, registration_number=f"STRESS-{org.id}")
+            driver = Driver(organization_id=org.id, name="Stress", user_id=f"stress-{org.id}", password_hash="-")
+            db.add_all([vehicle, driver])
+            fleet.append((org, vehicle, driver))
+        db.flush()
+        now = datetime.now(timezone.utc)
+        rows = []
+        for i in range(trips + run_trips):
+            org, vehicle, driver = fleet[i % orgs]
+            end = now if i < trips else now - timedelta(days=1)
+            rows.append({
+                "organization_id": org.id, "vehicle_id": vehicle.id, "driver_id": driver.id,
+                "start_time": end - timedelta(minutes=30), "end_time": end, "distance_km": 10.0,
+                "is_fixed_tariff": False, "total_amount": 250.0, "status": "completed",
+            })
+        db.execute(insert(Trip), rows)
+        db.commit()
+        return [org.id for org in created]
+    finally:
+        db.close()
+
+
+def _invoice_worker(trips: queue.Queue, rollback_every: int, counts: dict, lock: threading.Lock) -> None:
+    db = SessionLocal()
+    done = rolled_back = 0
+    try:
+        while True:
+            try:
+                trip_id = trips.get_nowait()
+            except queue.Empty:
+                break
+            trip = db.get(Trip, trip_id)
+            if rollback_every and (done + 1) % rollback_every == 0:
+                allocate_invoice_numbers(db, trip.organization_id)
+                db.rollback()  # e.g. the trip-end request failed after taking a number
+                rolled_back += 1
+            create_invoice(db, trip, trip.total_amount)
+            done += 1
+    finally:
+        db.close()
+        with lock:
+            counts["invoices"] += done
+            counts["rolled_back"] += rolled_back
+
+
+def _check(org_ids: list[int]) -> list[str]:
+    db = SessionLocal()
+    problems = []
+    try:
+        for org_id in org_ids:
+            numbers = db.scalars(
+                select(Invoice.invoice_number).join(Trip, Trip.id == Invoice.trip_id).where(Trip.organization_id == org_id)
+            ).all()
+            seq = sorted(int(n.rsplit("-", 1)[1]) for n in numbers)
+            last = db.scalar(select(InvoiceSequence.last_number).where(InvoiceSequence.organization_id == org_id))
+            if seq != list(range(1, len(seq) + 1)):
+                missing = sorted(set(range(1, len(seq) + 1)) - set(seq))[:5]
+                problems.append(f"org {org_id}: numbers are not 1..{len(seq)} (missing e.g. {missing})")
+            if last != len(seq):
+                problems.append(f"org {org_id}: counter at {last}, {len(seq)} invoices")
+        return problems
+    finally:
+        db.close()
+
+
+def run(threads: int, orgs: int, trips: int, run_trips: int, rollback_every: int) -> dict:
+    """Seed, invoice concurrently and check, using SessionLocal as bound. Returns counts and problems."""
+    org_ids = _seed(orgs, trips, run_trips)
+
+    db = SessionLocal()
+    try:
+        trip_ids = db.scalars(
+            select(Trip.id).where(Trip.organization_id.in_(org_ids), func.date(Trip.end_time) == datetime.now(timezone.utc).date())
+        ).all()
+        yesterday = (datetime.now(timezone.utc) - timedelta(days=1)).date()
+        billing_run = create_billing_run(db, None, yesterday, yesterday)
+        db.commit()
+        run_id = billing_run.id
+    finally:
+        db.close()
+
+    queued: queue.Queue = queue.Queue()
+    for trip_id in trip_ids:
+        queued.put(trip_id)
+    counts = {"invoices": 0, "rolled_back": 0}
+    lock = threading.Lock()
+    workers = [
+        threading.Thread(target=_invoice_worker, args=(queued, rollback_every, counts, lock))
+        for _ in range(threads)
+    ]
+    workers.append(threading.Thread(target=execute_billing_run, args=(run_id,)))
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    db = SessionLocal()
+    try:
+        billing_run = db.get(BillingRun, run_id)
+        run_status, run_invoices = billing_run.status, billing_run.invoices_created
+    finally:
+        db.close()
+    return {
+        **counts,
+        "run_status": run_status,
+        "run_invoices": run_invoices,
+        "seconds": elapsed,
+        "org_ids": org_ids,
+        "problems": _check(org_ids),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True, help="scratch database; must not be the app's DATABASE_URL")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--orgs", type=int, default=4)
+    parser.add_argument("--trips", type=int, default=2000, help="today's trips, invoiced one by one by the threads")
+    parser.add_argument("--run-trips", type=int, default=5000, help="yesterday's trips, invoiced by the billing run")
+    parser.add_argument("--rollback-every", type=int, default=10, help="0 disables the rolled-back allocations")
+    args = parser.parse_args()
+    if args.database_url == settings.database_url:
+        parser.error("--database-url is the app's DATABASE_URL; point it at a scratch database")
+    engine = create_engine(args.database_url)
+    SessionLocal.configure(bind=engine)  # the services (execute_billing_run) open their sessions here too
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        foreign = db.scalar(
+            select(func.count()).select_from(Organization).where(~Organization.code.startswith(CODE_PREFIX))
+        )
+    finally:
+        db.close()
+    if foreign:
+        parser.error(f"{args.database_url} holds {foreign} organizations not created by this script; use a scratch database")
+
+    result = run(args.threads, args.orgs, args.trips, args.run_trips, args.rollback_every)
+    total = result["invoices"] + result["run_invoices"]
+    print(f"{args.threads} threads: {result['invoices']} invoices one by one, {result['rolled_back']} rolled back; "
+          f"billing run {result['run_status']} with {result['run_invoices']} invoices")
+    print(f"{total} invoices in {result['seconds']:.2f}s ({total / result['seconds']:.0f}/s)")
+    for problem in result["problems"]:
+        print(problem)
+    if result["problems"] or result["run_status"] != "completed":
+        sys.exit(1)
+    print(f"OK: numbers of {len(result['org_ids'])} organizations are gapless and unique")
+
+
+if __name__ == "__main__":
+    main()
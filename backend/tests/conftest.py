@@ -0,0 +1,64 @@
+"""Test setup: a scratch SQLite database and an in-process Redis (fakeredis), wired in before the app is imported."""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+_DB_PATH = Path(tempfile.mkdtemp(prefix="ambulance-tests-")) / "test.db"
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_PATH}"
+os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{_DB_PATH}"
+os.environ.setdefault("DEVICE_TOKEN_SECRET", "test-device-token-secret-0123456789")
+os.environ.setdefault("INVOICE_PDF_CACHE_DIR", str(_DB_PATH.parent / "pdf"))
+os.environ.setdefault("ETA_GRID_PATH", str(_DB_PATH.parent / "speed_grid.npy"))
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fakeredis  # noqa: E402
+import fakeredis.aioredis  # noqa: E402
+
+from app.core import redis_client  # noqa: E402
+
+_redis_server = fakeredis.FakeServer()
+redis_client._pool = fakeredis.FakeRedis(server=_redis_server).connection_pool
+redis_client._client = redis_client.InstrumentedRedis(connection_pool=redis_client._pool)
+redis_client._async_pool = fakeredis.aioredis.FakeRedis(server=_redis_server).connection_pool
+redis_client._async_client = redis_client.InstrumentedAsyncRedis(connection_pool=redis_client._async_pool)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.security import hash_password  # noqa: E402
+from app.db.session import SessionLocal, init_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import AdminUser  # noqa: E402
+
+init_db()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def client() -> TestClient:
+    # Not entered as a context manager: the lifespan would close the fake Redis clients on exit.
+    return TestClient(app, base_url="http://localhost")
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client) -> dict:
+    session = SessionLocal()
+    try:
+        session.add(AdminUser(username="test-admin", password_hash=hash_password("test-admin"), active=True))
+        session.commit()
+    finally:
+        session.close()
+    r = client.post("/auth/admin-login", json={"username": "test-admin", "password": "test-admin"})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
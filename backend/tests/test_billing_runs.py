@@ -0,0 +1,106 @@
+"""Billing runs: overlapping runs are refused, including concurrent starts, and an expired run stops billing."""
+import threading
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app.db.session import SessionLocal
+from app.models import BillingRun, Driver, Invoice, Organization, Trip, Vehicle
+from app.services import billing_run_service
+from app.services.billing_run_service import create_billing_run, execute_billing_run, find_overlapping_run
+
+DAY = date(2024, 1, 15)
+TRIPS = 30
+
+
+@pytest.fixture
+def org_id():
+    db = SessionLocal()
+    try:
+        org = Organization(name="Runs", code=f"RUNS-{datetime.utcnow().timestamp()}")
+        db.add(org)
+        db.flush()
+        vehicle = Vehicle(organization_id=org.id, registration_number=f"RUNS-{org.id}")
+        driver = Driver(organization_id=org.id, name="Runs", user_id=f"runs-{org.id}", password_hash="-")
+        db.add_all([vehicle, driver])
+        db.flush()
+        end = datetime(DAY.year, DAY.month, DAY.day, 12)
+        db.add_all([
+            Trip(organization_id=org.id, vehicle_id=vehicle.id, driver_id=driver.id, status="completed",
+                 start_time=end - timedelta(minutes=30), end_time=end, distance_km=10.0, total_amount=250.0)
+            for _ in range(TRIPS)
+        ])
+        db.commit()
+        return org.id
+    finally:
+        db.close()
+
+
+def _invoices(org_id: int) -> int:
+    db = SessionLocal()
+    try:
+        return db.scalar(
+            select(func.count()).select_from(Invoice).join(Trip, Trip.id == Invoice.trip_id)
+            .where(Trip.organization_id == org_id)
+        )
+    finally:
+        db.close()
+
+
+def test_concurrent_starts_create_one_run(org_id):
+    barrier = threading.Barrier(4)
+    created = []
+
+    def start():
+        db = SessionLocal()
+        try:
+            barrier.wait()
+            if find_overlapping_run(db, org_id, DAY, DAY) is None:
+                created.append(create_billing_run(db, org_id, DAY, DAY))
+            db.commit()
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=start) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(created) == 1
+
+
+def test_run_expired_between_batches_stops_before_billing_more(org_id, monkeypatch):
+    db = SessionLocal()
+    try:
+        run = create_billing_run(db, org_id, DAY, DAY)
+        db.commit()
+        run_id = run.id
+    finally:
+        db.close()
+
+    lock_row = billing_run_service.lock_row
+    calls = []
+
+    def expire_before_second_batch(session, obj):
+        calls.append(obj)
+        if len(calls) == 3:  # 1: pending -> running, 2: first batch, 3: second batch
+            other = SessionLocal()
+            try:
+                other.get(BillingRun, run_id).status = "failed"
+                other.commit()
+            finally:
+                other.close()
+        lock_row(session, obj)
+
+    monkeypatch.setattr(billing_run_service, "lock_row", expire_before_second_batch)
+    execute_billing_run(run_id, batch_size=10)
+
+    db = SessionLocal()
+    try:
+        run = db.get(BillingRun, run_id)
+        assert run.status == "failed"
+        assert run.invoices_created == 10
+    finally:
+        db.close()
+    assert _invoices(org_id) == 10
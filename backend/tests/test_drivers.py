@@ -0,0 +1,41 @@
+"""Driver create: a user ID registered while the password is hashed is refused."""
+from sqlalchemy import func, select
+
+from app.api.routes import drivers as driver_routes
+from app.db.session import SessionLocal
+from app.models import Driver, Organization
+
+
+def test_user_id_registered_during_hashing_is_refused(client, admin_headers, monkeypatch):
+    db = SessionLocal()
+    try:
+        org = Organization(name="Drivers", code="DRIVERS")
+        db.add(org)
+        db.commit()
+        org_id = org.id
+    finally:
+        db.close()
+    hash_password = driver_routes.hash_password
+
+    def hash_while_an_import_registers(password):
+        other = SessionLocal()
+        try:
+            other.add(Driver(organization_id=org_id, name="Imported", user_id="drv-race", password_hash="-"))
+            other.commit()
+        finally:
+            other.close()
+        return hash_password(password)
+
+    monkeypatch.setattr(driver_routes, "hash_password", hash_while_an_import_registers)
+    r = client.post(
+        "/drivers",
+        json={"organization_id": org_id, "name": "Created", "user_id": "drv-race", "password": "secret-1"},
+        headers=admin_headers,
+    )
+    assert r.status_code == 400, r.text
+
+    db = SessionLocal()
+    try:
+        assert db.scalar(select(func.count()).select_from(Driver).where(Driver.user_id == "drv-race")) == 1
+    finally:
+        db.close()
@@ -0,0 +1,16 @@
+"""Export responses honour the q-values of Accept-Encoding."""
+import pytest
+
+
+@pytest.mark.parametrize("accept_encoding, encoded", [
+    ("gzip", True),
+    ("deflate, gzip;q=0.5", True),
+    ("*", True),
+    ("gzip;q=0", False),
+    ("gzip;q=0, *", False),
+    ("identity", False),
+])
+def test_trips_export_gzip_negotiation(client, admin_headers, accept_encoding, encoded):
+    r = client.get("/exports/trips", headers={**admin_headers, "Accept-Encoding": accept_encoding})
+    assert r.status_code == 200
+    assert (r.headers.get("content-encoding") == "gzip") is encoded
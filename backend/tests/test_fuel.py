@@ -0,0 +1,35 @@
+"""Fuel efficiency periods are UTC days."""
+from datetime import date, datetime, timezone
+
+from app.db.session import SessionLocal
+from app.models import Organization, Vehicle, VehicleExpense
+from app.services.fuel_service import refuel_intervals
+
+
+def test_refuels_belong_to_their_utc_day():
+    db = SessionLocal()
+    try:
+        org = Organization(name="Fuel", code="FUEL")
+        db.add(org)
+        db.flush()
+        vehicle = Vehicle(organization_id=org.id, registration_number="FUEL-1")
+        db.add(vehicle)
+        db.flush()
+        for odometer, at in [
+            (1000, datetime(2024, 2, 9, 12, 0, tzinfo=timezone.utc)),
+            (1100, datetime(2024, 2, 10, 0, 0, tzinfo=timezone.utc)),  # first instant of the day
+            (1200, datetime(2024, 2, 10, 23, 59, 59, tzinfo=timezone.utc)),
+            (1300, datetime(2024, 2, 11, 0, 0, 1, tzinfo=timezone.utc)),
+        ]:
+            db.add(VehicleExpense(
+                vehicle_id=vehicle.id, expense_type="fuel", bill_number=str(odometer), amount=500.0,
+                odometer_reading=odometer, qty_refueled=10.0, created_at=at,
+            ))
+        db.commit()
+
+        day = date(2024, 2, 10)
+        intervals = refuel_intervals(db, vehicle.id, day, day)
+        assert [r["odometer_reading"] for r in intervals] == [1100, 1200]
+        assert all(r["km"] == 100 for r in intervals)
+    finally:
+        db.close()
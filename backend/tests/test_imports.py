@@ -0,0 +1,64 @@
+"""Bulk CSV import of drivers."""
+import pytest
+from sqlalchemy import func, select
+
+from app.api.routes import imports as import_routes
+from app.db.session import SessionLocal
+from app.models import Driver, Organization
+
+
+@pytest.fixture(scope="module")
+def org_id():
+    db = SessionLocal()
+    try:
+        org = Organization(name="Imports", code="IMPORTS")
+        db.add(org)
+        db.commit()
+        return org.id
+    finally:
+        db.close()
+
+
+def _csv(*user_ids: str) -> bytes:
+    lines = ["name,user_id,password"] + [f"Driver {u},{u},secret-{u}" for u in user_ids]
+    return "\n".join(lines).encode()
+
+
+def _count(user_id: str) -> int:
+    db = SessionLocal()
+    try:
+        return db.scalar(select(func.count()).select_from(Driver).where(Driver.user_id == user_id))
+    finally:
+        db.close()
+
+
+def test_import_drivers(client, admin_headers, org_id):
+    r = client.post(f"/imports/drivers?organization_id={org_id}", content=_csv("imp-1", "imp-2"), headers=admin_headers)
+    assert r.status_code == 200, r.text
+    assert r.json()["created"] == 2
+
+    again = client.post(f"/imports/drivers?organization_id={org_id}", content=_csv("imp-2"), headers=admin_headers)
+    assert again.status_code == 422
+    assert again.json()["detail"]["errors"][0]["field"] == "user_id"
+
+
+def test_user_id_registered_during_hashing_is_rejected(client, admin_headers, org_id, monkeypatch):
+    hash_passwords = import_routes.hash_passwords
+
+    async def hash_while_another_request_registers(records):
+        db = SessionLocal()
+        try:
+            db.add(Driver(organization_id=org_id, name="Racer", user_id="imp-race", password_hash="-"))
+            db.commit()
+        finally:
+            db.close()
+        await hash_passwords(records)
+
+    monkeypatch.setattr(import_routes, "hash_passwords", hash_while_another_request_registers)
+    r = client.post(
+        f"/imports/drivers?organization_id={org_id}", content=_csv("imp-race", "imp-3"), headers=admin_headers,
+    )
+    assert r.status_code == 409, r.text
+    assert "imp-race" in r.json()["detail"]
+    assert _count("imp-race") == 1
+    assert _count("imp-3") == 0
@@ -0,0 +1,40 @@
+"""Gapless invoice numbers under concurrent trip-end invoices, rolled-back allocations and a billing run."""
+import importlib.util
+from pathlib import Path
+
+from sqlalchemy import select
+
+from app.models import InvoiceSequence, Organization
+from app.services.billing_service import allocate_invoice_numbers, format_invoice_number
+
+_SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "stress_invoice_numbers.py"
+
+
+def _stress_module():
+    spec = importlib.util.spec_from_file_location("stress_invoice_numbers", _SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_concurrent_invoices_are_numbered_one_to_n_per_organization():
+    result = _stress_module().run(threads=8, orgs=3, trips=240, run_trips=600, rollback_every=4)
+
+    assert result["run_status"] == "completed"
+    assert result["invoices"] == 240
+    assert result["run_invoices"] == 600
+    assert result["rolled_back"] > 0
+    assert result["problems"] == []
+
+
+def test_rolled_back_allocation_gives_its_numbers_back(db):
+    org = Organization(name="Rollback", code="ROLLBACK")
+    db.add(org)
+    db.commit()
+    org_id = org.id
+
+    assert allocate_invoice_numbers(db, org_id, 3) == [format_invoice_number(org_id, n) for n in (1, 2, 3)]
+    db.rollback()
+    assert allocate_invoice_numbers(db, org_id) == [format_invoice_number(org_id, 1)]
+    db.commit()
+    assert db.scalar(select(InvoiceSequence.last_number).where(InvoiceSequence.organization_id == org_id)) == 1
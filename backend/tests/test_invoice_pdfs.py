@@ -0,0 +1,24 @@
+"""Batch invoice PDFs rendered in the process pool."""
+
+from app.services import invoice_pdf
+
+
+def _invoice(n: int) -> dict:
+    return {
+        "id": 100000 + n, "invoice_number": f"INV-1-{n:06d}", "trip_id": n, "amount": 250.0 + n,
+        "status": "pending", "organization_name": "Test Org", "vehicle_registration": "KA-01",
+        "created_at": "2025-03-01T10:00:00+00:00",
+    }
+
+
+def test_large_batch_is_rendered_in_pool_started_without_fork():
+    items = [_invoice(n) for n in range(invoice_pdf.POOL_MIN_BATCH * 2)]
+    try:
+        pdfs = list(invoice_pdf.iter_invoice_pdfs(items))
+        assert invoice_pdf._pool is not None
+        assert invoice_pdf._pool._mp_context.get_start_method() in ("forkserver", "spawn")
+    finally:
+        invoice_pdf.shutdown_pdf_pool()
+
+    assert [data["id"] for data, _ in pdfs] == [d["id"] for d in items]
+    assert all(pdf.startswith(b"%PDF") for _, pdf in pdfs)
@@ -0,0 +1,20 @@
+"""Password hashing in the process pool (PASSWORD_HASH_EXECUTOR=process)."""
+import asyncio
+
+from app.core import password_hasher as hasher_module
+from app.core.config import settings
+
+
+def test_process_pool_hashes_and_verifies_without_fork(monkeypatch):
+    monkeypatch.setattr(settings, "password_hash_executor", "process")
+    hasher = hasher_module.PasswordHasher()
+
+    async def round_trip():
+        hashed = await hasher.hash("secret-1")
+        return await hasher.verify("secret-1", hashed), await hasher.verify("wrong", hashed)
+
+    try:
+        assert asyncio.run(round_trip()) == (True, False)
+        assert hasher._executor._mp_context.get_start_method() in ("forkserver", "spawn")
+    finally:
+        hasher.shutdown()
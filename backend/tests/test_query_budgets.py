@@ -0,0 +1,73 @@
+"""Query budgets of hot list routes: the query count must not grow with the number of rows (no N+1)."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.db.profiler import assert_route_query_budget
+from app.models import Driver, Organization, PresetDestination, PresetLocation, Trip, Vehicle
+from app.services.gps_service import GPSService
+
+VEHICLES = 12
+
+
+@pytest.fixture(scope="module")
+def fleet():
+    """Vehicles with a driver and a trip each (some with presets, some ended), all reporting a live location."""
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        org = Organization(name="Budget", code="BUDGET")
+        db.add(org)
+        db.flush()
+        source = PresetLocation(organization_id=org.id, name="Base", latitude=12.90, longitude=77.60, radius_meters=500)
+        destination = PresetDestination(name="Hospital", latitude=12.95, longitude=77.65)
+        db.add_all([source, destination])
+        db.flush()
+        now = datetime.utcnow()
+        gps = GPSService(db)
+        for i in range(VEHICLES):
+            vehicle = Vehicle(organization_id=org.id, registration_number=f"BUDGET-{i}")
+            driver = Driver(organization_id=org.id, name=f"Driver {i}", user_id=f"budget-{i}", password_hash="-")
+            db.add_all([vehicle, driver])
+            db.flush()
+            trip = Trip(
+                organization_id=org.id,
+                vehicle_id=vehicle.id,
+                driver_id=driver.id,
+                source_preset_id=source.id if i % 2 else None,
+                destination_preset_id=destination.id if i % 2 else None,
+                pickup_lat=12.91,
+                pickup_lng=77.61,
+                start_time=now - timedelta(minutes=30),
+                end_time=now if i % 3 == 0 else None,
+                status="completed" if i % 3 == 0 else "in_progress",
+            )
+            db.add(trip)
+            db.flush()
+            gps.update_vehicle_location(vehicle.id, 12.92 + i * 0.001, 77.62, trip.id)
+        db.commit()
+        yield org.id
+    finally:
+        db.close()
+
+
+def test_live_vehicles_query_budget(client, admin_headers, fleet):
+    response = assert_route_query_budget(
+        client, "GET", "/gps/vehicles/live", max_queries=3, max_repeats=1, headers=admin_headers,
+    )
+    assert response.status_code == 200
+    assert len([v for v in response.json() if v["registration_number"].startswith("BUDGET-")]) == VEHICLES
+
+
+def test_trips_query_budget(client, admin_headers, fleet):
+    response = assert_route_query_budget(client, "GET", "/trips", max_queries=5, max_repeats=1, headers=admin_headers)
+    assert response.status_code == 200
+    assert len([t for t in response.json() if t["organization_id"] == fleet]) == VEHICLES
+
+    filtered = assert_route_query_budget(
+        client, "GET", f"/trips?organization_id={fleet}&status=in_progress",
+        max_queries=5, max_repeats=1, headers=admin_headers,
+    )
+    assert filtered.status_code == 200
+    assert all(t["status"] == "in_progress" for t in filtered.json())
@@ -0,0 +1,9 @@
+import api from './api'
+
+// One call on app start: profile, vehicles, preset locations, destinations by source, today's trips.
+// The server sends an ETag with Cache-Control: no-cache, so the browser revalidates and an
+// unchanged response comes back as 304 from its HTTP cache.
+export async function getBootstrap() {
+  const { data } = await api.get('/driver/bootstrap')
+  return data
+}
@@ -1,5 +1,30 @@
 import api from './api'
 
+// Device token issued at trip start; sent as X-Device-Token with every GPS update of that trip.
+function deviceTokenKey(tripId) {
+  return `device_token_${tripId}`
+}
+
+export function saveDeviceToken(tripId, token) {
+  if (tripId != null && token) localStorage.setItem(deviceTokenKey(tripId), token)
+}
+
+export function getDeviceToken(tripId) {
+  return tripId != null ? localStorage.getItem(deviceTokenKey(tripId)) : null
+}
+
+export function clearDeviceToken(tripId) {
+  if (tripId != null) localStorage.removeItem(deviceTokenKey(tripId))
+}
+
+export async function ensureDeviceToken(tripId) {
+  const stored = getDeviceToken(tripId)
+  if (stored) return stored
+  const { data } = await api.post(`/trips/${tripId}/device-token`)
+  saveDeviceToken(tripId, data.device_token)
+  return data.device_token
+}
+
 export async function updateLocation(vehicleId, lat, lng, tripId = null) {
   const body = {
     vehicle_id: vehicleId,
@@ -14,6 +39,8 @@ export async function updateLocation(vehicleId, lat, lng, tripId = null) {
   }
   const token = localStorage.getItem('driver_token') || sessionStorage.getItem('driver_token')
   if (token) headers.Authorization = `Bearer ${token}`
+  const deviceToken = getDeviceToken(tripId)
+  if (deviceToken) headers['X-Device-Token'] = deviceToken
 
   const res = await fetch(url, {
     method: 'POST',